@@ -1,3 +1,16 @@
+from sqlalchemy import DDL, event
 from sqlalchemy.orm import declarative_base
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+# gin_trgm_ops indexes need pg_trgm before any table is created
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+# Accent-insensitive search: unaccent() is only STABLE, so generated columns and
+# indexes go through an IMMUTABLE wrapper pinned to the default dictionary
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS unaccent"))
+event.listen(Base.metadata, "before_create", DDL(
+    "CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text AS "
+    "$$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$ "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT"
+))
@@ -46,5 +46,9 @@ class Nutrient(Base):
         # cascade not typically set here
     )
 
+    __table_args__ = (
+        Index("idx_nutrient_name_id", "nutrient_name", "nutrient_id"), # Keyset pagination sort key
+    )
+
     def __repr__(self):
         return f"<Nutrient(nutrient_id='{self.nutrient_id}', name='{self.nutrient_name}', unit='{self.unit}')>"
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, Numeric, TIMESTAMP, func
+from sqlalchemy import Column, ForeignKey, Index, Integer, Numeric, TIMESTAMP, func
 from sqlalchemy.dialects.postgresql import UUID, TEXT
 from sqlalchemy.orm import relationship
 from .base import Base
@@ -15,3 +15,8 @@ class RecipeIngredient(Base):
 
     recipe = relationship("Recipe", back_populates="ingredients")
     ingredient = relationship("Ingredient")
+
+    __table_args__ = (
+        # Reverse lookup ingredient -> recipes (the primary key leads with recipe_id)
+        Index("idx_recipe_ingredients_ingredient_id", "ingredient_id"),
+    )
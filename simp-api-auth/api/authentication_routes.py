@@ -19,6 +19,7 @@ from api.dependencies import (
 from schemas.user import UserResponse, UserCreate
 from database.handling import (
     create_user,
+    get_user_by_id,
     get_user_by_username,
     get_user_by_email,
     delete_user,
@@ -72,7 +73,8 @@ def login(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid username or password")
     
     # Generate tokens and CSRF token
-    access_token = create_access_token(db_user.user_id)
+    session_id = secrets.token_hex(16)
+    access_token = create_access_token(db_user.user_id, db_user.role, db_user.username, session_id)
     refresh_token = create_refresh_token(db_user.user_id)
     csrf_token = secrets.token_hex(32)
     
@@ -84,7 +86,8 @@ def login(
         refresh_token,
         csrf_token,
         access_expires_in=3600,
-        refresh_expires_in=604800
+        refresh_expires_in=604800,
+        session_id=session_id,
     )
     store_user_role(db_user.user_id, db_user.role, expires_in=3600)
     
@@ -134,7 +137,12 @@ def refresh_token_endpoint(request: Request, response: Response, db: Session = D
         if not session_data or not session_data.get("refresh_token"):
             raise HTTPException(status_code=401, detail="Session expired or refresh token missing")
         
-        new_access_token = create_access_token(user_id)
+        # Role and username are signed into the token, so read them once here
+        db_user = get_user_by_id(db, user_id)
+        if not db_user:
+            raise HTTPException(status_code=401, detail="User not found")
+        session_id = session_data.get("session_id") or secrets.token_hex(16)
+        new_access_token = create_access_token(user_id, db_user.role, db_user.username, session_id)
         from database.handling import store_user_session  # Import if needed
         # Re-store session with the new access token while preserving the refresh and CSRF tokens.
         store_user_session(
@@ -143,7 +151,8 @@ def refresh_token_endpoint(request: Request, response: Response, db: Session = D
             session_data["refresh_token"] or refresh_token,
             session_data["csrf_token"],
             access_expires_in=3600,
-            refresh_expires_in=604800
+            refresh_expires_in=604800,
+            session_id=session_id,
         )
         
         # Update the auth token cookie.
@@ -1,21 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from api.dependencies import get_db, get_current_user
-from database.handling import get_user_by_id
+from sqlalchemy.ext.asyncio import AsyncSession
+from api.dependencies import get_current_user
+from database.connection import get_async_db
+from database.handling import get_user_by_id_async
 
 router = APIRouter()
 
 
 @router.get("/user-role/{user_id}")
-def get_user_role(user_id: str, db: Session = Depends(get_db)):
-    user = get_user_by_id(db, user_id)
+async def get_user_role(user_id: str, db: AsyncSession = Depends(get_async_db)):
+    user = await get_user_by_id_async(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail=f"User with user ID: {user_id} not found")
     return {"role": user.role}
 
 
 def is_authorized(required_role: str):
-    def role_checker(user_data: dict = Depends(get_current_user)):
+    async def role_checker(user_data: dict = Depends(get_current_user)):
         if user_data.get("role") != required_role:
             raise HTTPException(status_code=403, detail="Access denied")
         return user_data
@@ -2,10 +2,10 @@ import os
 import jwt
 from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException, Request, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from dotenv import load_dotenv
-from database.connection import SessionLocal
-from database.handling import get_user_by_id, validate_user_session, validate_csrf_token
+from database.connection import SessionLocal, get_async_db
+from database.handling import get_user_by_id_async, get_user_session_async
 import re
 
 load_dotenv()
@@ -25,9 +25,19 @@ def get_db():
         db.close()
 
 
-def create_access_token(user_id: str):
+def create_access_token(user_id: str, role: str, username: str, session_id: str):
+    """
+    Signed access token. Role, username and session id travel as claims so
+    the other services can authorize a request without reading the user row.
+    """
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    payload = {"sub": str(user_id), "exp": expire}
+    payload = {
+        "sub": str(user_id),
+        "exp": expire,
+        "role": role,
+        "username": username,
+        "sid": session_id,
+    }
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 
@@ -37,7 +47,7 @@ def create_refresh_token(user_id: str):
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(request: Request, db: Session = Depends(get_db)):
+async def get_current_user(request: Request, db: AsyncSession = Depends(get_async_db)):
     token = request.cookies.get("auth_token")
     csrf_token_header = request.headers.get("X-CSRF-Token")
     csrf_token_cookie = request.cookies.get("csrf_token")
@@ -47,14 +57,15 @@ def get_current_user(request: Request, db: Session = Depends(get_db)):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = payload.get("sub")
-        if not validate_user_session(user_id, token):
+        session_data = await get_user_session_async(user_id)
+        if not session_data or session_data.get("auth_token") != token:
             raise HTTPException(status_code=401, detail="Invalid token")
         
         csrf_token = csrf_token_header or csrf_token_cookie
-        if not csrf_token or not validate_csrf_token(user_id, csrf_token):
+        if not csrf_token or session_data.get("csrf_token") != csrf_token:
             raise HTTPException(status_code=403, detail="Invalid CSRF token")
         
-        user = get_user_by_id(db, user_id)
+        user = await get_user_by_id_async(db, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         return {
@@ -11,7 +11,7 @@ from dotenv import load_dotenv
 # Import dependencies
 from api.dependencies import get_db, create_access_token, create_refresh_token, get_current_user
 from database.handling import (
-    get_user_by_username, store_user_session, store_user_role, revoke_user_session, validate_refresh_token, get_user_session
+    get_user_by_id, get_user_by_username, store_user_session, store_user_role, revoke_user_session, validate_refresh_token, get_user_session
 )
 
 load_dotenv()
@@ -41,12 +41,13 @@ def login(
         raise HTTPException(status_code=401, detail="Invalid username or password")
 
     # Create tokens and CSRF token
-    access_token = create_access_token(db_user.user_id)
+    session_id = secrets.token_hex(16)
+    access_token = create_access_token(db_user.user_id, db_user.role, db_user.username, session_id)
     refresh_token = create_refresh_token(db_user.user_id)
     csrf_token = secrets.token_hex(32)
 
     # Store session data and user role (assumed to be handled properly)
-    store_user_session(db_user.user_id, access_token, refresh_token, csrf_token, access_expires_in=3600, refresh_expires_in=604800)
+    store_user_session(db_user.user_id, access_token, refresh_token, csrf_token, access_expires_in=3600, refresh_expires_in=604800, session_id=session_id)
     store_user_role(db_user.user_id, db_user.role, expires_in=3600)
 
     # Set cookies
@@ -99,7 +100,12 @@ def refresh_token(request: Request, response: Response, db: Session = Depends(ge
             raise HTTPException(status_code=401, detail="Session expired or refresh token missing")
 
         # Issue a new access token
-        new_access_token = create_access_token(user_id)
+        # Role and username are signed into the token, so read them once here
+        db_user = get_user_by_id(db, user_id)
+        if not db_user:
+            raise HTTPException(status_code=401, detail="User not found")
+        session_id = session_data.get("session_id") or secrets.token_hex(16)
+        new_access_token = create_access_token(user_id, db_user.role, db_user.username, session_id)
 
         # Update session in Redis (Ensure refresh_token is not None)
         store_user_session(
@@ -108,7 +114,8 @@ def refresh_token(request: Request, response: Response, db: Session = Depends(ge
             session_data["refresh_token"] or refresh_token,  # Use stored or received refresh_token
             session_data["csrf_token"],
             access_expires_in=3600,
-            refresh_expires_in=604800
+            refresh_expires_in=604800,
+            session_id=session_id,
         )
 
         # Set new access token cookie
@@ -1,7 +1,11 @@
 import os
+import json
 import uuid
 import redis
+import redis.asyncio
 import argon2
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 from models.user import User
@@ -14,6 +18,11 @@ REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_DB = int(os.getenv("REDIS_DB", 0))
 
 r = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, decode_responses=True)
+
+# Pub/sub channel the other services listen on to evict cached sessions
+SESSION_REVOCATION_CHANNEL = "auth:session_revocations"
+# Async client for `async def` routes
+async_r = redis.asyncio.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, decode_responses=True)
 ph = argon2.PasswordHasher()
 
 def create_user(db: Session, username: str, email: str, hashed_password: str):
@@ -57,13 +66,16 @@ def delete_user(db: Session, user_id: str):
         return True
     return False
 
-def store_user_session(user_id: str, auth_token: str, refresh_token: str, csrf_token: str, access_expires_in=3600, refresh_expires_in=604800):
-    """ Store access token, refresh token, and CSRF token in Redis """
-    r.hset(f"user_session:{user_id}", mapping={
+def store_user_session(user_id: str, auth_token: str, refresh_token: str, csrf_token: str, access_expires_in=3600, refresh_expires_in=604800, session_id: str = None):
+    """ Store access token, refresh token, CSRF token and session id in Redis """
+    mapping = {
         "auth_token": auth_token,
         "refresh_token": refresh_token,  
         "csrf_token": csrf_token
-    })
+    }
+    if session_id:
+        mapping["session_id"] = session_id
+    r.hset(f"user_session:{user_id}", mapping=mapping)
 
     r.expire(f"user_session:{user_id}", refresh_expires_in)  
 
@@ -76,8 +88,23 @@ def get_user_session(user_id: str):
         "auth_token": session_data.get("auth_token"),
         "refresh_token": session_data.get("refresh_token"),  
         "csrf_token": session_data.get("csrf_token"),
+        "session_id": session_data.get("session_id"),
+    }
+
+async def get_user_session_async(user_id: str):
+    """ Retrieve the session from Redis without blocking the event loop """
+    session_data = await async_r.hgetall(f"user_session:{user_id}")
+    if not session_data:
+        return None
+    return {
+        "auth_token": session_data.get("auth_token"),
+        "refresh_token": session_data.get("refresh_token"),
+        "csrf_token": session_data.get("csrf_token"),
     }
 
+async def get_user_by_id_async(db: AsyncSession, user_id: str):
+    return (await db.execute(select(User).where(User.user_id == user_id))).scalar_one_or_none()
+
 def validate_user_session(user_id: str, auth_token: str):
     """ Validate auth token from Redis """
     session_data = get_user_session(user_id)
@@ -89,8 +116,9 @@ def validate_csrf_token(user_id: str, csrf_token: str):
     return session_data and session_data.get("csrf_token") == csrf_token
 
 def revoke_user_session(user_id: str):
-    """ Remove auth token & CSRF token from Redis """
+    """ Remove auth token & CSRF token from Redis and tell every service to drop its cached copy """
     r.delete(f"user_session:{user_id}")
+    r.publish(SESSION_REVOCATION_CHANNEL, json.dumps({"user_id": str(user_id)}))
 
 def store_user_role(user_id: str, role: str, expires_in=3600):
     """ Store user role separately in Redis """
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Boolean, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Boolean, Index, TIMESTAMP, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
@@ -19,5 +19,14 @@ class Cauldron(Base):
     user = relationship("User", backref="cauldrons")
     recipe = relationship("Recipe", backref="cauldrons")
     cauldron_data = relationship("CauldronData", uselist=False, back_populates="cauldron")
+
+    __table_args__ = (
+        # Keyset pagination of a user's cauldron (newest first)
+        Index("idx_cauldron_user_created_id", "user_id", "created_at", "cauldron_id"),
+        # One entry per (user, recipe); target of the batch upserts
+        Index("uq_cauldron_user_recipe", "user_id", "recipe_id", unique=True),
+        # Active/inactive slices of a user's cauldron, same keyset order
+        Index("idx_cauldron_user_active_created_id", "user_id", "is_active", "created_at", "cauldron_id"),
+    )
    
    
\ No newline at end of file
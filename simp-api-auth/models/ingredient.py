@@ -46,6 +46,8 @@ class Ingredient(Base):
         default=DietLevelEnum.OMNIVORE
     )
     validated = Column(Boolean, nullable=False, default=False, index=True)
+    # Incremented on every write; exposed as the ingredient's ETag
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     # --- Timestamps ---
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -68,6 +70,8 @@ class Ingredient(Base):
     # --- Table Arguments (Indices and Constraints) ---
     __table_args__ = (
         Index("idx_ingredient_name", "name"),
+        Index("idx_ingredient_name_id", "name", "ingredient_id"), # Keyset pagination sort key
+        Index("uq_ingredient_name_lower", func.lower(name), unique=True), # Case-insensitive upsert target
         Index("idx_ingredient_name_tsv", "name_tsv", postgresql_using="gin"),
         Index("idx_ingredient_validated", "validated"),
         # Add CHECK constraint for density
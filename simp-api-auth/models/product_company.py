@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Numeric
+from sqlalchemy import Column, ForeignKey, Index, Numeric
 from sqlalchemy.dialects.postgresql import UUID
 from .base import Base
 
@@ -8,3 +8,9 @@ class ProductCompany(Base):
     product_id = Column(UUID(as_uuid=True), ForeignKey("products.product_id", ondelete="CASCADE"), primary_key=True)
     company_id = Column(UUID(as_uuid=True), ForeignKey("companies.company_id", ondelete="CASCADE"), primary_key=True)
     price = Column(Numeric(10, 2), nullable=False)
+    unit_price = Column(Numeric(12, 4), nullable=True)  # Price per kg / l / unit, set by triggers/offers.py
+
+    __table_args__ = (
+        # Catalogue filters: one company's prices, and price ranges
+        Index("idx_product_companies_company_price", "company_id", "price"),
+    )
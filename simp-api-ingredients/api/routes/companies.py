@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from typing import Optional
 import uuid
 
 from database.connection import SessionLocal
+from database.pagination import invalidate_counts, paginate, resolve_total
 from models.company import Company
 from schemas.company import CompanyCreate, CompanyOut, PaginatedCompanies
 
@@ -25,16 +27,32 @@ def create_company(company: CompanyCreate, db: Session = Depends(get_db)):
     db.add(new_company)
     db.commit()
     db.refresh(new_company)
+    invalidate_counts("companies")
     return new_company
 
 @router.get("/", response_model=PaginatedCompanies)
-def read_companies(skip: int = Query(0, ge=0), limit: int = Query(10, ge=1, le=100), db: Session = Depends(get_db)):
-    total_companies = db.query(Company).count()
-    companies = db.query(Company).offset(skip).limit(limit).all()
+def read_companies(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    total_mode: str = Query("exact", pattern="^(exact|estimate)$"),
+    db: Session = Depends(get_db)
+):
+    query = db.query(Company)
+    total_companies = resolve_total(db, query, "companies", mode=total_mode)
+    companies, next_cursor = paginate(
+        query,
+        (Company.name, Company.company_id),
+        key=lambda c: (c.name, c.company_id),
+        limit=limit,
+        cursor=cursor,
+        skip=skip,
+    )
 
     return PaginatedCompanies(
         companies=[CompanyOut(company_id=c.company_id, name=c.name) for c in companies],
-        total=total_companies
+        total=total_companies,
+        next_cursor=next_cursor,
     )
 
 @router.get("/{company_id}", response_model=CompanyOut)
@@ -63,4 +81,5 @@ def delete_company(company_id: uuid.UUID, db: Session = Depends(get_db)):
 
     db.delete(company)
     db.commit()
+    invalidate_counts("companies")
     return None
@@ -4,12 +4,15 @@ import uuid
 from decimal import Decimal
 from typing import List, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload, selectinload # Import loading strategies
 from sqlalchemy import func, select, update, insert
 
 # Import database session dependency
-from database.connection import SessionLocal # Adjust path if needed
+from database.connection import SessionLocal, get_async_db # Adjust path if needed
+from database.pagination import invalidate_counts, paginate_async, resolve_total_async
+from database.versioning import bump_version, etag_matches, make_etag
 
 # Import models
 from models.ingredient import Ingredient
@@ -35,6 +38,9 @@ def get_db():
     finally:
         db.close()
 
+# Sort fields that are NOT NULL and therefore safe to seek on with a cursor
+CURSOR_SORT_FIELDS = {"name", "default_unit", "diet_level", "validated", "created_at", "updated_at"}
+
 # === Core Ingredient CRUD ===
 
 @router.post("/", response_model=IngredientOut, status_code=status.HTTP_201_CREATED)
@@ -58,70 +64,101 @@ def create_ingredient(ingredient_in: IngredientCreate, db: Session = Depends(get
     db.add(new_ingredient)
     db.commit()
     db.refresh(new_ingredient)
+    invalidate_counts("ingredients")
     return new_ingredient # FastAPI handles conversion using IngredientOut
 
 @router.get("/", response_model=PaginatedIngredients) # Use PaginatedIngredients schema
-def read_ingredients(
+async def read_ingredients(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(10, ge=1, le=200, description="Maximum number of records"),
     sort_by: Optional[str] = Query("name", description="Field to sort by (e.g., name, default_unit, diet_level)"),
     sort_order: Optional[str] = Query("asc", description="Sort order: 'asc' or 'desc'"),
     validated: Optional[bool] = Query(None, description="Filter by validation status"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    total_mode: str = Query("exact", pattern="^(exact|estimate)$", description="'exact' (cached) or 'estimate' (planner statistics)"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve a paginated list of ingredients with optional filtering and sorting.
+    Pass the returned `next_cursor` back as `cursor` for index-backed keyset paging;
+    `skip` keeps working for callers that page by offset.
     """
-    query = db.query(Ingredient)
+    stmt = select(Ingredient)
 
     # Filtering
+    scope = "all"
     if validated is not None:
-        query = query.filter(Ingredient.validated == validated)
+        stmt = stmt.where(Ingredient.validated == validated)
+        scope = f"validated:{validated}"
 
-    total_items = query.count() # Count before sorting/pagination for accuracy
+    total_items = await resolve_total_async(db, stmt, "ingredients", scope=scope, mode=total_mode)
 
-    # Sorting
-    order_column = getattr(Ingredient, sort_by, Ingredient.name) # Default to name
-    if order_column: # Check if attribute exists
-        if sort_order.lower() == "desc":
-            query = query.order_by(order_column.desc())
-        else:
-            query = query.order_by(order_column.asc())
+    if cursor and sort_by not in CURSOR_SORT_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cursor pagination is not supported when sorting by '{sort_by}'."
+        )
 
-    # Pagination
-    ingredients = query.offset(skip).limit(limit).all()
+    # Sorting (the primary key breaks ties so the sort tuple is unique)
+    order_column = getattr(Ingredient, sort_by, Ingredient.name) # Default to name
+    ingredients, next_cursor = await paginate_async(
+        db,
+        stmt,
+        (order_column, Ingredient.ingredient_id),
+        key=lambda ing: (getattr(ing, order_column.key), ing.ingredient_id),
+        limit=limit,
+        cursor=cursor,
+        skip=skip,
+        descending=sort_order.lower() == "desc",
+        scalars=True,
+    )
 
     return {
         "items": ingredients,
         "total": total_items,
         "skip": skip,
         "limit": limit,
+        "next_cursor": next_cursor,
         # Optional: Calculate total_pages if needed
         # "total_pages": (total_items + limit - 1) // limit
     }
 
 @router.get("/{ingredient_id}", response_model=IngredientOut)
-def read_ingredient(ingredient_id: uuid.UUID, db: Session = Depends(get_db)):
+async def read_ingredient(
+    ingredient_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Retrieve a specific ingredient by its ID.
+    Answers 304 Not Modified when If-None-Match carries the current ETag.
     """
-    db_ingredient = db.query(Ingredient).filter(Ingredient.ingredient_id == ingredient_id).first()
+    db_ingredient = await db.get(Ingredient, ingredient_id)
     if not db_ingredient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Ingredient with ID {ingredient_id} not found"
         )
+
+    etag = make_etag(db_ingredient.version)
+    if etag_matches(request.headers.get("If-None-Match"), etag, weak=True):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return db_ingredient # FastAPI handles conversion
 
 @router.put("/{ingredient_id}", response_model=IngredientOut)
 def update_ingredient(
     ingredient_id: uuid.UUID,
     ingredient_update: IngredientUpdate, # Use update schema
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
     Update an ingredient by its ID. Allows partial updates.
     Checks for name conflicts if the name is being changed.
+    With If-Match, the update is rejected (412) unless the ETag is still current.
     """
     db_ingredient = db.query(Ingredient).filter(Ingredient.ingredient_id == ingredient_id).first()
     if not db_ingredient:
@@ -151,12 +188,16 @@ def update_ingredient(
                 detail=f"Ingredient name '{update_data['name']}' already exists."
             )
 
+    # Compare-and-set the version so concurrent edits cannot overwrite each other
+    bump_version(db, Ingredient, Ingredient.ingredient_id, ingredient_id, db_ingredient.version, if_match)
+
     # Update model instance with provided data
     for key, value in update_data.items():
         setattr(db_ingredient, key, value)
 
     db.commit()
     db.refresh(db_ingredient)
+    response.headers["ETag"] = make_etag(db_ingredient.version)
     return db_ingredient # FastAPI handles conversion
 
 # --- Ingredient Nutrient Linking ---
@@ -8,6 +8,7 @@ import uuid
 
 # Assuming database connection setup is in a 'database' directory
 from database.connection import SessionLocal
+from database.pagination import invalidate_counts, paginate, resolve_total
 # Import the correct model and schemas
 from models.nutrient import Nutrient # Correct model
 from schemas.nutrient import NutrientCreate, NutrientUpdate, NutrientOut # Correct schemas
@@ -61,36 +62,50 @@ def create_nutrient(nutrient_in: NutrientCreate, db: Session = Depends(get_db)):
     db.add(new_nutrient)
     db.commit()
     db.refresh(new_nutrient)
+    invalidate_counts("nutrients")
     return new_nutrient
 
-@router.get("/", response_model=Dict[str, List[NutrientOut] | int])
+@router.get("/", response_model=Dict[str, List[NutrientOut] | int | str | None])
 def read_nutrients(
     skip: int = Query(0, ge=0, description="Number of records to skip for pagination"),
     limit: int = Query(10, ge=1, le=600, description="Maximum number of records to return"), # Increased limit slightly
     sort_by: Optional[str] = Query("nutrient_name", description="Field to sort by (e.g., nutrient_name, unit, primary_group)"),
     sort_order: Optional[str] = Query("asc", description="Sort order: 'asc' or 'desc'"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    total_mode: str = Query("exact", pattern="^(exact|estimate)$", description="'exact' (cached) or 'estimate' (planner statistics)"),
     db: Session = Depends(get_db)
 ):
     """
     Retrieve a paginated list of nutrients.
     """
     query = db.query(Nutrient)
-    total_nutrients = query.count()
+    total_nutrients = resolve_total(db, query, "nutrients", mode=total_mode)
 
-    # Basic Sorting Logic
-    order_column = getattr(Nutrient, sort_by, Nutrient.nutrient_name) # Default sort by name
-    if sort_order.lower() == "desc":
-        query = query.order_by(order_column.desc())
-    else:
-        query = query.order_by(order_column.asc())
+    # Only NOT NULL columns can be seeked on with a cursor
+    if cursor and sort_by not in ("nutrient_name", "unit", "nutrient_decimals"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cursor pagination is not supported when sorting by '{sort_by}'."
+        )
 
-    nutrients = query.offset(skip).limit(limit).all()
+    # Basic Sorting Logic (nutrient_id breaks ties)
+    order_column = getattr(Nutrient, sort_by, Nutrient.nutrient_name) # Default sort by name
+    nutrients, next_cursor = paginate(
+        query,
+        (order_column, Nutrient.nutrient_id),
+        key=lambda n: (getattr(n, order_column.key), n.nutrient_id),
+        limit=limit,
+        cursor=cursor,
+        skip=skip,
+        descending=sort_order.lower() == "desc",
+    )
 
     return {
         "items": nutrients, # Renamed 'nutrients' to 'items' for clarity
         "total": total_nutrients,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": next_cursor,
     }
 
 @router.get("/{nutrient_id}", response_model=NutrientOut)
@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+
+from database.connection import SessionLocal
+from database.pagination import invalidate_counts, paginate, resolve_total
+from database.product_matching import ACCEPTED, PENDING, REJECTED, accept_suggestions, reject_suggestions
+from models.ingredient import Ingredient
+from models.product import Product
+from models.product_match_suggestion import ProductMatchSuggestion
+from schemas.product_match import ProductMatchAccept, ProductMatchOut, ProductMatchReject, ProductMatchReviewOut
+
+router = APIRouter(prefix="", tags=["Product matches"])
+
+def get_db():
+    """Dependency to get a database session."""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@router.get("/", response_model=Dict[str, List[ProductMatchOut] | int | str | None])
+def read_product_matches(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    match_status: str = Query(PENDING, alias="status", pattern=f"^({PENDING}|{ACCEPTED}|{REJECTED})$"),
+    min_score: Optional[float] = Query(None, ge=0, le=100),
+    db: Session = Depends(get_db)
+):
+    """Suggestions written by `python -m database.product_matching`, best first."""
+    query = (
+        db.query(
+            ProductMatchSuggestion,
+            Product.spanish_name.label("product_name"),
+            Ingredient.name.label("ingredient_name"),
+        )
+        .join(Product, Product.product_id == ProductMatchSuggestion.product_id)
+        .join(Ingredient, Ingredient.ingredient_id == ProductMatchSuggestion.ingredient_id)
+        .filter(ProductMatchSuggestion.status == match_status)
+    )
+    if min_score is not None:
+        query = query.filter(ProductMatchSuggestion.score >= min_score)
+
+    total = resolve_total(db, query, "product_match_suggestions", scope=f"{match_status}:{min_score}")
+    rows, next_cursor = paginate(
+        query,
+        (ProductMatchSuggestion.score, ProductMatchSuggestion.suggestion_id),
+        key=lambda row: (row.ProductMatchSuggestion.score, row.ProductMatchSuggestion.suggestion_id),
+        limit=limit,
+        cursor=cursor,
+        descending=True,
+    )
+
+    return {
+        "matches": [
+            ProductMatchOut(
+                suggestion_id=row.ProductMatchSuggestion.suggestion_id,
+                product_id=row.ProductMatchSuggestion.product_id,
+                product_name=row.product_name,
+                ingredient_id=row.ProductMatchSuggestion.ingredient_id,
+                ingredient_name=row.ingredient_name,
+                matched_name=row.ProductMatchSuggestion.matched_name,
+                language_code=row.ProductMatchSuggestion.language_code,
+                score=row.ProductMatchSuggestion.score,
+                rank=row.ProductMatchSuggestion.rank,
+                status=row.ProductMatchSuggestion.status,
+            )
+            for row in rows
+        ],
+        "total": total,
+        "next_cursor": next_cursor,
+    }
+
+@router.post("/accept", response_model=ProductMatchReviewOut)
+def accept_product_matches(review: ProductMatchAccept, db: Session = Depends(get_db)):
+    """Create the IngredientProduct links of the accepted suggestions in bulk."""
+    if (review.suggestion_ids is None) == (review.min_score is None):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide either suggestion_ids or min_score")
+    try:
+        updated = accept_suggestions(db, review.suggestion_ids, review.min_score)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    invalidate_counts("product_match_suggestions")
+    return ProductMatchReviewOut(updated=updated)
+
+@router.post("/reject", response_model=ProductMatchReviewOut)
+def reject_product_matches(review: ProductMatchReject, db: Session = Depends(get_db)):
+    updated = reject_suggestions(db, review.suggestion_ids)
+    db.commit()
+    invalidate_counts("product_match_suggestions")
+    return ProductMatchReviewOut(updated=updated)
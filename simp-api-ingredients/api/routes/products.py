@@ -1,13 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, or_, select, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Dict, List
+from typing import Dict, List, Optional
+import datetime
 import uuid
 
-from database.connection import SessionLocal
+from database.connection import SessionLocal, get_async_db
+from database.pagination import invalidate_counts, paginate, resolve_total
+from database.price_history import biggest_movers, current_prices, min_prices, prices_at
+from database.price_upsert import PriceSheetError, PriceUpsert, parse_price_sheet
+from database.product_search import search_products as run_product_search
 from models.product import Product
 from models.company import Company
 from models.product_company import ProductCompany
-from schemas.product import ProductOut, ProductCreate, ProductCompanyOut
+from schemas.product import (
+    ProductOut, ProductCreate, ProductCompanyOut, ProductSearchHit, ProductSearchOut,
+    ProductPriceOut, ProductPricesOut, PriceMoverOut, PriceUpsertOut,
+)
 
 router = APIRouter(prefix="", tags=["Products"])
 
@@ -19,47 +31,174 @@ def get_db():
     finally:
         db.close()
 
-@router.get("/", response_model=Dict[str, List[ProductOut] | int])
+def _company_prices(company: Optional[str], min_price: Optional[float], max_price: Optional[float]):
+    """
+    Lateral per-product aggregate of the company prices that pass the filters:
+    a json array of the offers (cheapest first) and their lowest unit price.
+    """
+    conditions = [ProductCompany.product_id == Product.product_id]
+    if company:
+        conditions.append(Company.name == company)
+    if min_price is not None:
+        conditions.append(ProductCompany.price >= min_price)
+    if max_price is not None:
+        conditions.append(ProductCompany.price <= max_price)
+
+    offer = func.json_build_object(
+        "company_id", ProductCompany.company_id,
+        "company_name", Company.name,
+        "price", ProductCompany.price,
+        "unit_price", ProductCompany.unit_price,
+    )
+    return (
+        select(
+            func.json_agg(aggregate_order_by(offer, ProductCompany.price)).label("companies"),
+            func.min(ProductCompany.unit_price).label("min_unit_price"),
+        )
+        .select_from(ProductCompany)
+        .join(Company, Company.company_id == ProductCompany.company_id)
+        .where(*conditions)
+        .lateral("company_prices")
+    )
+
+def _to_product_out(product: Product, companies=None, min_unit_price=None) -> ProductOut:
+    return ProductOut(
+        product_id=product.product_id,
+        retail_id=product.retail_id,
+        src_product_id=product.src_product_id,
+        english_name=product.english_name,
+        spanish_name=product.spanish_name,
+        quantity=product.quantity,
+        item_size_value=product.item_size_value,
+        item_measurement=product.item_measurement,
+        min_weight_g=product.min_weight_g,
+        max_weight_g=product.max_weight_g,
+        pricing_dimension=product.pricing_dimension,
+        min_unit_price=min_unit_price,
+        companies=companies or [],
+    )
+
+@router.get("/", response_model=Dict[str, List[ProductOut] | int | str | None])
 def read_products(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    total_mode: str = Query("exact", pattern="^(exact|estimate)$"),
+    sort: str = Query("name", pattern="^(name|unit_price_asc|unit_price_desc)$"),
+    company: Optional[str] = Query(None, description="Only prices of this company (by name)"),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    measurement: Optional[str] = Query(None, max_length=10, description="Item measurement, e.g. g, kg, l, unit"),
+    name: Optional[str] = Query(None, min_length=1, description="Substring of the Spanish or English name"),
+    dimension: Optional[str] = Query(None, pattern="^(mass|volume|count)$", description="Pricing dimension; required by unit-price sorts"),
     db: Session = Depends(get_db)
 ):
-    """Retrieve paginated products with their linked companies."""
-    total_products = db.query(Product).count()
-    products = db.query(Product).offset(skip).limit(limit).all()
-
-    product_list = []
-    for product in products:
-        company_data = (
-            db.query(ProductCompany.company_id, Company.name, ProductCompany.price)
-            .join(Company, ProductCompany.company_id == Company.company_id)
-            .filter(ProductCompany.product_id == product.product_id)
-            .all()
-        )
-
-        company_prices = [
-            {"company_id": cid, "company_name": cname, "price": price}
-            for cid, cname, price in company_data
-        ]
-
-        product_list.append(ProductOut(
-            product_id=product.product_id,
-            retail_id=product.retail_id,
-            src_product_id=product.src_product_id,
-            english_name=product.english_name,
-            spanish_name=product.spanish_name,
-            amount=product.amount,
-            weight=product.weight,
-            measurement=product.measurement,
-            companies=company_prices
+    """
+    Retrieve paginated products with their company prices in one statement.
+    Company and price filters also restrict the listed prices. Unit prices are
+    only comparable within one pricing dimension (per kg, l or unit), so the
+    unit-price sorts require `dimension`.
+    """
+    if sort != "name" and dimension is None:
+        raise HTTPException(status_code=400, detail="Unit-price sorts require a dimension (mass, volume or count)")
+
+    prices = _company_prices(company, min_price, max_price)
+    query = db.query(Product, prices.c.companies, prices.c.min_unit_price).join(prices, true())
+
+    if measurement:
+        query = query.filter(Product.item_measurement == measurement)
+    if dimension:
+        query = query.filter(Product.pricing_dimension == dimension)
+    if name:
+        query = query.filter(or_(
+            Product.spanish_name.icontains(name, autoescape=True),
+            Product.english_name.icontains(name, autoescape=True),
         ))
+    if company or min_price is not None or max_price is not None:
+        query = query.filter(prices.c.companies.is_not(None))
+
+    if sort == "name":
+        columns = (Product.spanish_name, Product.product_id)
+        key = lambda row: (row.Product.spanish_name, row.Product.product_id)
+    else:
+        # NULLs cannot take part in the keyset comparison
+        query = query.filter(prices.c.min_unit_price.is_not(None))
+        columns = (prices.c.min_unit_price, Product.product_id)
+        key = lambda row: (row.min_unit_price, row.Product.product_id)
+
+    filtered = bool(company or measurement or name or dimension or min_price is not None or max_price is not None)
+    scope = f"{sort}:{company}:{min_price}:{max_price}:{measurement}:{name}:{dimension}" if filtered or sort != "name" else "all"
+    total_products = resolve_total(db, query, "products", scope=scope, mode=total_mode)
+    rows, next_cursor = paginate(
+        query,
+        columns,
+        key=key,
+        limit=limit,
+        cursor=cursor,
+        skip=skip,
+        descending=sort == "unit_price_desc",
+    )
 
     return {
-        "products": product_list,
-        "total": total_products
+        "products": [_to_product_out(row.Product, row.companies, row.min_unit_price) for row in rows],
+        "total": total_products,
+        "next_cursor": next_cursor,
     }
 
+@router.get("/search", response_model=ProductSearchOut)
+def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Accent-insensitive search over Spanish and English product names, ranked."""
+    rows, match = run_product_search(db, q, skip=skip, limit=limit)
+    results = [
+        ProductSearchHit(**_to_product_out(product).model_dump(), rank=float(rank))
+        for product, rank in rows
+    ]
+    return ProductSearchOut(results=results, match=match)
+
+@router.get("/price-movers", response_model=List[PriceMoverOut])
+def read_price_movers(
+    days: int = Query(7, ge=1, le=31),
+    limit: int = Query(20, ge=1, le=100),
+    company: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Listings with the largest relative price change over the last `days`."""
+    return biggest_movers(db, days=days, limit=limit, company=company)
+
+@router.get("/{product_id}/prices", response_model=ProductPricesOut)
+def read_product_prices(
+    product_id: uuid.UUID,
+    at: Optional[datetime.datetime] = None,
+    days: int = Query(30, ge=1, le=365),
+    db: Session = Depends(get_db)
+):
+    """Current price per company, with the lowest price over `days` and, optionally, the price at `at`."""
+    if not db.query(Product.product_id).filter(Product.product_id == product_id).first():
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    current = current_prices(db, [product_id])
+    lowest = min_prices(db, [product_id], days=days)
+    past = prices_at(db, [product_id], at) if at else {}
+    company_ids = {company_id for _, company_id in (*current, *lowest, *past)}
+    names = dict(db.query(Company.company_id, Company.name).filter(Company.company_id.in_(company_ids)).all())
+
+    prices = []
+    for company_id in sorted(company_ids, key=lambda company_id: names.get(company_id, "")):
+        key = (product_id, company_id)
+        prices.append(ProductPriceOut(
+            company_id=company_id,
+            company_name=names.get(company_id, ""),
+            price=current.get(key),
+            price_at=past.get(key),
+            min_price=lowest.get(key),
+        ))
+    return ProductPricesOut(product_id=product_id, at=at, days=days, prices=prices)
+
 @router.get("/{product_id}/companies", response_model=List[ProductCompanyOut])
 def get_product_companies(product_id: uuid.UUID, db: Session = Depends(get_db)):
     """Retrieve companies linked to a product."""
@@ -138,21 +277,15 @@ def link_product_to_company(
 @router.post("/", response_model=ProductOut, status_code=status.HTTP_201_CREATED)
 def create_product(product: ProductCreate, db: Session = Depends(get_db)):
     """Create a new product with associated companies."""
-    existing_product = db.query(Product).filter(Product.english_name == product.english_name).first()
+    existing_product = db.query(Product).filter(Product.retail_id == product.retail_id).first()
     if existing_product:
         raise HTTPException(status_code=400, detail="Product already exists")
 
-    new_product = Product(
-        retail_id=product.retail_id,
-        english_name=product.english_name,
-        spanish_name=product.spanish_name,
-        amount=product.amount,
-        weight=product.weight,
-        measurement=product.measurement
-    )
+    new_product = Product(**product.model_dump(exclude={"company_prices"}))
     db.add(new_product)
     db.commit()
     db.refresh(new_product)
+    invalidate_counts("products")
 
     linked_companies = []
     for company_name, price in product.company_prices.items():
@@ -169,20 +302,34 @@ def create_product(product: ProductCreate, db: Session = Depends(get_db)):
             price=price
         )
         db.add(product_company)
-        linked_companies.append({"company_name": company.name, "price": price})
+        linked_companies.append({"company_id": company.company_id, "company_name": company.name, "price": price})
 
     db.commit()
 
-    return ProductOut(
-        product_id=new_product.product_id,
-        retail_id=new_product.retail_id,
-        english_name=new_product.english_name,
-        spanish_name=new_product.spanish_name,
-        amount=new_product.amount,
-        weight=new_product.weight,
-        measurement=new_product.measurement,
-        companies=linked_companies
-    )
+    return _to_product_out(new_product, linked_companies)
+
+
+@router.post("/prices/bulk", response_model=PriceUpsertOut)
+async def bulk_upsert_prices(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Set many prices in one call. The body is streamed: NDJSON rows
+    {"retail_id", "company", "price"} or, with Content-Type text/csv, a CSV with
+    those columns. The sheet is applied in a single transaction; a bad row
+    rejects the whole sheet.
+    """
+    rows = parse_price_sheet(request.stream(), request.headers.get("content-type", ""))
+    try:
+        summary = await PriceUpsert(db).run(rows)
+        await db.commit()
+    except PriceSheetError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if summary["inserted"] or summary["updated"]:
+        await run_in_threadpool(invalidate_counts, "products")
+    if summary["created_companies"]:
+        await run_in_threadpool(invalidate_counts, "companies")
+    return summary
 
 
 @router.get("/retail/{retail_id}", response_model=ProductOut)
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+import redis
+
+from database.handling import async_r, get_user_session_async
+
+logger = logging.getLogger(__name__)
+
+# Published by simp-api-auth whenever a session is revoked or a user deleted.
+SESSION_REVOCATION_CHANNEL = "auth:session_revocations"
+
+# Seconds a verified session is trusted without asking Redis again.
+SESSION_CACHE_TTL = 30
+# Expired entries are swept once the cache grows past this many users.
+SESSION_CACHE_MAX = 10000
+RECONNECT_DELAY = 5
+
+# user_id -> (expires_at, session hash)
+_sessions: Dict[str, Tuple[float, dict]] = {}
+_listener_task: Optional[asyncio.Task] = None
+
+
+def _sweep(now: float) -> None:
+    for user_id in [u for u, (expires_at, _) in _sessions.items() if expires_at <= now]:
+        del _sessions[user_id]
+
+
+async def get_session(user_id: str, auth_token: str) -> Optional[dict]:
+    """
+    Session hash of `user_id` if it still belongs to `auth_token`.
+    Served from the in-process cache while fresh; a miss or a token mismatch
+    (e.g. after a refresh) always re-reads Redis, so only positive results are cached.
+    """
+    now = time.monotonic()
+    cached = _sessions.get(user_id)
+    if cached and cached[0] > now and cached[1].get("auth_token") == auth_token:
+        return cached[1]
+
+    session = await get_user_session_async(user_id)
+    if not session or session.get("auth_token") != auth_token:
+        _sessions.pop(user_id, None)
+        return None
+
+    if len(_sessions) >= SESSION_CACHE_MAX:
+        _sweep(now)
+    _sessions[user_id] = (now + SESSION_CACHE_TTL, session)
+    return session
+
+
+def evict_session(user_id: str) -> None:
+    _sessions.pop(user_id, None)
+
+
+async def listen_for_revocations() -> None:
+    """Evict revoked sessions as soon as the auth service publishes them."""
+    while True:
+        pubsub = async_r.pubsub()
+        try:
+            await pubsub.subscribe(SESSION_REVOCATION_CHANNEL)
+            # Anything published while we were not subscribed is lost.
+            _sessions.clear()
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    evict_session(json.loads(message["data"])["user_id"])
+                except (ValueError, KeyError, TypeError):
+                    logger.warning("Ignoring malformed revocation message: %s", message.get("data"))
+        except redis.RedisError:
+            logger.exception("Session revocation listener lost Redis; resubscribing")
+            _sessions.clear()
+            await asyncio.sleep(RECONNECT_DELAY)
+        finally:
+            await pubsub.reset()
+
+
+def start_revocation_listener() -> None:
+    global _listener_task
+    if _listener_task is None:
+        _listener_task = asyncio.create_task(listen_for_revocations())
+
+
+async def stop_revocation_listener() -> None:
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
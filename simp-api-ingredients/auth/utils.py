@@ -1,10 +1,8 @@
 import os
 from fastapi import Depends, HTTPException, Request
-from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 from database.connection import SessionLocal
-from database.handling import get_user_session
-from models import User
+from auth.session_cache import get_session
 from jwt import decode, ExpiredSignatureError, InvalidTokenError  # Explicit import
 import jwt  # Ensure using PyJWT
 
@@ -27,8 +25,12 @@ def get_db():
         db.close()
 
 
-def get_current_user(request: Request, db: Session = Depends(get_db)):
-    """Extracts and validates the current user based on the session token and CSRF token."""
+async def get_current_user(request: Request):
+    """
+    Extracts and validates the current user based on the session token and CSRF token.
+    Identity and role come from the signed token claims; the session is checked
+    against a short-lived local cache of Redis, so no database query is made.
+    """
     token = request.cookies.get("auth_token")
     csrf_token_header = request.headers.get("X-CSRF-Token")
     csrf_token_cookie = request.cookies.get("csrf_token")
@@ -37,13 +39,18 @@ def get_current_user(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=401, detail="Not authenticated")
 
     try:
-        print(f"Token: {token}")  # Debugging token issues
         payload = decode(token, SECRET_KEY, algorithms=[ALGORITHM])  # Using explicit import
         user_id = payload.get("sub")
+        role = payload.get("role")
+        session_id = payload.get("sid")
 
-        # Validate session using Redis
-        session_data = get_user_session(user_id)
-        if not session_data or session_data.get("auth_token") != token:
+        # Tokens issued before role/sid were signed in must be refreshed
+        if not user_id or not role or not session_id:
+            raise HTTPException(status_code=401, detail="Invalid token")
+
+        # Validate session (revoked sessions are evicted through Redis pub/sub)
+        session_data = await get_session(user_id, token)
+        if not session_data:
             raise HTTPException(status_code=401, detail="Invalid token")
 
         # Validate CSRF token
@@ -51,16 +58,11 @@ def get_current_user(request: Request, db: Session = Depends(get_db)):
         if not csrf_token or session_data.get("csrf_token") != csrf_token:
             raise HTTPException(status_code=403, detail="Invalid CSRF token")
 
-        # Retrieve user from database
-        user = db.query(User).filter(User.user_id == user_id).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
         return {
-            "user_id": user.user_id,
-            "username": user.username,
-            "email": user.email,
-            "role": user.role,
+            "user_id": user_id,
+            "username": payload.get("username"),
+            "role": role,
+            "session_id": session_id,
         }
 
     except ExpiredSignatureError:
@@ -71,7 +73,7 @@ def get_current_user(request: Request, db: Session = Depends(get_db)):
 
 def is_authorized(required_role: str):
     """Dependency to enforce role-based authorization."""
-    def role_checker(user_data: dict = Depends(get_current_user)):
+    async def role_checker(user_data: dict = Depends(get_current_user)):
         if user_data.get("role") != required_role:
             raise HTTPException(status_code=403, detail="Access denied")
         return user_data
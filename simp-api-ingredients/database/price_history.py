@@ -0,0 +1,139 @@
+import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import array_agg, aggregate_order_by
+from sqlalchemy.orm import Session
+
+from models.company import Company
+from models.product import Product
+from models.product_company import ProductCompany
+from models.product_price_history import ProductPriceHistory as History
+
+# product_price_history only stores changes (see simp-database-init/triggers/price_history.py):
+# `price` is the new price (NULL once delisted) and `previous_price` the one it replaced.
+# Every query below bounds `observed_at` from below, so the planner prunes the
+# partitions before that bound instead of scanning the whole history.
+
+PriceKey = Tuple[object, object]  # (product_id, company_id)
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _month_start(moment: datetime.datetime) -> datetime.datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def current_prices(db: Session, product_ids: Sequence) -> Dict[PriceKey, Decimal]:
+    rows = db.execute(
+        select(ProductCompany.product_id, ProductCompany.company_id, ProductCompany.price)
+        .where(ProductCompany.product_id.in_(product_ids))
+    ).all()
+    return {(product_id, company_id): price for product_id, company_id, price in rows}
+
+
+def prices_at(db: Session, product_ids: Sequence, at: datetime.datetime) -> Dict[PriceKey, Optional[Decimal]]:
+    """
+    Price of every company listing `product_ids` at `at`: the last change at
+    or before `at` within its month, otherwise the price replaced by the first
+    later change; pairs unchanged since `at` take today's price.
+    """
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=datetime.timezone.utc)
+    resolved: Dict[PriceKey, Optional[Decimal]] = {}
+    pair = (History.product_id, History.company_id)
+
+    # Last change at or before `at` within its month
+    rows = db.execute(
+        select(*pair, History.price)
+        .distinct(*pair)
+        .where(History.product_id.in_(product_ids), History.observed_at >= _month_start(at), History.observed_at <= at)
+        .order_by(*pair, History.observed_at.desc())
+    ).all()
+    resolved.update({(product_id, company_id): price for product_id, company_id, price in rows})
+
+    # Otherwise the price replaced by the first later change; one query prunes
+    # every partition before `at`
+    rows = db.execute(
+        select(*pair, History.previous_price)
+        .distinct(*pair)
+        .where(History.product_id.in_(product_ids), History.observed_at > at)
+        .order_by(*pair, History.observed_at)
+    ).all()
+    for product_id, company_id, previous_price in rows:
+        resolved.setdefault((product_id, company_id), previous_price)
+
+    for key, price in current_prices(db, product_ids).items():
+        resolved.setdefault(key, price)
+    return {key: price for key, price in resolved.items() if price is not None}
+
+
+def min_prices(db: Session, product_ids: Sequence, days: int = 30) -> Dict[PriceKey, Decimal]:
+    """
+    Lowest price of every company listing `product_ids` over the last `days`,
+    counting the price in effect when the window opened.
+    """
+    since = _utcnow() - datetime.timedelta(days=days)
+    rows = db.execute(
+        select(
+            History.product_id,
+            History.company_id,
+            func.min(History.price),
+            array_agg(aggregate_order_by(History.previous_price, History.observed_at))[1],
+        )
+        .where(History.product_id.in_(product_ids), History.observed_at >= since)
+        .group_by(History.product_id, History.company_id)
+    ).all()
+
+    lowest: Dict[PriceKey, Decimal] = {}
+    for product_id, company_id, min_price, opening_price in rows:
+        candidates = [price for price in (min_price, opening_price) if price is not None]
+        if candidates:
+            lowest[(product_id, company_id)] = min(candidates)
+    for key, price in current_prices(db, product_ids).items():
+        lowest.setdefault(key, price)
+    return lowest
+
+
+def biggest_movers(db: Session, days: int = 7, limit: int = 20, company: Optional[str] = None) -> List[dict]:
+    """
+    Listings whose price moved the most, relatively, over the last `days`:
+    the price before the first change in the window against the latest one.
+    """
+    since = _utcnow() - datetime.timedelta(days=days)
+    changes = (
+        select(
+            History.product_id,
+            History.company_id,
+            array_agg(aggregate_order_by(History.previous_price, History.observed_at))[1].label("start_price"),
+            array_agg(aggregate_order_by(History.price, History.observed_at.desc()))[1].label("end_price"),
+        )
+        .where(History.observed_at >= since)
+        .group_by(History.product_id, History.company_id)
+        .subquery()
+    )
+    change_pct = ((changes.c.end_price - changes.c.start_price) / changes.c.start_price * 100).label("change_pct")
+
+    stmt = (
+        select(
+            changes.c.product_id,
+            Product.spanish_name,
+            Product.english_name,
+            changes.c.company_id,
+            Company.name.label("company_name"),
+            changes.c.start_price,
+            changes.c.end_price,
+            change_pct,
+        )
+        .join(Product, Product.product_id == changes.c.product_id)
+        .join(Company, Company.company_id == changes.c.company_id)
+        .where(changes.c.start_price > 0, changes.c.end_price.is_not(None), changes.c.end_price != changes.c.start_price)
+        .order_by(func.abs(change_pct).desc(), changes.c.product_id, changes.c.company_id)
+        .limit(limit)
+    )
+    if company:
+        stmt = stmt.where(Company.name == company)
+    return [dict(row._mapping) for row in db.execute(stmt)]
@@ -0,0 +1,184 @@
+import csv
+import json
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import AsyncIterator, Dict, List, Tuple
+import uuid
+
+from sqlalchemy import literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.company import Company
+from models.product import Product
+from models.product_company import ProductCompany
+
+# Rows per INSERT ... ON CONFLICT statement (3 bind parameters each)
+BATCH_SIZE = 2000
+# Unknown retail ids echoed back in the summary
+MAX_UNKNOWN_REPORTED = 100
+# Longest accepted line; a longer one fails the sheet without being buffered.
+MAX_LINE_BYTES = 64 * 1024
+
+CSV_CONTENT_TYPES = {"text/csv", "application/csv"}
+
+PriceRow = Tuple[str, str, Decimal]  # (retail_id, company name, price)
+
+
+class PriceSheetError(ValueError):
+    """A row of the price sheet could not be read."""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f"Line {line}: {message}")
+
+
+def _decode(line: bytes, line_number: int) -> str:
+    try:
+        return line.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError:
+        raise PriceSheetError(line_number, "not valid UTF-8 (re-export the sheet as UTF-8)")
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Complete lines of a streamed body, decoded once a whole line has arrived."""
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for line in lines:
+            line_number += 1
+            if len(line) > MAX_LINE_BYTES:
+                raise PriceSheetError(line_number, f"longer than {MAX_LINE_BYTES} bytes")
+            yield _decode(line, line_number)
+        if len(buffer) > MAX_LINE_BYTES:
+            raise PriceSheetError(line_number + 1, f"longer than {MAX_LINE_BYTES} bytes")
+    if buffer:
+        yield _decode(buffer, line_number + 1)
+
+
+def _price_row(line: int, retail_id, company, price) -> PriceRow:
+    retail_id, company = str(retail_id or "").strip(), str(company or "").strip()
+    if not retail_id or not company:
+        raise PriceSheetError(line, "retail_id and company are required")
+    try:
+        price = Decimal(str(price)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    except (InvalidOperation, ValueError):
+        raise PriceSheetError(line, f"invalid price {price!r}")
+    if not price.is_finite() or price < 0:
+        raise PriceSheetError(line, f"invalid price {price!r}")
+    return retail_id, company, price
+
+
+async def parse_price_sheet(chunks: AsyncIterator[bytes], content_type: str) -> AsyncIterator[PriceRow]:
+    """
+    Rows of a streamed price sheet: NDJSON objects with retail_id, company and
+    price, or CSV with a header naming those columns. Blank lines are skipped.
+    """
+    is_csv = content_type.split(";")[0].strip().lower() in CSV_CONTENT_TYPES
+    header: List[str] = []
+    line_number = 0
+    async for line in _lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+        if is_csv:
+            fields = next(csv.reader([line]))
+            if not header:
+                header = [field.strip().lstrip("\ufeff").lower() for field in fields]  # Excel writes a BOM
+                if not {"retail_id", "company", "price"} <= set(header):
+                    raise PriceSheetError(line_number, "CSV header must name retail_id, company and price")
+                continue
+            record = dict(zip(header, fields))
+        else:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                raise PriceSheetError(line_number, "invalid JSON")
+            if not isinstance(record, dict):
+                raise PriceSheetError(line_number, "expected a JSON object")
+        yield _price_row(line_number, record.get("retail_id"), record.get("company"), record.get("price"))
+
+
+class PriceUpsert:
+    """
+    Applies a stream of price rows in batches. Company names are resolved once
+    per call (unknown ones are created, for rows of known products only); each
+    batch costs one product lookup and one INSERT ... ON CONFLICT DO UPDATE
+    that skips unchanged prices.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.companies: Dict[str, uuid.UUID] = {}
+        self.created_companies = 0
+        self.counts = {"inserted": 0, "updated": 0, "unchanged": 0, "unknown_products": 0}
+        self.unknown_retail_ids: List[str] = []
+
+    async def run(self, rows: AsyncIterator[PriceRow]) -> dict:
+        self.companies = dict((await self.db.execute(select(Company.name, Company.company_id))).all())
+        batch: Dict[Tuple[str, str], Decimal] = {}
+        async for retail_id, company, price in rows:
+            # A repeated listing goes into the next statement: ON CONFLICT cannot touch a row twice
+            if (retail_id, company) in batch or len(batch) >= BATCH_SIZE:
+                await self._flush(batch)
+                batch = {}
+            batch[(retail_id, company)] = price
+        if batch:
+            await self._flush(batch)
+        return {**self.counts, "created_companies": self.created_companies, "unknown_retail_ids": self.unknown_retail_ids}
+
+    async def _resolve_companies(self, names: set) -> None:
+        missing = names - self.companies.keys()
+        if not missing:
+            return
+        created = await self.db.execute(
+            pg_insert(Company)
+            .values([{"company_id": uuid.uuid4(), "name": name} for name in missing])
+            .on_conflict_do_nothing(index_elements=[Company.name])
+            .returning(Company.name, Company.company_id)
+        )
+        created = created.all()
+        self.created_companies += len(created)
+        self.companies.update(created)
+        # Created concurrently by another writer
+        missing -= self.companies.keys()
+        if missing:
+            self.companies.update((await self.db.execute(
+                select(Company.name, Company.company_id).where(Company.name.in_(missing))
+            )).all())
+
+    async def _flush(self, batch: Dict[Tuple[str, str], Decimal]) -> None:
+        product_ids = dict((await self.db.execute(
+            select(Product.retail_id, Product.product_id).where(Product.retail_id.in_({retail_id for retail_id, _ in batch}))
+        )).all())
+
+        matched = []
+        for (retail_id, company), price in batch.items():
+            product_id = product_ids.get(retail_id)
+            if product_id is None:
+                self.counts["unknown_products"] += 1
+                if len(self.unknown_retail_ids) < MAX_UNKNOWN_REPORTED:
+                    self.unknown_retail_ids.append(retail_id)
+            else:
+                matched.append((product_id, company, price))
+        if not matched:
+            return
+
+        # Only rows that will be written may create a company
+        await self._resolve_companies({company for _, company, _ in matched})
+        values = [
+            {"product_id": product_id, "company_id": self.companies[company], "price": price}
+            for product_id, company, price in matched
+        ]
+
+        stmt = pg_insert(ProductCompany).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProductCompany.product_id, ProductCompany.company_id],
+            set_={"price": stmt.excluded.price},
+            where=ProductCompany.price.is_distinct_from(stmt.excluded.price),
+        ).returning(literal_column("xmax = 0").label("inserted"))  # xmax is 0 only on freshly inserted rows
+        written = (await self.db.execute(stmt)).scalars().all()
+
+        inserted = sum(1 for is_insert in written if is_insert)
+        self.counts["inserted"] += inserted
+        self.counts["updated"] += len(written) - inserted
+        self.counts["unchanged"] += len(values) - len(written)
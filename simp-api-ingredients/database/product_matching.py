@@ -0,0 +1,288 @@
+import argparse
+import logging
+import re
+import time
+import unicodedata
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from database.connection import SessionLocal, engine
+from database.pagination import invalidate_counts
+from models.ingredient import Ingredient
+from models.ingredient_alias import IngredientAlias
+from models.ingredient_product import IngredientProduct
+from models.product import Product
+from models.product_match_suggestion import ProductMatchSuggestion
+
+logger = logging.getLogger(__name__)
+
+# Pairs scoring below this (rapidfuzz WRatio, 0-100) are not suggested.
+MIN_SCORE = 80
+# Suggestions kept per product.
+TOP_K = 3
+# Candidate blocks share the first BLOCK_PREFIX letters of a word ("tomate" / "tomates").
+BLOCK_PREFIX = 4
+# Blocks scored per pool task.
+BLOCKS_PER_TASK = 200
+WRITE_BATCH = 1000
+
+# Words that carry no identity in a product or ingredient name.
+STOPWORDS = {
+    "de", "del", "la", "el", "los", "las", "con", "sin", "y", "en", "al", "a", "para", "por",
+    "of", "and", "with", "the", "in", "for",
+    "g", "gr", "kg", "ml", "cl", "l", "x", "ud", "uds", "pack",
+}
+_NON_LETTER = re.compile(r"[^a-z]+")
+
+PENDING, ACCEPTED, REJECTED = "pending", "accepted", "rejected"
+
+
+def normalize_name(text: Optional[str]) -> str:
+    """Lower-case, unaccented, letters only, without stopwords."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return " ".join(word for word in _NON_LETTER.split(text) if len(word) > 1 and word not in STOPWORDS)
+
+
+def block_keys(normalized: str) -> Set[str]:
+    return {word[:BLOCK_PREFIX] for word in normalized.split() if len(word) >= 3}
+
+
+# -------------------------
+# Loading
+# -------------------------
+
+def load_ingredient_names(db: Session) -> List[Tuple[object, str, str, Optional[str]]]:
+    """(ingredient_id, original name, normalized name, language_code) of every name and alias."""
+    rows = [(ingredient_id, name, None) for ingredient_id, name in db.execute(select(Ingredient.ingredient_id, Ingredient.name))]
+    rows.extend(db.execute(
+        select(IngredientAlias.ingredient_id, IngredientAlias.alias_name, IngredientAlias.language_code)
+    ).all())
+    names = []
+    for ingredient_id, name, language in rows:
+        normalized = normalize_name(name)
+        if normalized:
+            names.append((ingredient_id, name, normalized, language.lower() if language else None))
+    return names
+
+
+def load_unlinked_products(db: Session) -> List[Tuple[object, str, Optional[str]]]:
+    """(product_id, spanish_name, english_name) of every product without an ingredient link."""
+    linked = select(IngredientProduct.product_id).where(IngredientProduct.product_id == Product.product_id).exists()
+    return db.execute(select(Product.product_id, Product.spanish_name, Product.english_name).where(~linked)).all()
+
+
+def build_blocks(
+    products: Sequence[Tuple[object, str, Optional[str]]],
+    names: Sequence[Tuple[object, str, str, Optional[str]]],
+) -> List[Tuple[List[int], List[str], List[int], List[str]]]:
+    """
+    Group product names and ingredient names of the same language by shared
+    word prefixes. Names without a language join both languages' blocks.
+    Each block is (product indexes, product names, name indexes, ingredient names).
+    """
+    product_side: Dict[Tuple[str, str], Dict[int, str]] = defaultdict(dict)
+    for index, (_, spanish_name, english_name) in enumerate(products):
+        for language, name in (("es", spanish_name), ("en", english_name)):
+            normalized = normalize_name(name)
+            for key in block_keys(normalized):
+                product_side[(language, key)][index * 2 + (language == "en")] = normalized
+
+    name_side: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+    for index, (_, _, normalized, language) in enumerate(names):
+        for key in block_keys(normalized):
+            for block_language in ((language,) if language else ("es", "en")):
+                name_side[(block_language, key)].append(index)
+
+    blocks = []
+    for block, queries in product_side.items():
+        choices = name_side.get(block)
+        if choices:
+            blocks.append((list(queries), list(queries.values()), choices, [names[i][2] for i in choices]))
+    return blocks
+
+
+# -------------------------
+# Scoring (runs in the pool)
+# -------------------------
+
+def _score_blocks(blocks: List[Tuple[List[int], List[str], List[int], List[str]]]) -> List[Tuple[int, int, int]]:
+    """(query index, name index, score) of every pair over MIN_SCORE, one cdist per block."""
+    pairs = []
+    for query_ids, queries, name_ids, choices in blocks:
+        scores = process.cdist(queries, choices, scorer=fuzz.WRatio, score_cutoff=MIN_SCORE, dtype=np.uint8, workers=1)
+        for row, column in zip(*np.nonzero(scores)):
+            pairs.append((query_ids[row], name_ids[column], int(scores[row, column])))
+    return pairs
+
+
+def _chunks(items: List, size: int) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def score_products(
+    products: Sequence[Tuple[object, str, Optional[str]]],
+    names: Sequence[Tuple[object, str, str, Optional[str]]],
+    workers: Optional[int] = None,
+    reviewed: Optional[Set[Tuple[object, object]]] = None,
+) -> List[dict]:
+    """
+    Top TOP_K ingredients per product, scoring the blocks across a process pool.
+    Pairs in `reviewed` (product_id, ingredient_id) are left out before ranking,
+    so a rejected match does not hold a rank.
+    """
+    reviewed = reviewed or set()
+    blocks = build_blocks(products, names)
+    best: Dict[Tuple[int, object], Tuple[int, int, str]] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for pairs in pool.map(_score_blocks, _chunks(blocks, BLOCKS_PER_TASK)):
+            for query_id, name_id, score in pairs:
+                product_index, language = query_id // 2, ("en" if query_id % 2 else "es")
+                ingredient_id = names[name_id][0]
+                if (products[product_index][0], ingredient_id) in reviewed:
+                    continue
+                current = best.get((product_index, ingredient_id))
+                if current is None or score > current[0]:
+                    best[(product_index, ingredient_id)] = (score, name_id, language)
+
+    per_product: Dict[int, List] = defaultdict(list)
+    for (product_index, ingredient_id), (score, name_id, language) in best.items():
+        per_product[product_index].append((score, ingredient_id, names[name_id][1], language))
+
+    suggestions = []
+    for product_index, candidates in per_product.items():
+        candidates.sort(key=lambda candidate: -candidate[0])
+        for rank, (score, ingredient_id, matched_name, language) in enumerate(candidates[:TOP_K], start=1):
+            suggestions.append({
+                "product_id": products[product_index][0],
+                "ingredient_id": ingredient_id,
+                "score": score,
+                "rank": rank,
+                "matched_name": matched_name,
+                "language_code": language,
+            })
+    return suggestions
+
+
+# -------------------------
+# Staging table
+# -------------------------
+
+def load_reviewed_pairs(db: Session) -> Set[Tuple[object, object]]:
+    """(product_id, ingredient_id) of every accepted or rejected suggestion."""
+    return set(db.execute(
+        select(ProductMatchSuggestion.product_id, ProductMatchSuggestion.ingredient_id)
+        .where(ProductMatchSuggestion.status != PENDING)
+    ).all())
+
+
+def write_suggestions(db: Session, product_ids: Sequence, suggestions: List[dict]) -> None:
+    """
+    Replace the pending suggestions of `product_ids`. `suggestions` must not
+    contain reviewed pairs (see load_reviewed_pairs); the conflict clause only
+    covers a review that landed while the job was scoring.
+    """
+    for chunk in _chunks(list(product_ids), WRITE_BATCH):
+        db.execute(
+            delete(ProductMatchSuggestion).where(
+                ProductMatchSuggestion.product_id.in_(chunk), ProductMatchSuggestion.status == PENDING
+            )
+        )
+    for chunk in _chunks(suggestions, WRITE_BATCH):
+        db.execute(
+            pg_insert(ProductMatchSuggestion)
+            .values(chunk)
+            .on_conflict_do_nothing(index_elements=[ProductMatchSuggestion.product_id, ProductMatchSuggestion.ingredient_id])
+        )
+
+
+def run_matching(workers: Optional[int] = None) -> int:
+    """Full pass over every unlinked product; returns the suggestions written."""
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        products = load_unlinked_products(db)
+        names = load_ingredient_names(db)
+        reviewed = load_reviewed_pairs(db)
+    finally:
+        db.close()
+    # Pool processes are forked from here; none of them may reuse the parent's connections.
+    engine.dispose()
+
+    suggestions = score_products(products, names, workers, reviewed)
+
+    db = SessionLocal()
+    try:
+        write_suggestions(db, [product[0] for product in products], suggestions)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    invalidate_counts("product_match_suggestions")
+    logger.info(
+        "Matched %d unlinked products against %d names: %d suggestions in %.1fs",
+        len(products), len(names), len(suggestions), time.monotonic() - started,
+    )
+    return len(suggestions)
+
+
+def accept_suggestions(db: Session, suggestion_ids: Optional[Sequence] = None, min_score: Optional[float] = None) -> int:
+    """
+    Link the ingredients of the given pending suggestions (or of every pending
+    rank-1 suggestion scoring at least `min_score`) in one INSERT ... SELECT.
+    Other pending suggestions of the linked products are dropped.
+    """
+    chosen = select(ProductMatchSuggestion.suggestion_id).where(ProductMatchSuggestion.status == PENDING)
+    if suggestion_ids is not None:
+        chosen = chosen.where(ProductMatchSuggestion.suggestion_id.in_(suggestion_ids))
+    else:
+        chosen = chosen.where(ProductMatchSuggestion.rank == 1, ProductMatchSuggestion.score >= min_score)
+
+    accepted = db.execute(
+        update(ProductMatchSuggestion)
+        .where(ProductMatchSuggestion.suggestion_id.in_(chosen.scalar_subquery()))
+        .values(status=ACCEPTED, reviewed_at=func.now())
+        .returning(ProductMatchSuggestion.ingredient_id, ProductMatchSuggestion.product_id)
+    ).all()
+    if not accepted:
+        return 0
+
+    links = [{"ingredient_id": ingredient_id, "product_id": product_id} for ingredient_id, product_id in accepted]
+    for chunk in _chunks(links, WRITE_BATCH):
+        db.execute(pg_insert(IngredientProduct).values(chunk).on_conflict_do_nothing())
+    for chunk in _chunks(list({link["product_id"] for link in links}), WRITE_BATCH):
+        db.execute(
+            delete(ProductMatchSuggestion).where(
+                ProductMatchSuggestion.product_id.in_(chunk), ProductMatchSuggestion.status == PENDING
+            )
+        )
+    return len(accepted)
+
+
+def reject_suggestions(db: Session, suggestion_ids: Sequence) -> int:
+    result = db.execute(
+        update(ProductMatchSuggestion)
+        .where(ProductMatchSuggestion.suggestion_id.in_(suggestion_ids), ProductMatchSuggestion.status == PENDING)
+        .values(status=REJECTED, reviewed_at=func.now())
+    )
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    # python -m database.product_matching [--workers N]
+    parser = argparse.ArgumentParser(description="Suggest ingredient links for unlinked products.")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(f"Wrote {run_matching(args.workers)} suggestions")
@@ -0,0 +1,69 @@
+from typing import List, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from database.trigram import search_with_fallback, set_word_similarity_threshold
+from models.product import Product
+
+# Minimum word similarity between the query and a product name for the typo fallback.
+FALLBACK_WORD_SIMILARITY = 0.4
+
+
+def _tsqueries(q: str):
+    # The Spanish side is unaccented like `spanish_tsv`
+    return func.websearch_to_tsquery("spanish", func.immutable_unaccent(q)), func.websearch_to_tsquery("english", q)
+
+
+def _fulltext_match(spanish_query, english_query):
+    return or_(Product.spanish_tsv.op("@@")(spanish_query), Product.english_tsv.op("@@")(english_query))
+
+
+def full_text_search(db: Session, q: str, skip: int, limit: int) -> List[Tuple[Product, float]]:
+    """
+    Ranked match against both generated tsvectors (GIN indexes). The Spanish
+    side is unaccented like `spanish_tsv`, so "platano" finds "Plátano".
+    """
+    spanish_query, english_query = _tsqueries(q)
+    rank = (
+        func.ts_rank_cd(Product.spanish_tsv, spanish_query) + func.ts_rank_cd(Product.english_tsv, english_query)
+    ).label("rank")
+
+    return (
+        db.query(Product, rank)
+        .filter(_fulltext_match(spanish_query, english_query))
+        .order_by(rank.desc(), Product.product_id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+def trigram_search(db: Session, q: str, skip: int, limit: int) -> List[Tuple[Product, float]]:
+    """Typo-tolerant name match through the gin_trgm_ops index on `search_name`."""
+    set_word_similarity_threshold(db, FALLBACK_WORD_SIMILARITY)
+    needle = func.immutable_unaccent(func.lower(q))
+    rank = func.word_similarity(needle, Product.search_name).label("rank")
+
+    return (
+        db.query(Product, rank)
+        .filter(needle.op("<%")(Product.search_name))
+        .order_by(rank.desc(), Product.product_id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+def search_products(db: Session, q: str, skip: int = 0, limit: int = 10) -> Tuple[List[Tuple[Product, float]], str]:
+    """
+    Full-text results in either language, or trigram name matches when the
+    query has no full-text hit at all. Returns the (product, rank) rows and
+    the strategy that produced them ("fulltext" or "trigram").
+    """
+    return search_with_fallback(
+        db,
+        _fulltext_match(*_tsqueries(q)),
+        lambda: full_text_search(db, q, skip, limit),
+        lambda: trigram_search(db, q, skip, limit),
+    )
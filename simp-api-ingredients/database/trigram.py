@@ -0,0 +1,31 @@
+from typing import Callable, Tuple, TypeVar
+
+from sqlalchemy import exists, text
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+
+def set_similarity_threshold(db: Session, threshold: float) -> None:
+    """
+    Threshold used by the pg_trgm `%` operator, for the current transaction only.
+    Unlike comparing `similarity(...) >= x`, the operator can use a gin_trgm_ops index.
+    """
+    db.execute(text("SELECT set_config('pg_trgm.similarity_threshold', :value, true)"), {"value": str(threshold)})
+
+
+def set_word_similarity_threshold(db: Session, threshold: float) -> None:
+    """Threshold used by the pg_trgm `<%` operator, for the current transaction only."""
+    db.execute(text("SELECT set_config('pg_trgm.word_similarity_threshold', :value, true)"), {"value": str(threshold)})
+
+
+def search_with_fallback(db: Session, fulltext_match, fulltext: Callable[[], T], trigram: Callable[[], T]) -> Tuple[T, str]:
+    """
+    `fulltext()` when any row satisfies `fulltext_match`, otherwise the typo
+    fallback `trigram()`; returns the results and the strategy ("fulltext" or
+    "trigram"). The choice depends on the query alone, never on the page, so
+    every page of a misspelled search stays on the trigram results.
+    """
+    if db.query(exists().where(fulltext_match)).scalar():
+        return fulltext(), "fulltext"
+    return trigram(), "trigram"
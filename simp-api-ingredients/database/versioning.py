@@ -0,0 +1,52 @@
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+
+def make_etag(version: int) -> str:
+    """Strong ETag for a row version."""
+    return f'"{version}"'
+
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = False) -> bool:
+    """
+    Whether an If-Match / If-None-Match header value matches `etag`.
+    If-None-Match uses weak comparison (a W/ prefix is ignored), If-Match strong.
+    """
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if weak and candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def bump_version(db: Session, model, pk_column, pk, expected_version: int, if_match: Optional[str] = None) -> int:
+    """
+    Compare-and-set the row's version inside the current transaction.
+
+    The row lock taken by the UPDATE serializes concurrent writers; whoever
+    commits second sees zero affected rows and gets 412 (If-Match given)
+    or 409 instead of silently overwriting the first write.
+    """
+    if if_match is not None and not etag_matches(if_match, make_etag(expected_version)):
+        raise HTTPException(status_code=412, detail="Resource has been modified (ETag mismatch)")
+
+    updated = (
+        db.query(model)
+        .filter(pk_column == pk, model.version == expected_version)
+        .update({model.version: model.version + 1}, synchronize_session=False)
+    )
+    if not updated:
+        db.rollback()
+        raise HTTPException(
+            status_code=412 if if_match is not None else 409,
+            detail="Resource was modified concurrently; reload and retry",
+        )
+    return expected_version + 1
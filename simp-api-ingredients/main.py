@@ -2,10 +2,12 @@ from fastapi import FastAPI, Depends
 from dotenv import load_dotenv
 from api.routes.companies import router as companies_router
 from api.routes.products import router as products_router
+from api.routes.product_matches import router as product_matches_router
 from api.routes.nutrients import router as nutrients_router
 from api.routes.ingredients import router as ingredients_router
 from fastapi.middleware.cors import CORSMiddleware
 from auth.utils import is_authorized
+from auth.session_cache import start_revocation_listener, stop_revocation_listener
 
 load_dotenv()
 
@@ -20,12 +22,23 @@ app.add_middleware(
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS", "DELETE", "PUT"],
-    allow_headers=["Content-Type", "X-CSRF-Token", "Authorization"],
+    allow_headers=["Content-Type", "X-CSRF-Token", "Authorization", "If-Match", "If-None-Match"],
+    expose_headers=["ETag"],
 )
 
+@app.on_event("startup")
+async def listen_for_session_revocations():
+    # Evicts cached sessions as soon as simp-api-auth revokes them
+    start_revocation_listener()
+
+@app.on_event("shutdown")
+async def close_session_revocations():
+    await stop_revocation_listener()
+
 # Include all API routes with admin dependency
 app.include_router(companies_router, prefix="/v1/admin/companies", dependencies=[admin_dependency])
 app.include_router(products_router, prefix="/v1/admin/products", dependencies=[admin_dependency])
+app.include_router(product_matches_router, prefix="/v1/admin/product-matches", dependencies=[admin_dependency])
 app.include_router(nutrients_router, prefix="/v1/admin/nutrients", dependencies=[admin_dependency])
 app.include_router(ingredients_router, prefix="/v1/admin/ingredients", dependencies=[admin_dependency])
 
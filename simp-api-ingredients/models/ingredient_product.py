@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey
+from sqlalchemy import Column, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from .base import Base
 
@@ -7,3 +7,8 @@ class IngredientProduct(Base):
 
     ingredient_id = Column(UUID(as_uuid=True), ForeignKey("ingredients.ingredient_id", ondelete="CASCADE"), primary_key=True)
     product_id = Column(UUID(as_uuid=True), ForeignKey("products.product_id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (
+        # Reverse lookup product -> ingredients (the primary key leads with ingredient_id)
+        Index("idx_ingredient_products_product_id", "product_id"),
+    )
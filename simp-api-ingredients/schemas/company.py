@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 import uuid
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class CompanyCreate(BaseModel):
     name: str
@@ -15,3 +15,4 @@ class CompanyOut(BaseModel):
 class PaginatedCompanies(BaseModel):
     companies: List[CompanyOut]
     total: int
+    next_cursor: Optional[str] = None
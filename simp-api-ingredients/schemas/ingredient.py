@@ -70,6 +70,8 @@ class IngredientOut(IngredientBase):
     # Timestamps added from model
     created_at: datetime
     updated_at: datetime
+    # Row version, also sent as the ETag header
+    version: int = 1
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -125,6 +127,8 @@ class PaginatedIngredients(BaseModel):
     total: int
     skip: int
     limit: int
+    # Opaque keyset cursor for the next page; None on the last page
+    next_cursor: Optional[str] = None
     # Optional: Add total_pages if calculated in backend
     # total_pages: Optional[int] = None
 
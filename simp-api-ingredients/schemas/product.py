@@ -1,16 +1,19 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+import datetime
 import uuid
 from typing import List, Optional, Dict
 
 class ProductCreate(BaseModel):
     """Schema for creating a new product."""
-    retail_id: Optional[int] = None
+    retail_id: str
     src_product_id: Optional[uuid.UUID] = None  # Matches DB field
-    english_name: str
+    english_name: Optional[str] = None
     spanish_name: str
-    amount: float
-    weight: float
-    measurement: str
+    quantity: int = Field(1, ge=1)  # Items in the pack
+    item_size_value: float = Field(..., gt=0)  # Size of one item
+    item_measurement: str = Field(..., max_length=10)  # g, kg, ml, cl, l, unit
+    min_weight_g: Optional[int] = None  # Variable-weight items only
+    max_weight_g: Optional[int] = None
     company_prices: Dict[str, float] = {}  # Mapping of company names to prices
 
 class CompanyOut(BaseModel):
@@ -18,25 +21,71 @@ class CompanyOut(BaseModel):
     company_id: uuid.UUID
     company_name: str
     price: float
+    unit_price: Optional[float] = None  # Price per kg / l / unit
 
 class ProductOut(BaseModel):
     """Schema for returning product details."""
     product_id: uuid.UUID
-    retail_id: Optional[int] = None
+    retail_id: str
     src_product_id: Optional[uuid.UUID] = None  # Matches DB field
-    english_name: str
+    english_name: Optional[str] = None
     spanish_name: str
-    amount: float
-    weight: float
-    measurement: str
+    quantity: int
+    item_size_value: float
+    item_measurement: str
+    min_weight_g: Optional[int] = None
+    max_weight_g: Optional[int] = None
+    pricing_dimension: Optional[str] = None  # Unit prices are per kg ('mass'), l ('volume') or unit ('count')
+    min_unit_price: Optional[float] = None  # Cheapest unit price among the listed companies
     companies: List[CompanyOut] = []  # List of associated companies with prices
 
     class Config:
         from_attributes = True  # Ensures SQLAlchemy -> Pydantic conversion
 
+class ProductSearchHit(ProductOut):
+    rank: float
+
+class ProductSearchOut(BaseModel):
+    results: List[ProductSearchHit]
+    match: str  # "fulltext" or "trigram"
+
 class ProductCompanyOut(BaseModel):
     """Schema for returning linked product-company relationships."""
     product_id: uuid.UUID  # Matches DB field
     company_id: uuid.UUID
     company_name: str
     price: float
+
+class ProductPriceOut(BaseModel):
+    """Schema for one company's price of a product, with its history."""
+    company_id: uuid.UUID
+    company_name: str
+    price: Optional[float] = None  # Current price; None once delisted
+    price_at: Optional[float] = None  # Price at the requested date, if any
+    min_price: Optional[float] = None  # Lowest price over the requested window
+
+class ProductPricesOut(BaseModel):
+    product_id: uuid.UUID
+    at: Optional[datetime.datetime] = None
+    days: int
+    prices: List[ProductPriceOut]
+
+class PriceMoverOut(BaseModel):
+    """Schema for a listing whose price changed within the window."""
+    product_id: uuid.UUID
+    spanish_name: str
+    english_name: Optional[str] = None
+    company_id: uuid.UUID
+    company_name: str
+    start_price: float
+    end_price: float
+    change_pct: float
+
+class PriceUpsertOut(BaseModel):
+    """Summary of a bulk price upsert."""
+    inserted: int  # New product-company prices
+    updated: int  # Prices that changed
+    unchanged: int  # Rows repeating the stored price
+    unknown_products: int  # Rows whose retail_id matches no product
+    created_companies: int
+    unknown_retail_ids: List[str] = []  # First unknown retail ids, for fixing the sheet
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+import uuid
+from typing import List, Optional
+
+class ProductMatchOut(BaseModel):
+    """A suggested ingredient link for an unlinked product."""
+    suggestion_id: uuid.UUID
+    product_id: uuid.UUID
+    product_name: str
+    ingredient_id: uuid.UUID
+    ingredient_name: str
+    matched_name: str  # Ingredient name or alias that scored
+    language_code: Optional[str] = None
+    score: float
+    rank: int
+    status: str
+
+class ProductMatchAccept(BaseModel):
+    """Accept the listed suggestions, or every pending best suggestion scoring at least `min_score`."""
+    suggestion_ids: Optional[List[uuid.UUID]] = Field(None, min_length=1, max_length=5000)
+    min_score: Optional[float] = Field(None, ge=0, le=100)
+
+class ProductMatchReject(BaseModel):
+    suggestion_ids: List[uuid.UUID] = Field(..., min_length=1, max_length=5000)
+
+class ProductMatchReviewOut(BaseModel):
+    updated: int
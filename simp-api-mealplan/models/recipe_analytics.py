@@ -1,4 +1,4 @@
-from sqlalchemy import Column, TIMESTAMP, Numeric, ForeignKey
+from sqlalchemy import Column, Index, Integer, TIMESTAMP, Numeric, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
@@ -10,10 +10,17 @@ class RecipeAnalytics(Base):
     
     recipe_analytics_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     recipe_id = Column(UUID(as_uuid=True), ForeignKey("recipes.recipe_id", ondelete="RESTRICT"), nullable=False, unique=True)
-    minimum_price = Column(Numeric(10, 2), nullable=False)  # Calculated minimum price to prepare the recipe
+    minimum_price = Column(Numeric(10, 2), nullable=True)  # Calculated minimum price to prepare the recipe; NULL when no ingredient is priced
     total_calories = Column(Numeric(10, 2))  # Aggregated total calories for the recipe
+    unpriced_ingredients = Column(Integer, nullable=False, default=0, server_default="0")  # Ingredients left out of minimum_price
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     
     # Relationship: links the analytics record to its recipe.
     recipe = relationship("Recipe", backref="analytics")
+
+    __table_args__ = (
+        # Recipe listings sorted/filtered by cost or calories (keyset on recipe_id)
+        Index("idx_recipe_analytics_price_recipe", "minimum_price", "recipe_id"),
+        Index("idx_recipe_analytics_calories_recipe", "total_calories", "recipe_id"),
+    )
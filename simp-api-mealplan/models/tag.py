@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String
+from sqlalchemy import Column, Index, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .base import Base
@@ -13,3 +13,8 @@ class Tag(Base):
 
     # ✅ Correct many-to-many relationship using RecipeTag as `secondary`
     recipes = relationship("Recipe", secondary=RecipeTag, back_populates="tags")
+
+    __table_args__ = (
+        # Serves both the `%` filter and KNN `<->` ordering of the autocomplete
+        Index("idx_tag_name_trgm", "name", postgresql_using="gist", postgresql_ops={"name": "gist_trgm_ops"}),
+    )
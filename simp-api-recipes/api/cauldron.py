@@ -1,11 +1,17 @@
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 import uuid
 
+import redis
+
+from database.cauldron_counters import read_cauldron_data, record_rating, record_usage
+from database.cauldron_membership import set_cauldron_membership, update_cauldron_membership
+from database.cauldron_writes import delete_cauldron_entries, ensure_recipes_exist, set_cauldron_entries_active, upsert_cauldron_entries
 from database.connection import SessionLocal
-from schemas.cauldron import CauldronCreate, CauldronSchema, CauldronUpdate
+from database.pagination import invalidate_counts, paginate, resolve_total
+from database.recipe_cards import tag_names_column
+from schemas.cauldron import CauldronBatch, CauldronBatchOut, CauldronCreate, CauldronDataOut, CauldronRating, CauldronSchema, CauldronUpdate
 from models.cauldron import Cauldron as CauldronModel  # SQLAlchemy model for Cauldron
 from models.recipe import Recipe
 
@@ -22,17 +28,61 @@ def get_db():
 def create_cauldron(cauldron_create: CauldronCreate, db: Session = Depends(get_db)):
     """
     Create a new cauldron entry to add a recipe to the user's cauldron.
+    Adding a recipe that is already there updates its is_active flag instead.
     """
-    # Optionally verify the recipe exists or check for duplicates here.
-    new_cauldron = CauldronModel(
-        user_id=cauldron_create.user_id,
-        recipe_id=cauldron_create.recipe_id,
-        is_active=cauldron_create.is_active,
-    )
-    db.add(new_cauldron)
+    ensure_recipes_exist(db, [cauldron_create.recipe_id])
+    row = upsert_cauldron_entries(
+        db, cauldron_create.user_id, [cauldron_create.recipe_id], is_active=cauldron_create.is_active
+    )[0]
     db.commit()
-    db.refresh(new_cauldron)
-    return new_cauldron
+    if row.inserted:
+        invalidate_counts("cauldron")
+    set_cauldron_membership(row.user_id, row.recipe_id, bool(row.is_active))
+    return CauldronSchema.model_validate(row)
+
+@router.post("/batch", response_model=CauldronBatchOut)
+def batch_cauldron(batch: CauldronBatch, db: Session = Depends(get_db)):
+    """
+    Add, remove, activate or deactivate many recipes of one user's cauldron
+    in a single transaction.
+    """
+    seen = set()
+    for recipe_ids in (batch.add, batch.remove, batch.activate, batch.deactivate):
+        overlap = seen.intersection(recipe_ids)
+        if overlap:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Recipes listed in more than one operation: {', '.join(map(str, overlap))}",
+            )
+        seen.update(recipe_ids)
+
+    try:
+        ensure_recipes_exist(db, list(dict.fromkeys(batch.add)))
+        removed = delete_cauldron_entries(db, batch.user_id, batch.remove)
+        activated = set_cauldron_entries_active(db, batch.user_id, batch.activate, True)
+        deactivated = set_cauldron_entries_active(db, batch.user_id, batch.deactivate, False)
+        upserted = upsert_cauldron_entries(db, batch.user_id, batch.add, is_active=True)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise e
+
+    added = sum(1 for row in upserted if row.inserted)
+    if added or removed:
+        invalidate_counts("cauldron")
+    update_cauldron_membership(
+        batch.user_id,
+        active=activated + [row.recipe_id for row in upserted],
+        inactive=removed + deactivated,
+    )
+
+    return CauldronBatchOut(
+        added=added,
+        removed=len(removed),
+        activated=len(activated),
+        deactivated=len(deactivated),
+        cauldrons=[CauldronSchema.model_validate(row) for row in upserted],
+    )
 
 @router.delete("/{cauldron_id}", response_model=Dict[str, str])
 def delete_cauldron(cauldron_id: uuid.UUID, db: Session = Depends(get_db)):
@@ -47,8 +97,11 @@ def delete_cauldron(cauldron_id: uuid.UUID, db: Session = Depends(get_db)):
     if not cauldron_obj:
         raise HTTPException(status_code=404, detail="Cauldron not found")
     
+    user_id, recipe_id = cauldron_obj.user_id, cauldron_obj.recipe_id
     db.delete(cauldron_obj)
     db.commit()
+    invalidate_counts("cauldron")
+    set_cauldron_membership(user_id, recipe_id, False)
     return {"detail": "Cauldron deleted successfully"}
 
 @router.put("/{cauldron_id}", response_model=CauldronSchema)
@@ -74,35 +127,74 @@ def update_cauldron(
     
     db.commit()
     db.refresh(cauldron_obj)
+    set_cauldron_membership(cauldron_obj.user_id, cauldron_obj.recipe_id, bool(cauldron_obj.is_active))
     return cauldron_obj
 
-@router.get("/user/{user_id}", response_model=Dict[str, Union[List[CauldronSchema], int]])
+def _ensure_cauldron_exists(db: Session, cauldron_id: uuid.UUID) -> None:
+    if not db.query(CauldronModel.cauldron_id).filter(CauldronModel.cauldron_id == cauldron_id).first():
+        raise HTTPException(status_code=404, detail="Cauldron not found")
+
+@router.post("/{cauldron_id}/cook", response_model=CauldronDataOut)
+def cook_cauldron(cauldron_id: uuid.UUID, db: Session = Depends(get_db)):
+    """
+    Record that the user cooked this recipe. The counters are bumped in Redis
+    and written to cauldron_data in batches by the background flusher.
+    """
+    _ensure_cauldron_exists(db, cauldron_id)
+    try:
+        record_usage(cauldron_id)
+    except redis.RedisError:
+        raise HTTPException(status_code=503, detail="Usage counters unavailable")
+    return read_cauldron_data(db, cauldron_id)
+
+@router.post("/{cauldron_id}/rating", response_model=CauldronDataOut)
+def rate_cauldron(cauldron_id: uuid.UUID, rating: CauldronRating, db: Session = Depends(get_db)):
+    """
+    Submit the user's ratings of a cauldron recipe (written behind like usage).
+    """
+    _ensure_cauldron_exists(db, cauldron_id)
+    try:
+        record_rating(cauldron_id, rating.model_dump())
+    except redis.RedisError:
+        raise HTTPException(status_code=503, detail="Rating counters unavailable")
+    return read_cauldron_data(db, cauldron_id)
+
+@router.get("/{cauldron_id}/data", response_model=CauldronDataOut)
+def read_cauldron_stats(cauldron_id: uuid.UUID, db: Session = Depends(get_db)):
+    """
+    Usage and ratings of a cauldron entry, including updates not flushed yet.
+    """
+    _ensure_cauldron_exists(db, cauldron_id)
+    return read_cauldron_data(db, cauldron_id)
+
+@router.get("/user/{user_id}", response_model=Dict[str, Union[List[CauldronSchema], int, str, None]])
 def read_cauldrons_by_user(
     user_id: uuid.UUID,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
     db: Session = Depends(get_db)
 ):
     """
-    Retrieve paginated cauldron entries for a user.
+    Retrieve paginated cauldron entries for a user, newest first.
     """
-    total_cauldrons = (
-        db.query(CauldronModel)
-        .filter(CauldronModel.user_id == user_id)
-        .count()
-    )
+    query = db.query(CauldronModel).filter(CauldronModel.user_id == user_id)
+    total_cauldrons = resolve_total(db, query, "cauldron", scope=f"user:{user_id}")
 
-    cauldrons = (
-        db.query(CauldronModel)
-        .filter(CauldronModel.user_id == user_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    cauldrons, next_cursor = paginate(
+        query,
+        (CauldronModel.created_at, CauldronModel.cauldron_id),
+        key=lambda c: (c.created_at, c.cauldron_id),
+        limit=limit,
+        cursor=cursor,
+        skip=skip,
+        descending=True,
     )
 
     return {
         "cauldrons": cauldrons,
         "total": total_cauldrons,
+        "next_cursor": next_cursor,
     }
 
 @router.get("/recipes", response_model=Dict[str, Any])
@@ -110,44 +202,69 @@ def read_cauldron_recipes(
     user_id: uuid.UUID,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    is_active: Optional[bool] = Query(None, description="Only active (true) or inactive (false) entries"),
     db: Session = Depends(get_db)
 ):
     """
     Retrieve cauldron recipes (i.e. recipes added to the cauldron) for a given user.
     This endpoint joins the cauldron entries with their corresponding recipe data.
     """
-    total = (
-        db.query(func.count(CauldronModel.cauldron_id))
-        .filter(CauldronModel.user_id == user_id)
-        .scalar()
+    filters = [CauldronModel.user_id == user_id]
+    scope = f"user:{user_id}"
+    if is_active is not None:
+        # Served by idx_cauldron_user_active_created_id
+        filters.append(CauldronModel.is_active == is_active)
+        scope += f":active:{is_active}"
+
+    total = resolve_total(
+        db,
+        db.query(CauldronModel).filter(*filters),
+        "cauldron",
+        scope=scope,
     )
 
-    results = (
-        db.query(CauldronModel, Recipe)
+    # Project the card columns directly; tags are aggregated in the same statement.
+    results, next_cursor = paginate(
+        db.query(
+            CauldronModel.cauldron_id,
+            CauldronModel.user_id,
+            CauldronModel.recipe_id,
+            CauldronModel.is_active,
+            CauldronModel.created_at,
+            CauldronModel.updated_at,
+            Recipe.title,
+            Recipe.front_image,
+            tag_names_column(),
+        )
         .join(Recipe, CauldronModel.recipe_id == Recipe.recipe_id)
-        .filter(CauldronModel.user_id == user_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+        .filter(*filters),
+        (CauldronModel.created_at, CauldronModel.cauldron_id),
+        key=lambda row: (row.created_at, row.cauldron_id),
+        limit=limit,
+        cursor=cursor,
+        skip=skip,
+        descending=True,
     )
 
     cauldron_recipes = []
-    for cauldron, recipe in results:
+    for row in results:
         cauldron_recipes.append({
-            "cauldron_id": str(cauldron.cauldron_id),
-            "user_id": str(cauldron.user_id),
-            "recipe_id": str(cauldron.recipe_id),
-            "is_active": cauldron.is_active,
-            "created_at": cauldron.created_at.isoformat(),
-            "updated_at": cauldron.updated_at.isoformat(),
-            "title": recipe.title,
-            "tags": [tag.name for tag in recipe.tags],
-            "front_image": recipe.front_image,
+            "cauldron_id": str(row.cauldron_id),
+            "user_id": str(row.user_id),
+            "recipe_id": str(row.recipe_id),
+            "is_active": row.is_active,
+            "created_at": row.created_at.isoformat(),
+            "updated_at": row.updated_at.isoformat(),
+            "title": row.title,
+            "tags": list(row.tags or []),
+            "front_image": row.front_image,
         })
 
     return {
         "cauldron_recipes": cauldron_recipes,
         "total_cauldron_recipes": total,
+        "next_cursor": next_cursor,
     }
 
 @router.delete("/user/{user_id}/recipe/{recipe_id}", response_model=Dict[str, str])
@@ -174,4 +291,6 @@ def delete_cauldron_by_user_and_recipe(
         )
     db.delete(cauldron_obj)
     db.commit()
+    invalidate_counts("cauldron")
+    set_cauldron_membership(user_id, recipe_id, False)
     return {"detail": "Cauldron entry deleted successfully"}
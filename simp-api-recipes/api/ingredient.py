@@ -1,9 +1,13 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 import uuid
 from database.connection import SessionLocal
+from database.ingredient_export import parse_fields, stream_ingredients
+from database.ingredient_index import ingredient_index
+from database.versioning import etag_matches, make_etag
 from models.ingredient import Ingredient
 from schemas.ingredient import IngredientCreate, IngredientOut, IngredientSchema
 
@@ -17,15 +21,28 @@ def get_db():
         db.close()
 
 @router.get("/", response_model=List[IngredientOut])
-def get_all_ingredients(db: Session = Depends(get_db)):
-    ingredients = db.query(Ingredient).all()
-    return ingredients
+def get_all_ingredients(
+    fields: Optional[str] = Query(None, description="Comma separated columns, e.g. 'ingredient_id,name' (default)"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="'json' array or newline-delimited 'ndjson'"),
+):
+    # Streamed straight from a server-side cursor instead of materializing the catalogue
+    projection = parse_fields(fields)
+    ndjson = format == "ndjson"
+    return StreamingResponse(
+        stream_ingredients(projection, ndjson=ndjson),
+        media_type="application/x-ndjson" if ndjson else "application/json",
+    )
 
 @router.get("/{ingredient_id}", response_model=IngredientOut)
-def get_ingredient(ingredient_id: str, db: Session = Depends(get_db)):
+def get_ingredient(ingredient_id: str, request: Request, response: Response, db: Session = Depends(get_db)):
     ingredient = db.query(Ingredient).filter(Ingredient.ingredient_id == ingredient_id).first()
     if not ingredient:
         raise HTTPException(status_code=404, detail="Ingredient not found")
+
+    etag = make_etag(ingredient.version)
+    if etag_matches(request.headers.get("If-None-Match"), etag, weak=True):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return ingredient
 
 @router.post("/", response_model=IngredientOut)
@@ -63,6 +80,13 @@ def search_ingredients(
     search: str = Query(..., min_length=3),
     db: Session = Depends(get_db)
 ):
+    # Served from the in-process index; Postgres is only asked until it has loaded
+    if ingredient_index.ready:
+        return [
+            IngredientSchema(ingredient_id=ingredient_id, name=name, default_unit=default_unit)
+            for ingredient_id, name, default_unit in ingredient_index.search(search, limit=10)
+        ]
+
     # ✅ Use `word_similarity()` for better ranking
     ingredients = (
         db.query(Ingredient)
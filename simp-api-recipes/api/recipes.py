@@ -1,22 +1,33 @@
-from typing import Dict, List, Union
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import delete
-from sqlalchemy.orm import Session, joinedload, aliased
-from sqlalchemy import case, and_
+import json
+from typing import Dict, List, Optional, Union
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 import uuid
 from uuid import UUID
 from fuzzywuzzy import process  
 from database.auth.authorize import get_current_user
-from database.connection import SessionLocal
-from models.cauldron import Cauldron
-from models.ingredient import Ingredient
+from database.nutrition_matrix import nutrition_matrix, recipe_nutrition
+from database.unit_conversion import convert_recipes
+from database.cauldron_membership import in_cauldron_flags, in_cauldron_flags_async
+from database.connection import SessionLocal, get_async_db
+from database.pagination import invalidate_counts, paginate_async, resolve_total_async
+from database.recipe_cards import recipe_cards_select, to_recipe_out
+from database.recipe_documents import get_recipe_document_async, invalidate_recipe_document
+from database.recipe_import import LineReader, RecipeImporter
+from database.recipe_search import search_recipes as run_recipe_search
+from database.recipe_writes import sync_recipe_children, write_recipe_children
+from database.versioning import bump_version, etag_matches, make_etag
+from models.enums import LifeStageEnum
 from models.recipe import Recipe
+from models.recipe_analytics import RecipeAnalytics
 from models.recipe_image import RecipeImage
 from models.recipe_ingredient import RecipeIngredient
 from models.recipe_step import RecipeStep
 from models.recipe_tag import RecipeTag
-from models.tag import Tag
-from schemas.recipe import  EditRecipe, RecipeOut, CreateRecipe, CreateRecipeIngredient, CreateRecipeImage, CreateRecipeTag
+from schemas.recipe import  EditRecipe, RecipeOut, RecipeUpdateOut, RecipeImportOut, RecipeSearchOut, RecipeNutritionOut, RecipeNutritionBatch, RecipeConversionOut, RecipeConversionBatch, CreateRecipe, CreateRecipeIngredient, CreateRecipeImage, CreateRecipeTag
 
 router = APIRouter(tags=["recipes"])
 
@@ -29,90 +40,174 @@ def get_db():
         db.close()
 
 
-@router.get("/", response_model=Dict[str, List[RecipeOut] | int])
-def read_recipes(
+# sort -> (keyset columns, descending); price/calories sorts read recipe_analytics
+RECIPE_SORTS = {
+    "newest": ((Recipe.created_at, Recipe.recipe_id), True),
+    "price_asc": ((RecipeAnalytics.minimum_price, Recipe.recipe_id), False),
+    "price_desc": ((RecipeAnalytics.minimum_price, Recipe.recipe_id), True),
+    "calories_asc": ((RecipeAnalytics.total_calories, Recipe.recipe_id), False),
+    "calories_desc": ((RecipeAnalytics.total_calories, Recipe.recipe_id), True),
+}
+
+@router.get("/", response_model=Dict[str, List[RecipeOut] | int | str | None])
+async def read_recipes(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    total_mode: str = Query("exact", pattern="^(exact|estimate)$"),
+    sort: str = Query("newest", pattern="^(newest|price_asc|price_desc|calories_asc|calories_desc)$"),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    min_calories: Optional[float] = Query(None, ge=0),
+    max_calories: Optional[float] = Query(None, ge=0),
+    include_partially_priced: bool = Query(False, description="Keep recipes with unpriced ingredients in price sorts and filters"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_user)
 ):
-    total_recipes = db.query(Recipe).count()
-    recipes = db.query(Recipe).offset(skip).limit(limit).all()
+    stmt = recipe_cards_select()
+    count_stmt = select(Recipe.recipe_id)
+    count_table, scope = "recipes", "all"
+
+    filters = []
+    if min_price is not None:
+        filters.append(RecipeAnalytics.minimum_price >= min_price)
+    if max_price is not None:
+        filters.append(RecipeAnalytics.minimum_price <= max_price)
+    if min_calories is not None:
+        filters.append(RecipeAnalytics.total_calories >= min_calories)
+    if max_calories is not None:
+        filters.append(RecipeAnalytics.total_calories <= max_calories)
+    if sort.startswith("calories"):
+        # NULLs cannot take part in the keyset comparison
+        filters.append(RecipeAnalytics.total_calories.is_not(None))
+    if sort.startswith("price") or min_price is not None or max_price is not None:
+        # A recipe priced from some of its ingredients would rank as cheaper than it is
+        filters.append(RecipeAnalytics.minimum_price.is_not(None))
+        if not include_partially_priced:
+            filters.append(RecipeAnalytics.unpriced_ingredients == 0)
+
+    if sort != "newest" or filters:
+        # Recipes without computed analytics are left out of cost/calorie listings
+        stmt = stmt.join(RecipeAnalytics, RecipeAnalytics.recipe_id == Recipe.recipe_id).add_columns(
+            RecipeAnalytics.minimum_price, RecipeAnalytics.unpriced_ingredients, RecipeAnalytics.total_calories
+        ).where(*filters)
+        count_stmt = count_stmt.join(RecipeAnalytics, RecipeAnalytics.recipe_id == Recipe.recipe_id).where(*filters)
+        count_table = "recipe_analytics"
+        scope = f"{sort}:{min_price}:{max_price}:{min_calories}:{max_calories}:{include_partially_priced}"
+
+    columns, descending = RECIPE_SORTS[sort]
+    total_recipes = await resolve_total_async(db, count_stmt, count_table, scope=scope, mode=total_mode)
+    cards, next_cursor = await paginate_async(
+        db,
+        stmt,
+        columns,
+        key=lambda card: tuple(getattr(card, column.key) for column in columns),
+        limit=limit,
+        cursor=cursor,
+        skip=skip,
+        descending=descending,
+    )
+
+    # One SMISMEMBER against the viewer's cauldron set flags the whole page
+    flags = await in_cauldron_flags_async(db, current_user.get("user_id"), [card.recipe_id for card in cards])
 
     return {
-        "recipes": [
-            RecipeOut(
-                recipe_id=str(recipe.recipe_id),
-                title=recipe.title,
-                front_image=recipe.front_image,
-                tags=[tag.name for tag in recipe.tags],
-                in_cauldron=False  # No cauldron context here
-            )
-            for recipe in recipes
-        ],
-        "total": total_recipes  
+        "recipes": [to_recipe_out(card, flag) for card, flag in zip(cards, flags)],
+        "total": total_recipes,
+        "next_cursor": next_cursor,
     }
 
-@router.get("/author-id/{author_id}/", response_model=Dict[str, List[RecipeOut] | int])
-def read_user_recipes(
+@router.get("/author-id/{author_id}/", response_model=Dict[str, List[RecipeOut] | int | str | None])
+async def read_user_recipes(
     author_id: uuid.UUID,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=20),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_user)
 ):
-    total_recipes = db.query(Recipe).filter(Recipe.author_id == author_id).count()
-    
-    # Use an alias for Cauldron
-    cauldron_alias = aliased(Cauldron)
-    
-    # Pass the tuple directly instead of a list.
-    in_cauldron_case = case(
-        (cauldron_alias.recipe_id != None, True),
-        else_=False
-    ).label("in_cauldron")
-    
-    recipes_query = (
-        db.query(Recipe, in_cauldron_case)
-        .outerjoin(
-            cauldron_alias,
-            and_(
-                Recipe.recipe_id == cauldron_alias.recipe_id,
-                cauldron_alias.user_id == author_id,
-                cauldron_alias.is_active == True
-            )
-        )
-        .filter(Recipe.author_id == author_id)
-        .offset(skip)
-        .limit(limit)
+    total_recipes = await resolve_total_async(
+        db,
+        select(Recipe.recipe_id).where(Recipe.author_id == author_id),
+        "recipes",
+        scope=f"author:{author_id}",
     )
-    
-    results = recipes_query.all()
-    
-    # results is a list of tuples: (Recipe, in_cauldron)
-    recipes_out = [
-        RecipeOut(
-            recipe_id=str(recipe.recipe_id),
-            title=recipe.title,
-            front_image=recipe.front_image,
-            tags=[tag.name for tag in recipe.tags],
-            in_cauldron=in_cauldron
-        )
-        for recipe, in_cauldron in results
-    ]
-    
+
+    cards, next_cursor = await paginate_async(
+        db,
+        recipe_cards_select().where(Recipe.author_id == author_id),
+        (Recipe.created_at, Recipe.recipe_id),
+        key=lambda card: (card.created_at, card.recipe_id),
+        limit=limit,
+        cursor=cursor,
+        skip=skip,
+        descending=True,
+    )
+
+    # One SMISMEMBER against the viewer's cauldron set flags the whole page
+    flags = await in_cauldron_flags_async(db, current_user.get("user_id"), [card.recipe_id for card in cards])
+
     return {
-        "recipes": recipes_out,
-        "total": total_recipes
+        "recipes": [to_recipe_out(card, flag) for card, flag in zip(cards, flags)],
+        "total": total_recipes,
+        "next_cursor": next_cursor,
     }
 
+@router.get("/search/", response_model=RecipeSearchOut)
+def search_recipes(
+    q: str = Query(..., min_length=2, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    results, match = run_recipe_search(db, q, skip=skip, limit=limit)
+    flags = in_cauldron_flags(db, current_user.get("user_id"), [hit.recipe_id for hit in results])
+    for hit, flag in zip(results, flags):
+        hit.in_cauldron = flag
+    return RecipeSearchOut(results=results, match=match)
+
 @router.get("/recipe-id/{recipe_id}/", response_model=EditRecipe)
-def read_recipe(
+async def read_recipe(
     recipe_id: uuid.UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # The document is serialized by Postgres (or Redis on a cache hit), so it is
+    # passed through as-is instead of being re-validated field by field.
+    document = await get_recipe_document_async(db, recipe_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+
+    etag = make_etag(json.loads(document)["version"])
+    if etag_matches(request.headers.get("If-None-Match"), etag, weak=True):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=document, media_type="application/json", headers={"ETag": etag})
+
+@router.get("/{recipe_id}/nutrition/", response_model=RecipeNutritionOut)
+def read_recipe_nutrition(
+    recipe_id: UUID,
+    life_stage: Optional[LifeStageEnum] = None,
     db: Session = Depends(get_db)
 ):
-    recipe = db.query(Recipe).filter(Recipe.recipe_id == recipe_id).first()
-    if not recipe:
+    if not nutrition_matrix.ready:
+        raise HTTPException(status_code=503, detail="Nutrition data is still loading")
+    profiles = recipe_nutrition(db, [recipe_id], life_stage)
+    if not profiles:
         raise HTTPException(status_code=404, detail="Recipe not found")
-    return recipe
+    return profiles[0]
+
+@router.post("/nutrition/batch/", response_model=List[RecipeNutritionOut])
+def read_recipes_nutrition(batch: RecipeNutritionBatch, db: Session = Depends(get_db)):
+    # Unknown recipe ids are left out of the response
+    if not nutrition_matrix.ready:
+        raise HTTPException(status_code=503, detail="Nutrition data is still loading")
+    return recipe_nutrition(db, batch.recipe_ids, batch.life_stage)
+
+@router.post("/conversions/batch/", response_model=List[RecipeConversionOut])
+def convert_recipe_ingredients(batch: RecipeConversionBatch, db: Session = Depends(get_db)):
+    # Unknown recipe ids are left out of the response
+    return convert_recipes(db, batch.recipe_ids, batch.unresolved_only)
 
 @router.post("/", response_model=RecipeOut)
 def create_recipe(recipe: CreateRecipe, db: Session = Depends(get_db)):
@@ -123,80 +218,60 @@ def create_recipe(recipe: CreateRecipe, db: Session = Depends(get_db)):
             description=recipe.description,
             front_image=recipe.front_image,
             author_id=recipe.author_id,
+            servings=recipe.servings,
             validated=False,
         )
         db.add(new_recipe)
-        
-        # Process tags.
-        for tag_input in recipe.tags:
-            if tag_input.tag_id:
-                tag_obj = db.query(Tag).filter(Tag.tag_id == tag_input.tag_id).first()
-                if not tag_obj:
-                    raise HTTPException(status_code=400, detail=f"Tag {tag_input.tag_id} not found.")
-            else:
-                tag_obj = db.query(Tag).filter(Tag.name == tag_input.name).first()
-                if not tag_obj:
-                    tag_obj = Tag(name=tag_input.name)
-                    db.add(tag_obj)
-                    db.flush()  # Ensure tag_obj gets an id.
-            new_recipe.tags.append(tag_obj)
-        
-        # Process ingredients.
-        for ing_input in recipe.ingredients:
-            # Search by name if no valid ingredient_id provided.
-            ingredient_obj = db.query(Ingredient).filter(Ingredient.name.ilike(ing_input.ingredient_name)).first()
-            if not ingredient_obj:
-                ingredient_obj = Ingredient(name=ing_input.ingredient_name)
-                db.add(ingredient_obj)
-                db.flush()  # Ensure ingredient_obj gets an id.
-            new_recipe_ing = RecipeIngredient(
-                recipe_id=new_recipe.recipe_id,
-                ingredient_id=ingredient_obj.ingredient_id,
-                amount=ing_input.amount,
-                measurement=ing_input.measurement,
-                position=ing_input.position,
-            )
-            db.add(new_recipe_ing)
-        
-        # Process steps.
-        for step_input in recipe.steps:
-            new_step = RecipeStep(
-                recipe_id=new_recipe.recipe_id,
-                step_number=step_input.step_number,
-                description=step_input.description,
-                image_url=step_input.image_url,
-            )
-            db.add(new_step)
-        
-        # Process images.
-        for image_input in recipe.images:
-            # Skip insertion if image_url is empty (or whitespace)
-            if not image_input.image_url or not image_input.image_url.strip():
-                continue
-            new_image = RecipeImage(
-                recipe_id=new_recipe.recipe_id,
-                image_url=image_input.image_url,
-            )
-            db.add(new_image)
-        
+        db.flush()  # The child rows below reference the recipe id.
+
+        # Tags and ingredients are resolved in bulk, children inserted with executemany.
+        tag_names = write_recipe_children(db, new_recipe.recipe_id, recipe)
+
         db.commit()
         db.refresh(new_recipe)
+        invalidate_counts("recipes")
 
         return RecipeOut(
             recipe_id=str(new_recipe.recipe_id),
             title=new_recipe.title,
             front_image=new_recipe.front_image,
-            tags=[tag.name for tag in new_recipe.tags],
+            tags=tag_names,
             in_cauldron=False  # New recipe not in cauldron by default.
         )
     except Exception as e:
         db.rollback()
         raise e
 
-@router.put("/update/{recipe_id}/", response_model=RecipeOut)
+@router.post("/import/", response_model=RecipeImportOut)
+async def import_recipes(request: Request, db: Session = Depends(get_db)):
+    """
+    Bulk import of newline-delimited CreateRecipe documents (application/x-ndjson).
+    The body is consumed as a stream and written in chunked transactions;
+    the response reports the outcome of every non-empty line.
+    """
+    importer = RecipeImporter(db)
+    reader = LineReader()
+    async for chunk in request.stream():
+        for line_number, line in reader.feed(chunk):
+            importer.add(line_number, line)
+        if importer.chunk_ready:
+            await run_in_threadpool(importer.flush)
+
+    for line_number, line in reader.close():
+        importer.add(line_number, line)
+    await run_in_threadpool(importer.flush)
+
+    result = importer.summary()
+    if result.created:
+        invalidate_counts("recipes")
+    return result
+
+@router.put("/update/{recipe_id}/", response_model=RecipeUpdateOut)
 def update_recipe(
     recipe_id: UUID,
     recipe: CreateRecipe,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     try:
@@ -204,77 +279,34 @@ def update_recipe(
         if not existing_recipe:
             raise HTTPException(status_code=404, detail="Recipe not found")
 
-        existing_recipe.title = recipe.title
-        existing_recipe.description = recipe.description
-        existing_recipe.front_image = recipe.front_image
-        existing_recipe.author_id = recipe.author_id
-
-        # Update Tags.
-        existing_recipe.tags.clear()
-        for tag_input in recipe.tags:
-            if tag_input.tag_id:
-                tag_obj = db.query(Tag).filter(Tag.tag_id == tag_input.tag_id).first()
-                if not tag_obj:
-                    raise HTTPException(status_code=400, detail=f"Tag {tag_input.tag_id} not found.")
-            else:
-                tag_obj = db.query(Tag).filter(Tag.name == tag_input.name).first()
-                if not tag_obj:
-                    tag_obj = Tag(name=tag_input.name)
-                    db.add(tag_obj)
-                    db.flush()
-            existing_recipe.tags.append(tag_obj)
-
-        # Update Ingredients.
-        db.query(RecipeIngredient).filter(RecipeIngredient.recipe_id == recipe_id).delete()
-        for ing_input in recipe.ingredients:
-            if ing_input.ingredient_id:
-                ingredient_obj = db.query(Ingredient).filter(Ingredient.ingredient_id == ing_input.ingredient_id).first()
-                if not ingredient_obj:
-                    raise HTTPException(status_code=400, detail=f"Ingredient {ing_input.ingredient_id} not found.")
-            else:
-                ingredient_obj = db.query(Ingredient).filter(Ingredient.name == ing_input.ingredient_name).first()
-                if not ingredient_obj:
-                    ingredient_obj = Ingredient(name=ing_input.ingredient_name)
-                    db.add(ingredient_obj)
-                    db.flush()
-            new_recipe_ing = RecipeIngredient(
-                recipe_id=existing_recipe.recipe_id,
-                ingredient_id=ingredient_obj.ingredient_id,
-                amount=ing_input.amount,
-                measurement=ing_input.measurement,
-                position=ing_input.position,
-            )
-            db.add(new_recipe_ing)
-
-        # Update Steps.
-        db.query(RecipeStep).filter(RecipeStep.recipe_id == recipe_id).delete()
-        for step_input in recipe.steps:
-            new_step = RecipeStep(
-                recipe_id=existing_recipe.recipe_id,
-                step_number=step_input.step_number,
-                description=step_input.description,
-                image_url=step_input.image_url,
-            )
-            db.add(new_step)
-
-        # Update Images.
-        db.query(RecipeImage).filter(RecipeImage.recipe_id == recipe_id).delete()
-        for image_input in recipe.images:
-            new_image = RecipeImage(
-                recipe_id=existing_recipe.recipe_id,
-                image_url=image_input.image_url,
-            )
-            db.add(new_image)
+        # Claim the next version first: the row lock keeps concurrent edits from
+        # interleaving their changes to the child rows below.
+        new_version = bump_version(db, Recipe, Recipe.recipe_id, recipe_id, existing_recipe.version, if_match)
+
+        changed_fields = []
+        for field in ("title", "description", "front_image", "author_id", "servings"):
+            value = getattr(recipe, field)
+            if getattr(existing_recipe, field) != value:
+                setattr(existing_recipe, field, value)
+                changed_fields.append(field)
+
+        # Only the child rows that differ from the payload are written.
+        changes = sync_recipe_children(db, recipe_id, recipe)
+        changes.changed_fields = changed_fields
 
         db.commit()
         db.refresh(existing_recipe)
+        # The cached document of the previous version can no longer be served.
+        invalidate_recipe_document(recipe_id, new_version - 1)
+        response.headers["ETag"] = make_etag(new_version)
 
-        return RecipeOut(
+        return RecipeUpdateOut(
             recipe_id=str(existing_recipe.recipe_id),
             title=existing_recipe.title,
             front_image=existing_recipe.front_image,
-            tags=[tag.name for tag in existing_recipe.tags],
-            in_cauldron=False  # Default value; update if needed.
+            tags=changes.tag_names,
+            in_cauldron=False,  # Default value; update if needed.
+            changes=changes,
         )
     except Exception as e:
         db.rollback()
@@ -297,8 +329,12 @@ def delete_recipe(
     db.query(RecipeStep).filter(RecipeStep.recipe_id == recipe.recipe_id).delete(synchronize_session=False)
     db.query(RecipeImage).filter(RecipeImage.recipe_id == recipe.recipe_id).delete(synchronize_session=False)
     db.execute(delete(RecipeTag).where(RecipeTag.c.recipe_id == recipe.recipe_id))
+    db.query(RecipeAnalytics).filter(RecipeAnalytics.recipe_id == recipe.recipe_id).delete(synchronize_session=False)
     
+    version = recipe.version
     db.delete(recipe)
     db.commit()
+    invalidate_counts("recipes")
+    invalidate_recipe_document(recipe_id, version)
     
     return {"message": "Recipe deleted successfully"}
\ No newline at end of file
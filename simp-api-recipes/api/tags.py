@@ -1,11 +1,12 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 import uuid
 import uuid as UUID
 
 from database.connection import SessionLocal
+from database.trigram import set_similarity_threshold
 from models.recipe import Recipe
 from models.recipe_image import RecipeImage
 from models.recipe_ingredient import RecipeIngredient
@@ -16,6 +17,12 @@ from schemas.recipe import RecipeOut, RetrieveTag
 
 router = APIRouter(tags=["tags"])
 
+# Tag autocomplete tuning
+AUTOCOMPLETE_SIMILARITY = 0.3  # pg_trgm.similarity_threshold for the `%` operator
+AUTOCOMPLETE_CANDIDATES = 50   # Nearest tags fetched through the index before re-ranking
+AUTOCOMPLETE_LIMIT = 10
+POPULARITY_WEIGHT = 0.1        # Score multiplier per ln(1 + recipes using the tag)
+
 # Dependency to get the database session
 def get_db():
     db = SessionLocal()
@@ -29,15 +36,35 @@ def search_tags(
     search: str = Query(..., min_length=3),
     db: Session = Depends(get_db)
 ):
-    # Use similarity and word_similarity for ranking
-    tags = (
-        db.query(Tag)
-        .filter(func.similarity(Tag.name, search) >= 0.4)  # Adjust threshold if needed
-        .order_by(func.word_similarity(Tag.name, search).desc())
-        .limit(10)
+    # `%` and `<->` are answered by the gist_trgm_ops index, so only the nearest
+    # candidates are read no matter how large the tag vocabulary grows.
+    set_similarity_threshold(db, AUTOCOMPLETE_SIMILARITY)
+    distance = Tag.name.op("<->")(search)
+    candidates = (
+        select(Tag.tag_id, Tag.name, distance.label("distance"))
+        .where(Tag.name.op("%")(search))
+        .order_by(distance)
+        .limit(AUTOCOMPLETE_CANDIDATES)
+        .subquery()
+    )
+
+    # Re-rank the candidates: similarity, boosted by how many recipes use the tag
+    usage = (
+        select(func.count())
+        .select_from(RecipeTag)
+        .where(RecipeTag.c.tag_id == candidates.c.tag_id)
+        .correlate(candidates)
+        .scalar_subquery()
+    )
+    score = (1 - candidates.c.distance) * (1 + POPULARITY_WEIGHT * func.ln(1 + usage))
+
+    rows = (
+        db.query(candidates.c.tag_id, candidates.c.name)
+        .order_by(score.desc(), candidates.c.name)
+        .limit(AUTOCOMPLETE_LIMIT)
         .all()
     )
-    return tags if tags else []
+    return [RetrieveTag(tag_id=row.tag_id, name=row.name) for row in rows]
 
 
 # @router.post("/{tag_name}")
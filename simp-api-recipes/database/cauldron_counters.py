@@ -0,0 +1,254 @@
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+import redis
+from sqlalchemy import Integer, Numeric, TIMESTAMP, cast, column, func, select, update, values
+from sqlalchemy.dialects.postgresql import UUID, insert as pg_insert
+from sqlalchemy.orm import Session
+
+from database.connection import SessionLocal
+from database.handling import r
+from models.cauldron import Cauldron
+from models.cauldron_data import CauldronData
+
+logger = logging.getLogger(__name__)
+
+# Pending deltas of one cauldron entry, and the set of entries that have any.
+# Hash fields: usage_count (increment), last_used (epoch seconds, max wins),
+# overall_rating / taste_rating / ease_rating (last submission wins).
+PENDING_KEY = "cauldron_stats:{}"
+DIRTY_KEY = "cauldron_stats:dirty"
+
+RATING_FIELDS = ("overall_rating", "taste_rating", "ease_rating")
+
+# Seconds between flushes and entries written per UPDATE statement.
+FLUSH_INTERVAL = 10
+FLUSH_BATCH = 500
+
+RECORD_USAGE = """
+redis.call('HINCRBY', KEYS[1], 'usage_count', ARGV[1])
+local last = redis.call('HGET', KEYS[1], 'last_used')
+if not last or tonumber(last) < tonumber(ARGV[2]) then
+  redis.call('HSET', KEYS[1], 'last_used', ARGV[2])
+end
+redis.call('SADD', KEYS[2], ARGV[3])
+return 1
+"""
+
+RECORD_RATING = """
+for i = 1, #ARGV - 1, 2 do
+  redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('SADD', KEYS[2], ARGV[#ARGV])
+return 1
+"""
+
+# Atomically hand the pending deltas of one entry to the flusher.
+TAKE_PENDING = """
+local pending = redis.call('HGETALL', KEYS[1])
+redis.call('DEL', KEYS[1])
+return pending
+"""
+
+
+def _pending_key(cauldron_id) -> str:
+    return PENDING_KEY.format(cauldron_id)
+
+
+def record_usage(cauldron_id: uuid.UUID, used_at: Optional[datetime] = None, count: int = 1) -> None:
+    """Count `count` cooks of a cauldron entry; persisted by the next flush."""
+    used_at = used_at or datetime.now(timezone.utc)
+    r.eval(RECORD_USAGE, 2, _pending_key(cauldron_id), DIRTY_KEY, count, used_at.timestamp(), str(cauldron_id))
+
+
+def record_rating(cauldron_id: uuid.UUID, ratings: Dict[str, Optional[float]]) -> None:
+    """Store the latest rating submission; unset fields keep their current value."""
+    args = []
+    for field in RATING_FIELDS:
+        if ratings.get(field) is not None:
+            args.extend((field, str(ratings[field])))
+    if args:
+        r.eval(RECORD_RATING, 2, _pending_key(cauldron_id), DIRTY_KEY, *args, str(cauldron_id))
+
+
+def _parse_pending(fields: Dict[str, str]) -> dict:
+    pending = {"usage_count": int(fields.get("usage_count", 0))}
+    if fields.get("last_used"):
+        pending["last_used"] = datetime.fromtimestamp(float(fields["last_used"]), tz=timezone.utc)
+    for field in RATING_FIELDS:
+        if fields.get(field):
+            pending[field] = Decimal(fields[field])
+    return pending
+
+
+def read_cauldron_data(db: Session, cauldron_id: uuid.UUID) -> dict:
+    """
+    Persisted counters of a cauldron entry merged with the deltas still in Redis.
+    While a flush is in flight its deltas are in neither place, so a read can
+    briefly trail by one flush interval.
+    """
+    row = db.query(CauldronData).filter(CauldronData.cauldron_id == cauldron_id).first()
+    data = {
+        "cauldron_id": cauldron_id,
+        "usage_count": (row.usage_count or 0) if row else 0,
+        "last_used": row.last_used if row else None,
+        "updated_at": row.updated_at if row else None,
+    }
+    for field in RATING_FIELDS:
+        data[field] = getattr(row, field) if row else None
+
+    try:
+        pending = _parse_pending(r.hgetall(_pending_key(cauldron_id)))
+    except redis.RedisError:
+        return data
+
+    data["usage_count"] += pending["usage_count"]
+    if "last_used" in pending and (data["last_used"] is None or pending["last_used"] > data["last_used"]):
+        data["last_used"] = pending["last_used"]
+    for field in RATING_FIELDS:
+        if field in pending:
+            data[field] = pending[field]
+    return data
+
+
+def _restore(cauldron_id: str, pending: dict) -> None:
+    """Put taken deltas back after a failed flush; newer submissions win."""
+    if pending["usage_count"]:
+        record_usage(cauldron_id, pending.get("last_used"), pending["usage_count"])
+    ratings = {field: pending[field] for field in RATING_FIELDS if field in pending}
+    if ratings:
+        key = _pending_key(cauldron_id)
+        for field, value in ratings.items():
+            r.hsetnx(key, field, str(value))
+        r.sadd(DIRTY_KEY, cauldron_id)
+
+
+def _write_batch(db: Session, batch: Dict[str, dict]) -> None:
+    """
+    Apply a batch of deltas with two statements: create the missing
+    cauldron_data rows, then one UPDATE ... FROM (VALUES ...).
+    """
+    pending_rows = values(
+        column("cauldron_id"),
+        column("new_id"),
+        column("usage_delta"),
+        column("last_used"),
+        *(column(field) for field in RATING_FIELDS),
+        name="pending",
+    ).data([
+        (
+            cauldron_id,
+            str(uuid.uuid4()),
+            pending["usage_count"],
+            pending.get("last_used"),
+            *(pending.get(field) for field in RATING_FIELDS),
+        )
+        for cauldron_id, pending in batch.items()
+    ])
+    pending_id = cast(pending_rows.c.cauldron_id, UUID(as_uuid=True))
+
+    # Entries deleted in the meantime are skipped by the join.
+    db.execute(
+        pg_insert(CauldronData)
+        .from_select(
+            ["cauldron_data_id", "cauldron_id"],
+            select(cast(pending_rows.c.new_id, UUID(as_uuid=True)), Cauldron.cauldron_id)
+            .join(Cauldron, Cauldron.cauldron_id == pending_id),
+        )
+        .on_conflict_do_nothing(index_elements=[CauldronData.cauldron_id])
+    )
+
+    ratings = {
+        field: func.coalesce(cast(pending_rows.c[field], Numeric(3, 2)), getattr(CauldronData, field))
+        for field in RATING_FIELDS
+    }
+    db.execute(
+        update(CauldronData)
+        .where(CauldronData.cauldron_id == pending_id)
+        .values(
+            usage_count=func.coalesce(CauldronData.usage_count, 0) + cast(pending_rows.c.usage_delta, Integer),
+            last_used=func.greatest(CauldronData.last_used, cast(pending_rows.c.last_used, TIMESTAMP(timezone=True))),
+            updated_at=func.now(),
+            **ratings,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def flush_pending(batch_size: int = FLUSH_BATCH) -> int:
+    """Move pending deltas from Redis into cauldron_data; returns the entries written."""
+    flushed = 0
+    while True:
+        cauldron_ids: List[str] = r.spop(DIRTY_KEY, batch_size) or []
+        if not cauldron_ids:
+            return flushed
+
+        pipe = r.pipeline()
+        for cauldron_id in cauldron_ids:
+            pipe.eval(TAKE_PENDING, 1, _pending_key(cauldron_id))
+        batch = {}
+        for cauldron_id, taken in zip(cauldron_ids, pipe.execute()):
+            if taken:
+                batch[cauldron_id] = _parse_pending(dict(zip(taken[::2], taken[1::2])))
+        if not batch:
+            continue
+
+        db = SessionLocal()
+        try:
+            _write_batch(db, batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            for cauldron_id, pending in batch.items():
+                _restore(cauldron_id, pending)
+            raise
+        finally:
+            db.close()
+        flushed += len(batch)
+
+
+class CauldronCounterFlusher(threading.Thread):
+    """Flushes pending counters every FLUSH_INTERVAL seconds, and once more on stop."""
+
+    def __init__(self):
+        super().__init__(name="cauldron-counter-flusher", daemon=True)
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        while True:
+            stopping = self._stop_event.wait(FLUSH_INTERVAL)
+            started = time.monotonic()
+            try:
+                flushed = flush_pending()
+                if flushed:
+                    logger.info("Flushed %d cauldron counters in %.3fs", flushed, time.monotonic() - started)
+            except Exception:
+                logger.exception("Cauldron counter flush failed; retrying next interval")
+            if stopping:
+                return
+
+
+_flusher: Optional[CauldronCounterFlusher] = None
+
+
+def start_counter_flusher() -> None:
+    global _flusher
+    if _flusher is None:
+        _flusher = CauldronCounterFlusher()
+        _flusher.start()
+
+
+def stop_counter_flusher() -> None:
+    global _flusher
+    if _flusher is not None:
+        _flusher.stop()
+        _flusher.join(timeout=FLUSH_INTERVAL)
+        _flusher = None
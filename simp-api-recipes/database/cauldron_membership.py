@@ -0,0 +1,155 @@
+import uuid
+from typing import Iterable, List, Optional, Sequence, Set
+
+import redis
+from sqlalchemy import select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database.handling import async_r, r
+from models.cauldron import Cauldron
+
+# Per-user set of the recipe ids with an active cauldron entry.
+MEMBERSHIP_TTL = 86400
+# Always a member of a loaded set, so "empty cauldron" and "not cached" differ.
+LOADED_MARKER = "*"
+
+# Writes only touch sets that are already loaded; a missing set is rebuilt
+# from the database on the next read instead of starting out partial. Every
+# write also bumps the user's generation (KEYS[2]), so a rebuild that read the
+# database before the write committed cannot store its stale result.
+# ARGV: generation TTL, number of ids to add, the ids to add, then the ids to remove.
+APPLY_MEMBERSHIP = """
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+if redis.call('EXISTS', KEYS[1]) == 0 then
+  return 0
+end
+local split = tonumber(ARGV[2]) + 2
+for i = 3, split do
+  redis.call('SADD', KEYS[1], ARGV[i])
+end
+for i = split + 1, #ARGV do
+  redis.call('SREM', KEYS[1], ARGV[i])
+end
+return 1
+"""
+
+# Rebuilds the set only if no write happened since the rebuild read the
+# generation ('' when it had none). ARGV: generation, set TTL, then the members.
+STORE_MEMBERSHIP = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[1] then
+  return 0
+end
+redis.call('DEL', KEYS[1])
+for i = 3, #ARGV do
+  redis.call('SADD', KEYS[1], ARGV[i])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+def _membership_key(user_id) -> str:
+    return f"cauldron_recipes:{user_id}"
+
+
+def _generation_key(user_id) -> str:
+    return f"cauldron_recipes_gen:{user_id}"
+
+
+def update_cauldron_membership(user_id, active: Sequence = (), inactive: Sequence = ()) -> None:
+    """Mirror committed cauldron writes into the user's set in one round trip."""
+    if not active and not inactive:
+        return
+    args = [MEMBERSHIP_TTL, len(active), *map(str, active), *map(str, inactive)]
+    try:
+        r.eval(APPLY_MEMBERSHIP, 2, _membership_key(user_id), _generation_key(user_id), *args)
+    except redis.RedisError:
+        # Better a rebuild than a stale flag
+        try:
+            r.delete(_membership_key(user_id))
+        except redis.RedisError:
+            pass
+
+
+def set_cauldron_membership(user_id, recipe_id, active: bool) -> None:
+    if active:
+        update_cauldron_membership(user_id, active=[recipe_id])
+    else:
+        update_cauldron_membership(user_id, inactive=[recipe_id])
+
+
+def _active_recipes_select(user_id, recipe_ids: Optional[Sequence] = None):
+    stmt = select(Cauldron.recipe_id).where(Cauldron.user_id == user_id, Cauldron.is_active == true())
+    if recipe_ids is not None:
+        stmt = stmt.where(Cauldron.recipe_id.in_(recipe_ids))
+    return stmt
+
+
+def _probe(pipe, user_id, recipe_ids: Sequence) -> None:
+    # The generation is read in the same round trip, before the database query
+    pipe.smismember(_membership_key(user_id), [LOADED_MARKER, *map(str, recipe_ids)])
+    pipe.get(_generation_key(user_id))
+
+
+def _store_args(user_id, generation, recipe_ids: Iterable[str]) -> list:
+    return [
+        STORE_MEMBERSHIP, 2, _membership_key(user_id), _generation_key(user_id),
+        generation or "", MEMBERSHIP_TTL, LOADED_MARKER, *recipe_ids,
+    ]
+
+
+def _flags(recipe_ids: Sequence, members: Set[str]) -> List[bool]:
+    return [str(recipe_id) in members for recipe_id in recipe_ids]
+
+
+def in_cauldron_flags(db: Session, viewer_id: Optional[uuid.UUID], recipe_ids: Sequence) -> List[bool]:
+    """
+    `in_cauldron` of each recipe for `viewer_id`, in order.
+    One SMISMEMBER answers the whole page; the first probe is the loaded
+    marker, so a cold set is detected in the same round trip.
+    """
+    if viewer_id is None or not recipe_ids:
+        return [False] * len(recipe_ids)
+
+    try:
+        pipe = r.pipeline(transaction=False)
+        _probe(pipe, viewer_id, recipe_ids)
+        (loaded, *flags), generation = pipe.execute()
+        if loaded:
+            return [bool(flag) for flag in flags]
+    except redis.RedisError:
+        # Answer just this page from the database
+        members = {str(rid) for rid in db.execute(_active_recipes_select(viewer_id, recipe_ids)).scalars()}
+        return _flags(recipe_ids, members)
+
+    members = {str(rid) for rid in db.execute(_active_recipes_select(viewer_id)).scalars()}
+    try:
+        r.eval(*_store_args(viewer_id, generation, members))
+    except redis.RedisError:
+        pass
+    return _flags(recipe_ids, members)
+
+
+async def in_cauldron_flags_async(db: AsyncSession, viewer_id: Optional[uuid.UUID], recipe_ids: Sequence) -> List[bool]:
+    """`in_cauldron_flags` on an AsyncSession with the async Redis client."""
+    if viewer_id is None or not recipe_ids:
+        return [False] * len(recipe_ids)
+
+    try:
+        pipe = async_r.pipeline(transaction=False)
+        _probe(pipe, viewer_id, recipe_ids)
+        (loaded, *flags), generation = await pipe.execute()
+        if loaded:
+            return [bool(flag) for flag in flags]
+    except redis.RedisError:
+        members = {str(rid) for rid in (await db.execute(_active_recipes_select(viewer_id, recipe_ids))).scalars()}
+        return _flags(recipe_ids, members)
+
+    members = {str(rid) for rid in (await db.execute(_active_recipes_select(viewer_id))).scalars()}
+    try:
+        await async_r.eval(*_store_args(viewer_id, generation, members))
+    except redis.RedisError:
+        pass
+    return _flags(recipe_ids, members)
@@ -0,0 +1,85 @@
+import uuid
+from typing import List, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from models.cauldron import Cauldron
+from models.recipe import Recipe
+
+
+def _unique(ids: Sequence[uuid.UUID]) -> List[uuid.UUID]:
+    return list(dict.fromkeys(ids))
+
+
+def ensure_recipes_exist(db: Session, recipe_ids: Sequence[uuid.UUID]) -> None:
+    """404 listing every id in `recipe_ids` without a recipe."""
+    if not recipe_ids:
+        return
+    found = set(db.execute(select(Recipe.recipe_id).where(Recipe.recipe_id.in_(recipe_ids))).scalars())
+    missing = [str(recipe_id) for recipe_id in recipe_ids if recipe_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Recipes not found: {', '.join(missing)}")
+
+
+def upsert_cauldron_entries(db: Session, user_id: uuid.UUID, recipe_ids: Sequence[uuid.UUID], is_active: bool = True):
+    """
+    Insert a cauldron entry per recipe, or set `is_active` on the existing one,
+    in a single statement (ON CONFLICT on uq_cauldron_user_recipe).
+    Returns the affected rows with an `inserted` flag (xmax = 0 only for new rows).
+    """
+    recipe_ids = _unique(recipe_ids)
+    if not recipe_ids:
+        return []
+    stmt = pg_insert(Cauldron).values([
+        {"cauldron_id": uuid.uuid4(), "user_id": user_id, "recipe_id": recipe_id, "is_active": is_active}
+        for recipe_id in recipe_ids
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Cauldron.user_id, Cauldron.recipe_id],
+        set_={"is_active": stmt.excluded.is_active, "updated_at": func.now()},
+    ).returning(
+        Cauldron.cauldron_id,
+        Cauldron.user_id,
+        Cauldron.recipe_id,
+        Cauldron.is_active,
+        Cauldron.created_at,
+        Cauldron.updated_at,
+        (literal_column("xmax") == 0).label("inserted"),
+    )
+    return db.execute(stmt).all()
+
+
+def set_cauldron_entries_active(db: Session, user_id: uuid.UUID, recipe_ids: Sequence[uuid.UUID], is_active: bool) -> List[uuid.UUID]:
+    """Flip `is_active` on existing entries that differ; returns the recipe ids changed."""
+    recipe_ids = _unique(recipe_ids)
+    if not recipe_ids:
+        return []
+    stmt = (
+        update(Cauldron)
+        .where(
+            Cauldron.user_id == user_id,
+            Cauldron.recipe_id.in_(recipe_ids),
+            Cauldron.is_active.is_distinct_from(is_active),
+        )
+        .values(is_active=is_active, updated_at=func.now())
+        .returning(Cauldron.recipe_id)
+        .execution_options(synchronize_session=False)
+    )
+    return list(db.execute(stmt).scalars())
+
+
+def delete_cauldron_entries(db: Session, user_id: uuid.UUID, recipe_ids: Sequence[uuid.UUID]) -> List[uuid.UUID]:
+    """Delete the user's entries for `recipe_ids`; returns the recipe ids removed."""
+    recipe_ids = _unique(recipe_ids)
+    if not recipe_ids:
+        return []
+    stmt = (
+        delete(Cauldron)
+        .where(Cauldron.user_id == user_id, Cauldron.recipe_id.in_(recipe_ids))
+        .returning(Cauldron.recipe_id)
+        .execution_options(synchronize_session=False)
+    )
+    return list(db.execute(stmt).scalars())
@@ -1,6 +1,7 @@
 # database/connection.py
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
@@ -16,6 +17,20 @@ engine = create_engine(DATABASE_URL, echo=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+# Async engine (asyncpg) for the `async def` routes. It has its own pool, so
+# awaiting Postgres does not tie up a threadpool thread.
+ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+
+async def get_async_db():
+    """Async counterpart of the per-router `get_db` dependency."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 class similarity(FunctionElement):
     """Register `similarity()` for PostgreSQL trigram search"""
     type = float
@@ -1,5 +1,6 @@
 import os
 import redis
+import redis.asyncio
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 from models import User
@@ -12,6 +13,8 @@ REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_DB = int(os.getenv("REDIS_DB", 0))
 
 r = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, decode_responses=True)
+# Async client for `async def` routes
+async_r = redis.asyncio.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, decode_responses=True)
 
 
 def get_user_by_id(db: Session, user_id: str):
@@ -33,6 +36,14 @@ def get_user_session(user_id: str):
     return {"auth_token": session_data.get("auth_token"), "csrf_token": session_data.get("csrf_token")}
 
 
+async def get_user_session_async(user_id: str):
+    """Retrieve auth token and CSRF token from Redis without blocking the event loop."""
+    session_data = await async_r.hgetall(f"user_session:{user_id}")
+    if not session_data:
+        return None
+    return {"auth_token": session_data.get("auth_token"), "csrf_token": session_data.get("csrf_token")}
+
+
 def validate_user_session(user_id: str, auth_token: str):
     """Validate auth token from Redis."""
     session_data = get_user_session(user_id)
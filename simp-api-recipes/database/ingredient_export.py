@@ -0,0 +1,73 @@
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterator, List, Optional, Sequence
+
+from fastapi import HTTPException
+
+from database.connection import SessionLocal
+from models.ingredient import Ingredient
+
+# Rows fetched per round trip from the server-side cursor.
+EXPORT_BATCH_SIZE = 1000
+
+# Columns clients may request through `fields=` (the search vector is internal).
+EXPORTABLE_FIELDS = (
+    "ingredient_id", "name", "description", "density_g_per_ml", "default_unit",
+    "diet_level", "validated", "version", "created_at", "updated_at",
+)
+DEFAULT_FIELDS = ("ingredient_id", "name")
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """Validate a comma separated `fields=` projection (400 on unknown names)."""
+    if not fields:
+        return list(DEFAULT_FIELDS)
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in EXPORTABLE_FIELDS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(EXPORTABLE_FIELDS)}",
+        )
+    return requested
+
+
+def _default(value):
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):  # Enum members
+        return value.value
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def stream_ingredients(fields: Sequence[str], ndjson: bool = False) -> Iterator[bytes]:
+    """
+    Encode every ingredient as it is read from a server-side cursor, one
+    batch of rows at a time, so memory stays flat regardless of table size.
+    Yields a JSON array, or one object per line when `ndjson` is set.
+
+    The session is owned by the generator: it must outlive the route
+    function and is closed once the response has been fully written.
+    """
+    columns = [getattr(Ingredient, f) for f in fields]
+    db = SessionLocal()
+    try:
+        query = db.query(*columns).order_by(Ingredient.name, Ingredient.ingredient_id).yield_per(EXPORT_BATCH_SIZE)
+        first = True
+        if not ndjson:
+            yield b"["
+        for batch in query.partitions():
+            encoded = [json.dumps(dict(zip(fields, row)), default=_default) for row in batch]
+            if ndjson:
+                yield ("\n".join(encoded) + "\n").encode()
+            else:
+                yield (("" if first else ",") + ",".join(encoded)).encode()
+            first = False
+        if not ndjson:
+            yield b"]"
+    finally:
+        db.close()
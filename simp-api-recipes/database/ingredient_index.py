@@ -0,0 +1,312 @@
+import json
+import logging
+import select
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+import psycopg2
+import psycopg2.extensions
+
+from database.connection import DATABASE_URL, SessionLocal
+from models.enums import UnitNameEnum
+from models.ingredient import Ingredient
+from models.ingredient_alias import IngredientAlias
+
+logger = logging.getLogger(__name__)
+
+# Channel notified by the triggers in simp-database-init/triggers/notifications.py
+INGREDIENT_CHANNEL = "ingredient_changes"
+
+# Minimum trigram similarity (pg_trgm definition) for fuzzy suggestions.
+TRIGRAM_THRESHOLD = 0.3
+# Upper bound of prefix hits collected from the trie before ranking.
+PREFIX_CANDIDATES = 200
+# Seconds between polls for notifications and between reconnect attempts.
+POLL_TIMEOUT = 5
+RECONNECT_DELAY = 5
+
+Term = Tuple[str, str]  # ("ingredient", ingredient_id) or ("alias", alias_id)
+
+
+def normalize(text: str) -> str:
+    """Lower-case, strip accents and collapse whitespace."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.lower().split())
+
+
+def unit_value(unit) -> str:
+    """
+    Spelling of a default unit as served ("gram"). The column stores the enum
+    member names, so NOTIFY payloads carry "GRAM" while the ORM yields members.
+    """
+    if isinstance(unit, UnitNameEnum):
+        return unit.value
+    try:
+        return UnitNameEnum[unit].value
+    except KeyError:
+        return str(unit)
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of every word, padded the way pg_trgm pads them."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class _TrieNode:
+    __slots__ = ("children", "terms")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.terms: Set[Term] = set()
+
+
+class IngredientAutocompleteIndex:
+    """
+    In-process autocomplete over ingredient names and aliases.
+
+    A prefix trie (keyed on every word start, so "oil" finds "olive oil")
+    answers as-you-type queries; a trigram inverted index catches typos.
+    All mutations and lookups hold a lock, so the listener thread can apply
+    changes while requests are served.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.ready = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._ingredients: Dict[str, Tuple[str, str]] = {}  # id -> (name, default_unit)
+        self._terms: Dict[Term, Tuple[str, str]] = {}  # term -> (ingredient_id, normalized text)
+        self._terms_by_ingredient: Dict[str, Set[Term]] = defaultdict(set)
+        self._trie = _TrieNode()
+        self._trigrams: Dict[str, Set[Term]] = defaultdict(set)
+
+    # -------------------------
+    # Loading and changes
+    # -------------------------
+
+    def load(self) -> None:
+        """Rebuild the whole index from the database."""
+        db = SessionLocal()
+        try:
+            ingredients = db.query(Ingredient.ingredient_id, Ingredient.name, Ingredient.default_unit).all()
+            aliases = db.query(IngredientAlias.alias_id, IngredientAlias.ingredient_id, IngredientAlias.alias_name).all()
+        finally:
+            db.close()
+
+        with self._lock:
+            self._reset()
+            for ingredient_id, name, default_unit in ingredients:
+                self.upsert_ingredient(str(ingredient_id), name, unit_value(default_unit))
+            for alias_id, ingredient_id, alias_name in aliases:
+                self.upsert_alias(str(alias_id), str(ingredient_id), alias_name)
+            self.ready = True
+        logger.info("Ingredient autocomplete index loaded: %d ingredients, %d aliases", len(ingredients), len(aliases))
+
+    def upsert_ingredient(self, ingredient_id: str, name: str, default_unit: str) -> None:
+        with self._lock:
+            self._ingredients[ingredient_id] = (name, default_unit)
+            self._add_term(("ingredient", ingredient_id), ingredient_id, name)
+
+    def remove_ingredient(self, ingredient_id: str) -> None:
+        with self._lock:
+            self._ingredients.pop(ingredient_id, None)
+            for term in list(self._terms_by_ingredient.get(ingredient_id, ())):
+                self._remove_term(term)
+            self._terms_by_ingredient.pop(ingredient_id, None)
+
+    def upsert_alias(self, alias_id: str, ingredient_id: str, alias_name: str) -> None:
+        with self._lock:
+            self._add_term(("alias", alias_id), ingredient_id, alias_name)
+
+    def remove_alias(self, alias_id: str) -> None:
+        with self._lock:
+            self._remove_term(("alias", alias_id))
+
+    def apply_notification(self, payload: str) -> None:
+        """Apply one change published on INGREDIENT_CHANNEL."""
+        change = json.loads(payload)
+        deleted = change["op"] == "DELETE"
+        if change["table"] == "ingredients":
+            if deleted:
+                self.remove_ingredient(change["ingredient_id"])
+            else:
+                self.upsert_ingredient(change["ingredient_id"], change["name"], unit_value(change["default_unit"]))
+        elif change["table"] == "ingredient_aliases":
+            if deleted:
+                self.remove_alias(change["alias_id"])
+            else:
+                self.upsert_alias(change["alias_id"], change["ingredient_id"], change["alias_name"])
+
+    def _add_term(self, term: Term, ingredient_id: str, text: str) -> None:
+        self._remove_term(term)
+        normalized = normalize(text)
+        if not normalized:
+            return
+        self._terms[term] = (ingredient_id, normalized)
+        self._terms_by_ingredient[ingredient_id].add(term)
+
+        words = normalized.split(" ")
+        for i in range(len(words)):
+            node = self._trie
+            for char in " ".join(words[i:]):
+                node = node.children.setdefault(char, _TrieNode())
+            node.terms.add(term)
+        for gram in trigrams(normalized):
+            self._trigrams[gram].add(term)
+
+    def _remove_term(self, term: Term) -> None:
+        entry = self._terms.pop(term, None)
+        if entry is None:
+            return
+        ingredient_id, normalized = entry
+        self._terms_by_ingredient[ingredient_id].discard(term)
+
+        words = normalized.split(" ")
+        for i in range(len(words)):
+            node = self._trie
+            for char in " ".join(words[i:]):
+                node = node.children.get(char)
+                if node is None:
+                    break
+            else:
+                node.terms.discard(term)
+        for gram in trigrams(normalized):
+            bucket = self._trigrams.get(gram)
+            if bucket is not None:
+                bucket.discard(term)
+                if not bucket:
+                    del self._trigrams[gram]
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+
+    def _prefix_terms(self, prefix: str) -> Set[Term]:
+        node = self._trie
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+
+        found: Set[Term] = set()
+        stack = [node]
+        while stack and len(found) < PREFIX_CANDIDATES:
+            current = stack.pop()
+            found.update(current.terms)
+            stack.extend(current.children.values())
+        return found
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, str, str]]:
+        """
+        Best matching ingredients as (ingredient_id, name, default_unit).
+        Prefix matches come first (whole-name prefixes before word prefixes,
+        shorter names first), then trigram matches by similarity.
+        """
+        q = normalize(query)
+        if not q:
+            return []
+
+        with self._lock:
+            scores: Dict[Term, float] = {}
+            for term in self._prefix_terms(q):
+                text = self._terms[term][1]
+                scores[term] = 2.0 if text.startswith(q) else 1.5
+
+            query_grams = trigrams(q)
+            shared: Dict[Term, int] = defaultdict(int)
+            for gram in query_grams:
+                for term in self._trigrams.get(gram, ()):
+                    shared[term] += 1
+            for term, count in shared.items():
+                if term in scores:
+                    continue
+                similarity = count / (len(query_grams) + len(trigrams(self._terms[term][1])) - count)
+                if similarity >= TRIGRAM_THRESHOLD:
+                    scores[term] = similarity
+
+            ranked = sorted(scores, key=lambda t: (-scores[t], len(self._terms[t][1]), self._terms[t][1]))
+            results, seen = [], set()
+            for term in ranked:
+                ingredient_id = self._terms[term][0]
+                if ingredient_id in seen or ingredient_id not in self._ingredients:
+                    continue
+                seen.add(ingredient_id)
+                name, default_unit = self._ingredients[ingredient_id]
+                results.append((ingredient_id, name, default_unit))
+                if len(results) == limit:
+                    break
+            return results
+
+
+class IngredientChangeListener(threading.Thread):
+    """
+    Keeps `index` in sync via LISTEN/NOTIFY.
+    LISTEN is issued before every (re)load, so no change falls between the
+    snapshot and the first notification; after a lost connection the index
+    is rebuilt because notifications sent meanwhile are gone.
+    """
+
+    def __init__(self, index: IngredientAutocompleteIndex):
+        super().__init__(name="ingredient-index-listener", daemon=True)
+        self.index = index
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            conn: Optional[psycopg2.extensions.connection] = None
+            try:
+                conn = psycopg2.connect(DATABASE_URL)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {INGREDIENT_CHANNEL};")
+                self.index.load()
+                self._poll(conn)
+            except Exception:
+                logger.exception("Ingredient index listener failed; reconnecting")
+                self._stop_event.wait(RECONNECT_DELAY)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _poll(self, conn) -> None:
+        while not self._stop_event.is_set():
+            if select.select([conn], [], [], POLL_TIMEOUT) == ([], [], []):
+                continue
+            conn.poll()
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                try:
+                    self.index.apply_notification(notify.payload)
+                except (ValueError, KeyError):
+                    logger.warning("Ignoring malformed ingredient notification: %s", notify.payload)
+
+
+ingredient_index = IngredientAutocompleteIndex()
+_listener: Optional[IngredientChangeListener] = None
+
+
+def start_ingredient_index() -> None:
+    """Load the index and follow changes in a background thread."""
+    global _listener
+    if _listener is None:
+        _listener = IngredientChangeListener(ingredient_index)
+        _listener.start()
+
+
+def stop_ingredient_index() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
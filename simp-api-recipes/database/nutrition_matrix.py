@@ -0,0 +1,289 @@
+import json
+import logging
+import select as io_select
+import threading
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import psycopg2
+import psycopg2.extensions
+from scipy import sparse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database.connection import DATABASE_URL, SessionLocal
+from database.recipe_analytics import load_recipe_lines
+from database.unit_conversion import measurement_key, resolve_factors
+from models.enums import LifeStageEnum, RecommendationTypeEnum
+from models.ingredient_nutrient import IngredientNutrient
+from models.nutrient import Nutrient
+from models.nutrientRecommendation import NutrientRecommendation
+from models.recipe import Recipe
+
+logger = logging.getLogger(__name__)
+
+# Channel notified by the triggers in simp-database-init/triggers/notifications.py
+NUTRIENT_CHANNEL = "nutrient_changes"
+VALUE_BASIS = "per 100g"
+# Recommendation used for "% of recommendation", in order of preference.
+RECOMMENDATION_TYPES = (RecommendationTypeEnum.RDA, RecommendationTypeEnum.AI)
+POLL_TIMEOUT = 5
+RECONNECT_DELAY = 5
+
+
+@dataclass(frozen=True)
+class NutrientInfo:
+    nutrient_id: object
+    name: str
+    unit: str
+    decimals: int
+
+
+class NutritionMatrix:
+    """
+    Dense ingredient x nutrient matrix of nutrient amounts per gram.
+
+    Changes never modify the published array: a patched copy is swapped in,
+    so a multiply running on the previous snapshot stays consistent.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ready = False
+        self.nutrients: List[NutrientInfo] = []
+        self.nutrient_index: Dict[object, int] = {}
+        self.ingredient_index: Dict[object, int] = {}
+        self.values = np.zeros((0, 0))
+
+    def snapshot(self) -> Tuple[List[NutrientInfo], Dict[object, int], np.ndarray]:
+        with self._lock:
+            return self.nutrients, self.ingredient_index, self.values
+
+    def _query_values(self, db: Session, ingredient_ids: Optional[Sequence] = None):
+        stmt = select(IngredientNutrient.ingredient_id, IngredientNutrient.nutrient_id, IngredientNutrient.nutrient_value).where(
+            IngredientNutrient.value_basis == VALUE_BASIS
+        )
+        if ingredient_ids is not None:
+            stmt = stmt.where(IngredientNutrient.ingredient_id.in_(ingredient_ids))
+        return db.execute(stmt).all()
+
+    def load(self) -> None:
+        """Rebuild the whole matrix from the database."""
+        db = SessionLocal()
+        try:
+            nutrients = [
+                NutrientInfo(n.nutrient_id, n.nutrient_name, n.unit, n.nutrient_decimals)
+                for n in db.execute(
+                    select(Nutrient.nutrient_id, Nutrient.nutrient_name, Nutrient.unit, Nutrient.nutrient_decimals)
+                    .order_by(Nutrient.sort_order, Nutrient.nutrient_name)
+                )
+            ]
+            rows = self._query_values(db)
+        finally:
+            db.close()
+
+        nutrient_index = {n.nutrient_id: i for i, n in enumerate(nutrients)}
+        ingredient_index: Dict[object, int] = {}
+        for ingredient_id, _, _ in rows:
+            ingredient_index.setdefault(ingredient_id, len(ingredient_index))
+
+        values = np.zeros((len(ingredient_index), len(nutrients)))
+        for ingredient_id, nutrient_id, value in rows:
+            column = nutrient_index.get(nutrient_id)
+            if column is not None:
+                values[ingredient_index[ingredient_id], column] = float(value) / 100
+
+        with self._lock:
+            self.nutrients, self.nutrient_index = nutrients, nutrient_index
+            self.ingredient_index, self.values = ingredient_index, values
+            self.ready = True
+        logger.info("Nutrition matrix loaded: %d ingredients x %d nutrients", *values.shape)
+
+    def reload_ingredients(self, ingredient_ids: Set) -> None:
+        """Re-read the rows of `ingredient_ids`, appending rows for new ingredients."""
+        db = SessionLocal()
+        try:
+            rows = self._query_values(db, list(ingredient_ids))
+        finally:
+            db.close()
+
+        with self._lock:
+            ingredient_index = dict(self.ingredient_index)
+            new = [i for i in ingredient_ids if i not in ingredient_index]
+            for ingredient_id in new:
+                ingredient_index[ingredient_id] = len(ingredient_index)
+            values = np.vstack([self.values, np.zeros((len(new), self.values.shape[1]))])
+
+            for ingredient_id in ingredient_ids:
+                values[ingredient_index[ingredient_id], :] = 0
+            for ingredient_id, nutrient_id, value in rows:
+                column = self.nutrient_index.get(nutrient_id)
+                if column is not None:
+                    values[ingredient_index[ingredient_id], column] = float(value) / 100
+
+            self.ingredient_index, self.values = ingredient_index, values
+
+
+class NutrientChangeListener(threading.Thread):
+    """
+    Keeps `matrix` in sync via LISTEN/NOTIFY. Notifications are applied in
+    batches; a change to the nutrient definitions rebuilds the whole matrix.
+    """
+
+    def __init__(self, matrix: NutritionMatrix):
+        super().__init__(name="nutrition-matrix-listener", daemon=True)
+        self.matrix = matrix
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            conn: Optional[psycopg2.extensions.connection] = None
+            try:
+                conn = psycopg2.connect(DATABASE_URL)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {NUTRIENT_CHANNEL};")
+                self.matrix.load()
+                self._poll(conn)
+            except Exception:
+                logger.exception("Nutrition matrix listener failed; reconnecting")
+                self._stop_event.wait(RECONNECT_DELAY)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _poll(self, conn) -> None:
+        while not self._stop_event.is_set():
+            if io_select.select([conn], [], [], POLL_TIMEOUT) == ([], [], []):
+                continue
+            conn.poll()
+            ingredient_ids, full_reload = set(), False
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                try:
+                    change = json.loads(notify.payload)
+                except ValueError:
+                    logger.warning("Ignoring malformed nutrient notification: %s", notify.payload)
+                    continue
+                if change.get("table") == "ingredient_nutrients":
+                    ingredient_ids.add(uuid.UUID(change["ingredient_id"]))
+                else:
+                    full_reload = True
+            if full_reload:
+                self.matrix.load()
+            elif ingredient_ids:
+                self.matrix.reload_ingredients(ingredient_ids)
+
+
+nutrition_matrix = NutritionMatrix()
+_listener: Optional[NutrientChangeListener] = None
+
+
+def start_nutrition_matrix() -> None:
+    """Load the matrix and follow nutrient changes in a background thread."""
+    global _listener
+    if _listener is None:
+        _listener = NutrientChangeListener(nutrition_matrix)
+        _listener.start()
+
+
+def stop_nutrition_matrix() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# -------------------------
+# Recipe profiles
+# -------------------------
+
+def load_recommendations(db: Session, life_stage: LifeStageEnum) -> Dict[object, float]:
+    """
+    Recommended daily amount per nutrient for `life_stage` (general population,
+    no condition). A life-stage specific value beats an `ANY` one, RDA beats AI.
+    """
+    rows = db.execute(
+        select(
+            NutrientRecommendation.nutrient_id,
+            NutrientRecommendation.life_stage,
+            NutrientRecommendation.recommendation_type,
+            NutrientRecommendation.value,
+        ).where(
+            NutrientRecommendation.life_stage.in_({life_stage, LifeStageEnum.ANY}),
+            NutrientRecommendation.condition.is_(None),
+            NutrientRecommendation.recommendation_type.in_(RECOMMENDATION_TYPES),
+        )
+    ).all()
+
+    best: Dict[object, Tuple[Tuple[int, int], float]] = {}
+    for nutrient_id, stage, recommendation_type, value in rows:
+        if not value:
+            continue
+        rank = (stage != life_stage, RECOMMENDATION_TYPES.index(recommendation_type))
+        if nutrient_id not in best or rank < best[nutrient_id][0]:
+            best[nutrient_id] = (rank, float(value))
+    return {nutrient_id: value for nutrient_id, (_, value) in best.items()}
+
+
+def recipe_nutrition(db: Session, recipe_ids: Sequence, life_stage: Optional[LifeStageEnum] = None) -> List[dict]:
+    """
+    Nutrient profile (total and per serving) of every existing recipe in
+    `recipe_ids`. Line weights form a sparse recipe x ingredient matrix, so
+    the whole batch is a single multiply with the ingredient x nutrient matrix.
+    Line weights come from the shared factor cache of database.unit_conversion.
+    """
+    existing, lines = load_recipe_lines(db, recipe_ids)
+    if not existing:
+        return []
+
+    servings = dict(db.execute(select(Recipe.recipe_id, Recipe.servings).where(Recipe.recipe_id.in_(existing))).all())
+    factors = resolve_factors(db, [(ingredient_id, measurement) for _, ingredient_id, _, measurement in lines])
+    recommendations = load_recommendations(db, life_stage) if life_stage else {}
+    nutrients, ingredient_index, values = nutrition_matrix.snapshot()
+
+    position = {recipe_id: i for i, recipe_id in enumerate(existing)}
+    rows, columns, grams = [], [], []
+    incomplete = defaultdict(int)
+    for recipe_id, ingredient_id, amount, measurement in lines:
+        factor = factors[(ingredient_id, measurement_key(measurement))].grams
+        column = ingredient_index.get(ingredient_id)
+        if factor is None or column is None:
+            incomplete[recipe_id] += 1
+            continue
+        rows.append(position[recipe_id])
+        columns.append(column)
+        grams.append(float(amount) * factor)
+
+    weights = sparse.csr_matrix((grams, (rows, columns)), shape=(len(existing), values.shape[0]))
+    totals = np.asarray(weights @ values)
+
+    profiles = []
+    for recipe_id, total_row in zip(existing, totals):
+        portions = servings.get(recipe_id) or 1
+        profile = []
+        for nutrient, total in zip(nutrients, total_row):
+            per_serving = total / portions
+            recommended = recommendations.get(nutrient.nutrient_id)
+            profile.append({
+                "nutrient_id": nutrient.nutrient_id,
+                "name": nutrient.name,
+                "unit": nutrient.unit,
+                "amount": round(float(total), nutrient.decimals),
+                "per_serving": round(float(per_serving), nutrient.decimals),
+                "percent_of_recommendation": round(float(per_serving) / recommended * 100, 1) if recommended else None,
+            })
+        profiles.append({
+            "recipe_id": recipe_id,
+            "servings": portions,
+            "life_stage": life_stage,
+            "incomplete_ingredients": incomplete[recipe_id],
+            "nutrients": profile,
+        })
+    return profiles
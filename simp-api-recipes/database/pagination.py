@@ -0,0 +1,244 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import redis
+from fastapi import HTTPException
+from sqlalchemy import Select, func, literal, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
+
+from database.handling import async_r, r
+
+# How long an exact COUNT(*) is reused before it is recomputed.
+COUNT_CACHE_TTL = 60
+
+ESTIMATED_COUNT_SQL = text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)")
+
+
+# -------------------------
+# Cursor encoding
+# -------------------------
+
+def _to_json(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if hasattr(value, "value"):  # Enum members
+        return value.value
+    return value
+
+
+def _from_json(value: Any, column) -> Any:
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    if hasattr(python_type, "__members__"):  # Enum columns
+        return python_type(value)
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort-key of the last row on a page into an opaque cursor."""
+    raw = json.dumps([_to_json(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> List[Any]:
+    """Decode a cursor produced by `encode_cursor` back into typed sort-key values."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        return [_from_json(v, c) for v, c in zip(values, columns)]
+    except (ValueError, TypeError, InvalidOperation):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# -------------------------
+# Keyset pagination
+# -------------------------
+
+def _keyset(query, columns: Sequence, cursor: Optional[str], skip: int, descending: bool):
+    """Order a Query or Select by `columns` and start it after `cursor` (or at `skip`)."""
+    query = query.order_by(*[c.desc() if descending else c.asc() for c in columns])
+
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        bound = tuple_(*[literal(v, c.type) for v, c in zip(values, columns)])
+        if descending:
+            query = query.filter(tuple_(*columns) < bound)
+        else:
+            query = query.filter(tuple_(*columns) > bound)
+    elif skip:
+        query = query.offset(skip)
+    return query
+
+
+def _page(rows: list, key: Callable[[Any], Tuple], limit: int) -> Tuple[list, Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
+
+
+def paginate(
+    query: Query,
+    columns: Sequence,
+    key: Callable[[Any], Tuple],
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    descending: bool = False,
+) -> Tuple[list, Optional[str]]:
+    """
+    Order `query` by the `columns` sort tuple and return one page plus the
+    cursor of the next page (None on the last page).
+
+    With a cursor the page starts right after the encoded sort key, so the
+    database seeks through the index instead of scanning `skip` rows.
+    Without one, the legacy `skip` offset is applied.
+    `key` extracts the sort tuple from a returned row.
+    """
+    # Fetch one extra row to learn whether another page exists.
+    rows = _keyset(query, columns, cursor, skip, descending).limit(limit + 1).all()
+    return _page(rows, key, limit)
+
+
+async def paginate_async(
+    db: AsyncSession,
+    stmt: Select,
+    columns: Sequence,
+    key: Callable[[Any], Tuple],
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    descending: bool = False,
+    scalars: bool = False,
+) -> Tuple[list, Optional[str]]:
+    """`paginate` for a Select on an AsyncSession; `scalars` unwraps single-entity rows."""
+    result = await db.execute(_keyset(stmt, columns, cursor, skip, descending).limit(limit + 1))
+    rows = result.scalars().all() if scalars else result.all()
+    return _page(list(rows), key, limit)
+
+
+# -------------------------
+# Totals
+# -------------------------
+
+def _count_key(table_name: str, scope: str) -> str:
+    return f"count:{table_name}:{scope}"
+
+
+def cached_count(query: Query, table_name: str, scope: str = "all") -> int:
+    """Exact row count of `query`, cached in Redis for COUNT_CACHE_TTL seconds."""
+    key = _count_key(table_name, scope)
+    try:
+        cached = r.get(key)
+        if cached is not None:
+            return int(cached)
+    except redis.RedisError:
+        return query.order_by(None).count()
+
+    total = query.order_by(None).count()
+    try:
+        pipe = r.pipeline()
+        pipe.setex(key, COUNT_CACHE_TTL, total)
+        pipe.sadd(f"count_keys:{table_name}", key)
+        # The index only has to outlive its newest member
+        pipe.expire(f"count_keys:{table_name}", COUNT_CACHE_TTL)
+        pipe.execute()
+    except redis.RedisError:
+        pass
+    return total
+
+
+def estimated_count(db: Session, table_name: str) -> Optional[int]:
+    """Planner estimate of the table size from pg_class; None if never analyzed."""
+    estimate = db.execute(ESTIMATED_COUNT_SQL, {"table": table_name}).scalar()
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+def resolve_total(
+    db: Session,
+    query: Query,
+    table_name: str,
+    scope: str = "all",
+    mode: str = "exact",
+) -> int:
+    """
+    Total for a listing. `estimate` uses pg_class.reltuples for unfiltered
+    listings and falls back to the cached exact count otherwise.
+    """
+    if mode == "estimate" and scope == "all":
+        estimate = estimated_count(db, table_name)
+        if estimate is not None:
+            return estimate
+    return cached_count(query, table_name, scope)
+
+
+async def _count_async(db: AsyncSession, stmt: Select) -> int:
+    return (await db.execute(select(func.count()).select_from(stmt.order_by(None).subquery()))).scalar_one()
+
+
+async def cached_count_async(db: AsyncSession, stmt: Select, table_name: str, scope: str = "all") -> int:
+    """`cached_count` for a Select, using the async Redis client."""
+    key = _count_key(table_name, scope)
+    try:
+        cached = await async_r.get(key)
+        if cached is not None:
+            return int(cached)
+    except redis.RedisError:
+        return await _count_async(db, stmt)
+
+    total = await _count_async(db, stmt)
+    try:
+        async with async_r.pipeline() as pipe:
+            pipe.setex(key, COUNT_CACHE_TTL, total)
+            pipe.sadd(f"count_keys:{table_name}", key)
+            pipe.expire(f"count_keys:{table_name}", COUNT_CACHE_TTL)
+            await pipe.execute()
+    except redis.RedisError:
+        pass
+    return total
+
+
+async def resolve_total_async(
+    db: AsyncSession,
+    stmt: Select,
+    table_name: str,
+    scope: str = "all",
+    mode: str = "exact",
+) -> int:
+    """`resolve_total` for a Select on an AsyncSession."""
+    if mode == "estimate" and scope == "all":
+        estimate = (await db.execute(ESTIMATED_COUNT_SQL, {"table": table_name})).scalar()
+        if estimate is not None and estimate >= 0:
+            return int(estimate)
+    return await cached_count_async(db, stmt, table_name, scope)
+
+
+def invalidate_counts(table_name: str) -> None:
+    """Drop every cached count for a table after rows were inserted or deleted."""
+    try:
+        keys = r.smembers(f"count_keys:{table_name}")
+        if keys:
+            r.delete(*keys, f"count_keys:{table_name}")
+    except redis.RedisError:
+        pass
@@ -0,0 +1,374 @@
+import argparse
+import logging
+import select as io_select
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import psycopg2
+import psycopg2.extensions
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from database.connection import DATABASE_URL, SessionLocal, engine
+from database.pagination import invalidate_counts
+from database.units import COUNT, MASS, VOLUME, from_grams, normalize_unit, parse_unit, to_grams
+from models.approximate_measurement import ApproximateMeasurement
+from models.density import Density
+from models.ingredient import Ingredient
+from models.ingredient_nutrient import IngredientNutrient
+from models.ingredient_offer import IngredientOffer
+from models.nutrient import Nutrient
+from models.recipe import Recipe
+from models.recipe_analytics import RecipeAnalytics
+from models.recipe_ingredient import RecipeIngredient
+
+logger = logging.getLogger(__name__)
+
+# Queue filled by the dependency triggers in simp-database-init/triggers/analytics.py
+ANALYTICS_CHANNEL = "recipe_analytics"
+ENERGY_SYMBOL = "ENERC_KCAL"
+# ingredient_offers.unit_price is per kg / l / unit; base units are g / ml / unit.
+OFFER_UNIT_SIZE = {MASS: 1000.0, VOLUME: 1000.0, COUNT: 1.0}
+
+# Recipes recomputed per transaction (queue drain and full rebuild).
+CHUNK_SIZE = 500
+POLL_TIMEOUT = 5
+RECONNECT_DELAY = 5
+
+DEQUEUE_SQL = text("""
+    DELETE FROM recipe_analytics_queue
+    WHERE recipe_id IN (
+        SELECT recipe_id FROM recipe_analytics_queue
+        ORDER BY queued_at
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING recipe_id
+""")
+
+
+@dataclass
+class IngredientFacts:
+    density: Optional[float] = None  # g/ml
+    grams_per: Dict[str, float] = field(default_factory=dict)  # normalized unit -> grams of one unit
+    kcal_per_100g: Optional[float] = None
+    offers: List[Tuple[str, float]] = field(default_factory=list)  # (dimension, price per base unit)
+
+    @property
+    def grams_per_unit(self) -> Optional[float]:
+        for unit, grams in self.grams_per.items():
+            parsed = parse_unit(unit)
+            if parsed and parsed[0] == COUNT:
+                return grams / parsed[1]
+        return None
+
+
+def ingredient_grams(amount: float, measurement: str, facts: IngredientFacts) -> Optional[float]:
+    """Weight of a recipe line, preferring the ingredient's own approximations."""
+    unit = normalize_unit(measurement)
+    if unit in facts.grams_per:
+        return amount * facts.grams_per[unit]
+    # The raw text: normalize_unit drops dots, which would turn "2.5 kg" into "2 5 kg"
+    parsed = parse_unit(measurement)
+    if parsed is None:
+        return None
+    dimension, factor = parsed
+    return to_grams(amount * factor, dimension, facts.density, facts.grams_per_unit)
+
+
+def ingredient_quantity(amount: float, measurement: str, dimension: str, facts: IngredientFacts) -> Optional[float]:
+    """A recipe line expressed in the base unit of `dimension`."""
+    parsed = parse_unit(measurement)
+    if parsed and parsed[0] == dimension:
+        return amount * parsed[1]
+    grams = ingredient_grams(amount, measurement, facts)
+    if grams is None:
+        return None
+    return from_grams(grams, dimension, facts.density, facts.grams_per_unit)
+
+
+def line_cost(amount: float, measurement: str, facts: IngredientFacts) -> Optional[float]:
+    """Cheapest pro-rata cost of a recipe line over the ingredient's offers."""
+    best = None
+    for dimension, unit_price in facts.offers:
+        needed = ingredient_quantity(amount, measurement, dimension, facts)
+        if needed is not None and (best is None or needed * unit_price < best):
+            best = needed * unit_price
+    return best
+
+
+def compute_analytics(
+    recipe_ids: Iterable,
+    lines: Sequence[Tuple],
+    facts: Dict[object, IngredientFacts],
+) -> List[dict]:
+    """
+    minimum_price, total_calories and unpriced_ingredients of every recipe.
+    Pure function of the loaded inputs, so it can run in any process.
+    minimum_price is None when no line could be priced, total_calories when
+    no line could be converted.
+    """
+    price: Dict[object, Optional[float]] = {}
+    calories: Dict[object, Optional[float]] = {}
+    unpriced = defaultdict(int)
+
+    for recipe_id, ingredient_id, amount, measurement in lines:
+        ingredient = facts.get(ingredient_id, IngredientFacts())
+        amount = float(amount)
+
+        cost = line_cost(amount, measurement, ingredient)
+        if cost is None:
+            unpriced[recipe_id] += 1
+        else:
+            price[recipe_id] = (price.get(recipe_id) or 0.0) + cost
+
+        if ingredient.kcal_per_100g is not None:
+            grams = ingredient_grams(amount, measurement, ingredient)
+            if grams is not None:
+                calories[recipe_id] = (calories.get(recipe_id) or 0.0) + grams * ingredient.kcal_per_100g / 100
+
+    return [
+        {
+            "recipe_id": recipe_id,
+            "minimum_price": round(price[recipe_id], 2) if price.get(recipe_id) is not None else None,
+            "total_calories": round(calories[recipe_id], 2) if calories.get(recipe_id) is not None else None,
+            "unpriced_ingredients": unpriced[recipe_id],
+        }
+        for recipe_id in recipe_ids
+    ]
+
+
+def load_recipe_lines(db: Session, recipe_ids: Sequence) -> Tuple[List, List[Tuple]]:
+    """Existing recipes among `recipe_ids` and their (recipe_id, ingredient_id, amount, measurement) lines."""
+    existing = list(db.execute(select(Recipe.recipe_id).where(Recipe.recipe_id.in_(recipe_ids))).scalars())
+    if not existing:
+        return [], []
+    lines = db.execute(
+        select(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id, RecipeIngredient.amount, RecipeIngredient.measurement)
+        .where(RecipeIngredient.recipe_id.in_(existing))
+    ).all()
+    return existing, [tuple(line) for line in lines]
+
+
+def load_conversion_facts(db: Session, ingredient_ids: Sequence, facts: Dict[object, IngredientFacts]) -> None:
+    """Fill in the densities and approximate unit weights of `ingredient_ids`."""
+    for ingredient_id, density in db.execute(
+        select(Ingredient.ingredient_id, func.coalesce(Ingredient.density_g_per_ml, Density.density))
+        .outerjoin(Density, Density.ingredient_id == Ingredient.ingredient_id)
+        .where(Ingredient.ingredient_id.in_(ingredient_ids))
+    ):
+        facts[ingredient_id].density = float(density) if density else None
+
+    for ingredient_id, measurement_type, value, grams in db.execute(
+        select(
+            ApproximateMeasurement.ingredient_id,
+            ApproximateMeasurement.measurement_type,
+            ApproximateMeasurement.value,
+            ApproximateMeasurement.equivalent_in_grams,
+        ).where(ApproximateMeasurement.ingredient_id.in_(ingredient_ids))
+    ):
+        if value:
+            facts[ingredient_id].grams_per[normalize_unit(measurement_type)] = float(grams) / float(value)
+
+
+def load_inputs(db: Session, recipe_ids: Sequence) -> Tuple[List, List[Tuple], Dict[object, IngredientFacts]]:
+    """Existing recipes among `recipe_ids`, their ingredient lines and the facts of those ingredients."""
+    existing, lines = load_recipe_lines(db, recipe_ids)
+    ingredient_ids = list({line[1] for line in lines})
+    facts: Dict[object, IngredientFacts] = defaultdict(IngredientFacts)
+    if not ingredient_ids:
+        return existing, lines, facts
+
+    load_conversion_facts(db, ingredient_ids, facts)
+
+    for ingredient_id, kcal in db.execute(
+        select(IngredientNutrient.ingredient_id, IngredientNutrient.nutrient_value)
+        .join(Nutrient, Nutrient.nutrient_id == IngredientNutrient.nutrient_id)
+        .where(
+            IngredientNutrient.ingredient_id.in_(ingredient_ids),
+            Nutrient.nutrient_symbol == ENERGY_SYMBOL,
+            IngredientNutrient.value_basis == "per 100g",
+        )
+    ):
+        facts[ingredient_id].kcal_per_100g = float(kcal)
+
+    # Cheapest offer per dimension, read from the ingredient_offers index
+    for ingredient_id, dimension, unit_price in db.execute(
+        select(IngredientOffer.ingredient_id, IngredientOffer.dimension, func.min(IngredientOffer.unit_price))
+        .where(IngredientOffer.ingredient_id.in_(ingredient_ids))
+        .group_by(IngredientOffer.ingredient_id, IngredientOffer.dimension)
+    ):
+        facts[ingredient_id].offers.append((dimension, float(unit_price) / OFFER_UNIT_SIZE[dimension]))
+
+    return existing, lines, facts
+
+
+def write_analytics(db: Session, rows: List[dict]) -> None:
+    """Upsert computed rows into recipe_analytics (one statement)."""
+    if not rows:
+        return
+    stmt = pg_insert(RecipeAnalytics).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RecipeAnalytics.recipe_id],
+        set_={
+            "minimum_price": stmt.excluded.minimum_price,
+            "total_calories": stmt.excluded.total_calories,
+            "unpriced_ingredients": stmt.excluded.unpriced_ingredients,
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt)
+
+
+def recompute_recipes(db: Session, recipe_ids: Sequence) -> int:
+    """Recompute the analytics of `recipe_ids` in the caller's transaction."""
+    existing, lines, facts = load_inputs(db, recipe_ids)
+    write_analytics(db, compute_analytics(existing, lines, facts))
+    return len(existing)
+
+
+def drain_queue(limit: int = CHUNK_SIZE) -> int:
+    """
+    Recompute queued recipes chunk by chunk. Dequeue and upsert share a
+    transaction, so a failed chunk stays queued; SKIP LOCKED lets several
+    workers drain concurrently.
+    """
+    total = 0
+    while True:
+        db = SessionLocal()
+        try:
+            recipe_ids = list(db.execute(DEQUEUE_SQL, {"limit": limit}).scalars())
+            if not recipe_ids:
+                db.commit()
+                break
+            total += recompute_recipes(db, recipe_ids)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    if total:
+        invalidate_counts("recipe_analytics")
+    return total
+
+
+class RecipeAnalyticsWorker(threading.Thread):
+    """
+    Drains recipe_analytics_queue whenever the triggers notify, and on every
+    poll timeout so nothing queued while disconnected is left behind.
+    """
+
+    def __init__(self):
+        super().__init__(name="recipe-analytics-worker", daemon=True)
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            conn: Optional[psycopg2.extensions.connection] = None
+            try:
+                conn = psycopg2.connect(DATABASE_URL)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {ANALYTICS_CHANNEL};")
+                while not self._stop_event.is_set():
+                    drain_queue()
+                    if io_select.select([conn], [], [], POLL_TIMEOUT) != ([], [], []):
+                        conn.poll()
+                        conn.notifies.clear()
+            except Exception:
+                logger.exception("Recipe analytics worker failed; reconnecting")
+                self._stop_event.wait(RECONNECT_DELAY)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+_worker: Optional[RecipeAnalyticsWorker] = None
+
+
+def start_analytics_worker() -> None:
+    global _worker
+    if _worker is None:
+        _worker = RecipeAnalyticsWorker()
+        _worker.start()
+
+
+def stop_analytics_worker() -> None:
+    global _worker
+    if _worker is not None:
+        _worker.stop()
+        _worker = None
+
+
+# -------------------------
+# Full rebuild
+# -------------------------
+
+def _init_rebuild_process() -> None:
+    # Connections inherited from the parent must not be shared across processes.
+    engine.dispose(close=False)
+
+
+def _rebuild_chunk(recipe_ids: List) -> int:
+    db = SessionLocal()
+    try:
+        count = recompute_recipes(db, recipe_ids)
+        db.commit()
+        return count
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _recipe_id_chunks(chunk_size: int):
+    """Keyset walk over every recipe id."""
+    db = SessionLocal()
+    try:
+        last = None
+        while True:
+            stmt = select(Recipe.recipe_id).order_by(Recipe.recipe_id).limit(chunk_size)
+            if last is not None:
+                stmt = stmt.where(Recipe.recipe_id > last)
+            chunk = list(db.execute(stmt).scalars())
+            if not chunk:
+                return
+            yield chunk
+            last = chunk[-1]
+    finally:
+        db.close()
+
+
+def rebuild_all(workers: Optional[int] = None, chunk_size: int = CHUNK_SIZE) -> int:
+    """Recompute every recipe, one transaction per chunk, across a process pool."""
+    total = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_rebuild_process) as pool:
+        for count in pool.map(_rebuild_chunk, _recipe_id_chunks(chunk_size)):
+            total += count
+    invalidate_counts("recipe_analytics")
+    logger.info("Rebuilt analytics of %d recipes", total)
+    return total
+
+
+if __name__ == "__main__":
+    # python -m database.recipe_analytics rebuild [--workers N] [--chunk-size N]
+    parser = argparse.ArgumentParser(description="Recipe analytics maintenance.")
+    parser.add_argument("action", choices=["rebuild", "drain"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.action == "rebuild":
+        print(f"Recomputed {rebuild_all(args.workers, args.chunk_size)} recipes")
+    else:
+        print(f"Recomputed {drain_queue(args.chunk_size)} queued recipes")
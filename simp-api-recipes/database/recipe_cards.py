@@ -0,0 +1,62 @@
+from sqlalchemy import Select, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Query, Session
+
+from models.recipe import Recipe
+from models.recipe_tag import RecipeTag
+from models.tag import Tag
+from schemas.recipe import RecipeOut
+
+
+def tag_names_column():
+    """
+    Correlated `array_agg` of a recipe's tag names, ordered by name.
+    Evaluates to an empty array for untagged recipes.
+    """
+    tag_names = (
+        select(func.array_agg(aggregate_order_by(Tag.name, Tag.name)))
+        .select_from(RecipeTag.join(Tag, Tag.tag_id == RecipeTag.c.tag_id))
+        .where(RecipeTag.c.recipe_id == Recipe.recipe_id)
+        .correlate(Recipe)
+        .scalar_subquery()
+    )
+    return func.coalesce(tag_names, literal_column("'{}'::varchar[]")).label("tags")
+
+
+def recipe_card_columns() -> tuple:
+    return (
+        Recipe.recipe_id,
+        Recipe.title,
+        Recipe.front_image,
+        Recipe.created_at,
+        tag_names_column(),
+    )
+
+
+def recipe_cards_query(db: Session) -> Query:
+    """
+    Lightweight card rows (no ORM identity map) for recipe listings.
+    Tags are aggregated in the same statement, so a page costs a single
+    round trip regardless of its size; the viewer's cauldron flag comes
+    from Redis (see database/cauldron_membership.py).
+    """
+    return db.query(*recipe_card_columns())
+
+
+def recipe_cards_select() -> Select:
+    """`recipe_cards_query` as a Select, for AsyncSession callers."""
+    return select(*recipe_card_columns())
+
+
+def to_recipe_out(row, in_cauldron: bool = False) -> RecipeOut:
+    """Convert a `recipe_cards_query` row into the RecipeOut schema."""
+    return RecipeOut(
+        recipe_id=row.recipe_id,
+        title=row.title,
+        front_image=row.front_image,
+        tags=list(row.tags or []),
+        in_cauldron=in_cauldron,
+        minimum_price=getattr(row, "minimum_price", None),
+        unpriced_ingredients=getattr(row, "unpriced_ingredients", None),
+        total_calories=getattr(row, "total_calories", None),
+    )
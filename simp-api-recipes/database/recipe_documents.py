@@ -0,0 +1,137 @@
+import json
+import uuid
+from typing import Optional
+
+import redis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database.handling import async_r, r
+
+# Documents are cached per recipe version: every write bumps recipes.version,
+# and so do tag and ingredient renames (simp-database-init/triggers/tsvectors.py).
+RECIPE_DOCUMENT_TTL = 3600
+
+# The whole EditRecipe document (ingredient names, ordered steps, images and
+# tags) is assembled by Postgres in one statement.
+RECIPE_DOCUMENT_SQL = text("""
+    SELECT jsonb_build_object(
+        'recipe_id', r.recipe_id,
+        'title', r.title,
+        'description', r.description,
+        'front_image', r.front_image,
+        'author_id', r.author_id,
+        'servings', r.servings,
+        'version', r.version,
+        'ingredients', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                       'ingredient_name', i.name,
+                       'amount', ri.amount,
+                       'measurement', ri.measurement,
+                       'position', ri.position
+                   ) ORDER BY ri.position)
+            FROM recipe_ingredients ri
+            JOIN ingredients i ON i.ingredient_id = ri.ingredient_id
+            WHERE ri.recipe_id = r.recipe_id
+        ), '[]'::jsonb),
+        'steps', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                       'step_number', s.step_number,
+                       'description', s.description,
+                       'image_url', s.image_url
+                   ) ORDER BY s.step_number)
+            FROM recipe_steps s
+            WHERE s.recipe_id = r.recipe_id
+        ), '[]'::jsonb),
+        'images', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                       'image_url', im.image_url
+                   ) ORDER BY im.created_at)
+            FROM recipe_images im
+            WHERE im.recipe_id = r.recipe_id
+        ), '[]'::jsonb),
+        'tags', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                       'tag_id', t.tag_id,
+                       'name', t.name
+                   ) ORDER BY t.name)
+            FROM recipe_tags rt
+            JOIN tags t ON t.tag_id = rt.tag_id
+            WHERE rt.recipe_id = r.recipe_id
+        ), '[]'::jsonb)
+    )::text
+    FROM recipes r
+    WHERE r.recipe_id = :recipe_id
+""")
+
+
+RECIPE_VERSION_SQL = text("SELECT version FROM recipes WHERE recipe_id = :recipe_id")
+
+
+def _document_key(recipe_id, version) -> str:
+    return f"recipe_doc:{recipe_id}:{version}"
+
+
+def _stored_key(recipe_id, document: str) -> str:
+    # Keyed by the version the document itself carries, so a document built
+    # while a write committed can never be served for the newer version.
+    return _document_key(recipe_id, json.loads(document)["version"])
+
+
+def build_recipe_document(db: Session, recipe_id: uuid.UUID) -> Optional[str]:
+    """Serialized recipe document straight from Postgres, or None if the recipe does not exist."""
+    return db.execute(RECIPE_DOCUMENT_SQL, {"recipe_id": recipe_id}).scalar()
+
+
+def get_recipe_document(db: Session, recipe_id: uuid.UUID) -> Optional[str]:
+    """
+    Serialized recipe document, served from Redis when cached for the
+    recipe's current version (one primary-key lookup).
+    """
+    version = db.execute(RECIPE_VERSION_SQL, {"recipe_id": recipe_id}).scalar()
+    if version is None:
+        return None
+    try:
+        cached = r.get(_document_key(recipe_id, version))
+        if cached is not None:
+            return cached
+    except redis.RedisError:
+        return build_recipe_document(db, recipe_id)
+
+    document = build_recipe_document(db, recipe_id)
+    if document is not None:
+        try:
+            r.setex(_stored_key(recipe_id, document), RECIPE_DOCUMENT_TTL, document)
+        except redis.RedisError:
+            pass
+    return document
+
+
+async def get_recipe_document_async(db: AsyncSession, recipe_id: uuid.UUID) -> Optional[str]:
+    """`get_recipe_document` on an AsyncSession with the async Redis client."""
+    version = (await db.execute(RECIPE_VERSION_SQL, {"recipe_id": recipe_id})).scalar()
+    if version is None:
+        return None
+    try:
+        cached = await async_r.get(_document_key(recipe_id, version))
+        if cached is not None:
+            return cached
+    except redis.RedisError:
+        return (await db.execute(RECIPE_DOCUMENT_SQL, {"recipe_id": recipe_id})).scalar()
+
+    document = (await db.execute(RECIPE_DOCUMENT_SQL, {"recipe_id": recipe_id})).scalar()
+    if document is not None:
+        try:
+            await async_r.setex(_stored_key(recipe_id, document), RECIPE_DOCUMENT_TTL, document)
+        except redis.RedisError:
+            pass
+    return document
+
+
+def invalidate_recipe_document(recipe_id, version: int) -> None:
+    """Drop the cached document of a superseded version (unreachable anyway; frees it before the TTL)."""
+    try:
+        r.delete(_document_key(recipe_id, version))
+    except redis.RedisError:
+        pass
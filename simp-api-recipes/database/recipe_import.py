@@ -0,0 +1,238 @@
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from database.recipe_writes import lookup_tag_names, resolve_ingredient_ids, resolve_tag_ids
+from models.recipe import Recipe
+from models.recipe_image import RecipeImage
+from models.recipe_ingredient import RecipeIngredient
+from models.recipe_step import RecipeStep
+from models.recipe_tag import RecipeTag
+from schemas.recipe import CreateRecipe, RecipeImportLine, RecipeImportOut
+
+# Recipes written per transaction.
+IMPORT_CHUNK_SIZE = 500
+# Longest accepted line (one recipe document); longer lines fail without being buffered.
+MAX_LINE_BYTES = 1024 * 1024
+
+
+def _describe_validation_error(error: ValidationError) -> str:
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first.get("loc", ())) or "body"
+    return f"{location}: {first.get('msg')}"
+
+
+class RecipeImporter:
+    """
+    Writes newline-delimited CreateRecipe documents in chunked transactions.
+
+    Raw lines are buffered with `add` and parsed, resolved and inserted by
+    `flush` (blocking; call it from a worker thread in async routes).
+    Tag and ingredient ids are cached for the whole import, so every name is
+    resolved at most once no matter how many recipes use it.
+    """
+
+    def __init__(self, db: Session, chunk_size: int = IMPORT_CHUNK_SIZE):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.pending: List[Tuple[int, bytes]] = []
+        self.results: List[RecipeImportLine] = []
+        self.tag_names: Dict[uuid.UUID, str] = {}
+        self.tag_ids: Dict[str, uuid.UUID] = {}
+        self.ingredient_ids: Dict[str, uuid.UUID] = {}
+
+    @property
+    def chunk_ready(self) -> bool:
+        return len(self.pending) >= self.chunk_size
+
+    def add(self, line_number: int, raw: Optional[bytes]) -> None:
+        """Buffer one raw line; None stands for a line over MAX_LINE_BYTES."""
+        if raw is None:
+            self._fail(line_number, f"Line longer than {MAX_LINE_BYTES} bytes")
+        elif raw.strip():
+            self.pending.append((line_number, raw))
+
+    def flush(self) -> None:
+        """Parse and write every buffered line."""
+        items, self.pending = self.pending, []
+        recipes = []
+        for line_number, raw in items:
+            try:
+                recipe = CreateRecipe.model_validate_json(raw)
+            except ValidationError as e:
+                self._fail(line_number, _describe_validation_error(e))
+                continue
+            names = [i.ingredient_name.lower() for i in recipe.ingredients]
+            if len(set(names)) != len(names):
+                self._fail(line_number, "Duplicate ingredient in recipe")
+                continue
+            recipes.append((line_number, recipe))
+        if recipes:
+            self._write_chunk(recipes)
+
+    def summary(self) -> RecipeImportOut:
+        results = sorted(self.results, key=lambda result: result.line)
+        created = sum(1 for result in results if result.status == "created")
+        return RecipeImportOut(created=created, failed=len(results) - created, results=results)
+
+    # -------------------------
+    # Internals
+    # -------------------------
+
+    def _fail(self, line_number: int, detail: str) -> None:
+        self.results.append(RecipeImportLine(line=line_number, status="failed", detail=detail))
+
+    def _resolve(self, recipes: List[Tuple[int, CreateRecipe]]) -> List[Tuple[int, CreateRecipe]]:
+        """Resolve the chunk's tags and ingredients into the caches; drop lines with unknown tag ids."""
+        tag_ids = {t.tag_id for _, recipe in recipes for t in recipe.tags if t.tag_id}
+        self.tag_names.update(lookup_tag_names(self.db, [i for i in tag_ids if i not in self.tag_names]))
+
+        valid = []
+        for line_number, recipe in recipes:
+            unknown = [t.tag_id for t in recipe.tags if t.tag_id and t.tag_id not in self.tag_names]
+            if unknown:
+                self._fail(line_number, f"Tag {unknown[0]} not found.")
+            else:
+                valid.append((line_number, recipe))
+
+        tag_names = {t.name for _, recipe in valid for t in recipe.tags if not t.tag_id}
+        self.tag_ids.update(resolve_tag_ids(self.db, [n for n in tag_names if n not in self.tag_ids]))
+
+        ingredient_names = {i.ingredient_name for _, recipe in valid for i in recipe.ingredients}
+        self.ingredient_ids.update(resolve_ingredient_ids(
+            self.db, [n for n in ingredient_names if n.lower() not in self.ingredient_ids]
+        ))
+        return valid
+
+    def _insert(self, recipes: List[Tuple[int, CreateRecipe]]) -> List[uuid.UUID]:
+        """Multi-row INSERT of the recipes and their children; one statement per table."""
+        recipe_rows, tag_rows, ingredient_rows, step_rows, image_rows = [], [], [], [], []
+        for _, recipe in recipes:
+            recipe_id = uuid.uuid4()
+            recipe_rows.append({
+                "recipe_id": recipe_id,
+                "title": recipe.title,
+                "description": recipe.description,
+                "front_image": recipe.front_image,
+                "author_id": recipe.author_id,
+                "servings": recipe.servings,
+                "validated": False,
+            })
+            tag_ids = dict.fromkeys(t.tag_id if t.tag_id else self.tag_ids[t.name] for t in recipe.tags)
+            tag_rows.extend({"recipe_id": recipe_id, "tag_id": tag_id} for tag_id in tag_ids)
+            ingredient_rows.extend(
+                {
+                    "recipe_id": recipe_id,
+                    "ingredient_id": self.ingredient_ids[i.ingredient_name.lower()],
+                    "amount": i.amount,
+                    "measurement": i.measurement,
+                    "position": i.position,
+                }
+                for i in recipe.ingredients
+            )
+            step_rows.extend(
+                {
+                    "recipe_id": recipe_id,
+                    "step_number": s.step_number,
+                    "description": s.description,
+                    "image_url": s.image_url,
+                }
+                for s in recipe.steps
+            )
+            image_rows.extend(
+                {"recipe_id": recipe_id, "image_url": image.image_url}
+                for image in recipe.images
+                if image.image_url and image.image_url.strip()
+            )
+
+        self.db.execute(insert(Recipe.__table__), recipe_rows)
+        for table, rows in (
+            (RecipeTag, tag_rows),
+            (RecipeIngredient.__table__, ingredient_rows),
+            (RecipeStep.__table__, step_rows),
+            (RecipeImage.__table__, image_rows),
+        ):
+            if rows:
+                self.db.execute(insert(table), rows)
+        return [row["recipe_id"] for row in recipe_rows]
+
+    def _snapshot(self):
+        return dict(self.tag_names), dict(self.tag_ids), dict(self.ingredient_ids)
+
+    def _restore(self, snapshot) -> None:
+        # Ids created inside a rolled-back transaction no longer exist.
+        self.tag_names, self.tag_ids, self.ingredient_ids = snapshot
+
+    def _write_chunk(self, recipes: List[Tuple[int, CreateRecipe]]) -> None:
+        snapshot = self._snapshot()
+        results_before = len(self.results)
+        try:
+            valid = self._resolve(recipes)
+            recipe_ids = self._insert(valid) if valid else []
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()
+            self._restore(snapshot)
+            del self.results[results_before:]
+            self._write_one_by_one(recipes)
+            return
+
+        for (line_number, _), recipe_id in zip(valid, recipe_ids):
+            self.results.append(RecipeImportLine(line=line_number, status="created", recipe_id=recipe_id))
+
+    def _write_one_by_one(self, recipes: List[Tuple[int, CreateRecipe]]) -> None:
+        """Retry a failed chunk with a savepoint per recipe to pin errors to their lines."""
+        for line_number, recipe in recipes:
+            snapshot = self._snapshot()
+            results_before = len(self.results)
+            try:
+                with self.db.begin_nested():
+                    valid = self._resolve([(line_number, recipe)])
+                    recipe_ids = self._insert(valid) if valid else []
+            except SQLAlchemyError as e:
+                self._restore(snapshot)
+                del self.results[results_before:]
+                self._fail(line_number, str(getattr(e, "orig", e)).splitlines()[0])
+                continue
+            for recipe_id in recipe_ids:
+                self.results.append(RecipeImportLine(line=line_number, status="created", recipe_id=recipe_id))
+        self.db.commit()
+
+
+class LineReader:
+    """
+    Splits a streamed body into numbered lines. A line longer than
+    `max_line_bytes` is reported as None and dropped as it arrives, so the
+    buffer never holds more than one line's worth of bytes.
+    """
+
+    def __init__(self, max_line_bytes: int = MAX_LINE_BYTES):
+        self.max_line_bytes = max_line_bytes
+        self.line_number = 0
+        self.buffer = b""
+        self.oversized = False
+
+    def feed(self, chunk: bytes) -> List[Tuple[int, Optional[bytes]]]:
+        """Complete lines of `chunk` and the buffered remainder of the previous one."""
+        *lines, self.buffer = (self.buffer + chunk).split(b"\n")
+        complete = []
+        for line in lines:
+            self.line_number += 1
+            oversized = self.oversized or len(line) > self.max_line_bytes
+            complete.append((self.line_number, None if oversized else line))
+            self.oversized = False
+        if len(self.buffer) > self.max_line_bytes:
+            self.buffer, self.oversized = b"", True
+        return complete
+
+    def close(self) -> List[Tuple[int, Optional[bytes]]]:
+        """The last line, when the body does not end with a newline."""
+        if self.oversized:
+            return [(self.line_number + 1, None)]
+        if self.buffer.strip():
+            return [(self.line_number + 1, self.buffer)]
+        return []
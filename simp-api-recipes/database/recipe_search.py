@@ -0,0 +1,87 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, literal
+from sqlalchemy.orm import Session
+
+from database.recipe_cards import recipe_cards_query
+from database.trigram import search_with_fallback, set_word_similarity_threshold
+from models.recipe import Recipe
+from schemas.recipe import RecipeSearchHit
+
+# Minimum word similarity between the query and a title for the typo fallback.
+FALLBACK_WORD_SIMILARITY = 0.4
+
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=25, MinWords=10, MaxFragments=2"
+
+
+def _to_hit(row, snippet: Optional[str]) -> RecipeSearchHit:
+    return RecipeSearchHit(
+        recipe_id=row.recipe_id,
+        title=row.title,
+        front_image=row.front_image,
+        tags=list(row.tags or []),
+        rank=float(row.rank),
+        snippet=snippet,
+    )
+
+
+def _tsquery(q: str):
+    return func.websearch_to_tsquery("english", q)
+
+
+def full_text_search(db: Session, q: str, skip: int, limit: int) -> List[RecipeSearchHit]:
+    """
+    Ranked full-text search over `recipes.search_tsv` (GIN index).
+    The headline is only computed for the returned page: Postgres evaluates
+    expensive output expressions after ORDER BY / LIMIT.
+    """
+    tsquery = _tsquery(q)
+    rank = func.ts_rank_cd(Recipe.search_tsv, tsquery).label("rank")
+    snippet = func.ts_headline(
+        "english", func.coalesce(Recipe.description, ""), tsquery, HEADLINE_OPTIONS
+    ).label("snippet")
+
+    rows = (
+        recipe_cards_query(db)
+        .add_columns(rank, snippet)
+        .filter(Recipe.search_tsv.op("@@")(tsquery))
+        .order_by(rank.desc(), Recipe.recipe_id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return [_to_hit(row, row.snippet or None) for row in rows]
+
+
+def trigram_search(db: Session, q: str, skip: int, limit: int) -> List[RecipeSearchHit]:
+    """
+    Typo-tolerant title match through the gin_trgm_ops index (`<%` operator),
+    ordered by word similarity.
+    """
+    set_word_similarity_threshold(db, FALLBACK_WORD_SIMILARITY)
+    rank = func.word_similarity(q, Recipe.title).label("rank")
+
+    rows = (
+        recipe_cards_query(db)
+        .add_columns(rank)
+        .filter(literal(q).op("<%")(Recipe.title))
+        .order_by(rank.desc(), Recipe.recipe_id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return [_to_hit(row, None) for row in rows]
+
+
+def search_recipes(db: Session, q: str, skip: int = 0, limit: int = 10) -> Tuple[List[RecipeSearchHit], str]:
+    """
+    Full-text results, or trigram title matches when the query has no
+    full-text hit at all (usually a misspelling). Returns the hits and the
+    strategy that produced them ("fulltext" or "trigram").
+    """
+    return search_with_fallback(
+        db,
+        Recipe.search_tsv.op("@@")(_tsquery(q)),
+        lambda: full_text_search(db, q, skip, limit),
+        lambda: trigram_search(db, q, skip, limit),
+    )
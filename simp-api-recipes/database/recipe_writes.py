@@ -0,0 +1,353 @@
+import uuid
+from decimal import Decimal
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from models.ingredient import Ingredient
+from models.recipe_image import RecipeImage
+from models.recipe_ingredient import RecipeIngredient
+from models.recipe_step import RecipeStep
+from models.recipe_tag import RecipeTag
+from models.tag import Tag
+from schemas.recipe import CreateRecipe, CreateRecipeTag, RecipeChanges
+
+AMOUNT_PRECISION = Decimal("0.01")
+
+
+def _unique(values: Iterable) -> list:
+    """Drop duplicates while keeping the first-seen order."""
+    return list(dict.fromkeys(values))
+
+
+def lookup_tag_names(db: Session, tag_ids: Sequence[uuid.UUID]) -> Dict[uuid.UUID, str]:
+    """Names of the given tag ids in one IN query; unknown ids are absent from the result."""
+    if not tag_ids:
+        return {}
+    return dict(db.execute(select(Tag.tag_id, Tag.name).where(Tag.tag_id.in_(list(tag_ids)))).all())
+
+
+def resolve_tag_ids(db: Session, names: Sequence[str]) -> Dict[str, uuid.UUID]:
+    """
+    Map tag names to ids with one IN query, creating the missing tags with a
+    single INSERT ... ON CONFLICT DO NOTHING RETURNING.
+    """
+    names = _unique(names)
+    if not names:
+        return {}
+
+    ids = {name: tag_id for tag_id, name in db.execute(select(Tag.tag_id, Tag.name).where(Tag.name.in_(names)))}
+    missing = [name for name in names if name not in ids]
+    if missing:
+        created = db.execute(
+            pg_insert(Tag)
+            .values([{"tag_id": uuid.uuid4(), "name": name} for name in missing])
+            .on_conflict_do_nothing(index_elements=[Tag.name])
+            .returning(Tag.tag_id, Tag.name)
+        )
+        ids.update({name: tag_id for tag_id, name in created})
+
+        # Rows skipped by ON CONFLICT were created by a concurrent request.
+        raced = [name for name in missing if name not in ids]
+        if raced:
+            ids.update({
+                name: tag_id
+                for tag_id, name in db.execute(select(Tag.tag_id, Tag.name).where(Tag.name.in_(raced)))
+            })
+    return ids
+
+
+def resolve_tags(db: Session, tags: Sequence[CreateRecipeTag]) -> List[Tuple[uuid.UUID, str]]:
+    """
+    Resolve the submitted tags to (tag_id, name) pairs in input order.
+    Tags given by id must exist (400 otherwise); tags given by name are created on demand.
+    """
+    tag_ids = _unique(t.tag_id for t in tags if t.tag_id)
+    by_id = lookup_tag_names(db, tag_ids)
+    missing_ids = [tag_id for tag_id in tag_ids if tag_id not in by_id]
+    if missing_ids:
+        raise HTTPException(status_code=400, detail=f"Tag {missing_ids[0]} not found.")
+    by_name = resolve_tag_ids(db, [t.name for t in tags if not t.tag_id])
+
+    resolved = []
+    for tag in tags:
+        if tag.tag_id:
+            resolved.append((tag.tag_id, by_id[tag.tag_id]))
+        else:
+            resolved.append((by_name[tag.name], tag.name))
+    return _unique(resolved)
+
+
+def resolve_ingredient_ids(db: Session, names: Sequence[str]) -> Dict[str, uuid.UUID]:
+    """
+    Map each ingredient name (case-insensitively, keyed by its lower-cased form)
+    to an ingredient id, creating the missing ingredients in one statement.
+    Both the lookup and the upsert go through the unique index on lower(name).
+    """
+    wanted = {name.lower(): name for name in reversed(names)}
+    if not wanted:
+        return {}
+
+    lowered = func.lower(Ingredient.name)
+    ids = {
+        name: ingredient_id
+        for ingredient_id, name in db.execute(
+            select(Ingredient.ingredient_id, lowered).where(lowered.in_(list(wanted)))
+        )
+    }
+
+    missing = [key for key in wanted if key not in ids]
+    if missing:
+        # Python-side column defaults (id, default_unit, diet_level, ...) are
+        # applied by Core for every row of the multi-VALUES insert.
+        created = db.execute(
+            pg_insert(Ingredient)
+            .values([{"name": wanted[key]} for key in missing])
+            .on_conflict_do_nothing(index_elements=[lowered])
+            .returning(Ingredient.ingredient_id, lowered)
+        )
+        ids.update({name: ingredient_id for ingredient_id, name in created})
+
+        raced = [key for key in missing if key not in ids]
+        if raced:
+            ids.update({
+                name: ingredient_id
+                for ingredient_id, name in db.execute(
+                    select(Ingredient.ingredient_id, lowered).where(lowered.in_(raced))
+                )
+            })
+    return ids
+
+
+def insert_recipe_tags(db: Session, recipe_id: uuid.UUID, tag_ids: Sequence[uuid.UUID]) -> None:
+    if tag_ids:
+        db.execute(insert(RecipeTag), [{"recipe_id": recipe_id, "tag_id": tag_id} for tag_id in tag_ids])
+
+
+def insert_recipe_ingredients(db: Session, recipe_id: uuid.UUID, recipe: CreateRecipe) -> None:
+    if not recipe.ingredients:
+        return
+    ingredient_ids = resolve_ingredient_ids(db, [i.ingredient_name for i in recipe.ingredients])
+    db.execute(
+        insert(RecipeIngredient.__table__),
+        [
+            {
+                "recipe_id": recipe_id,
+                "ingredient_id": ingredient_ids[i.ingredient_name.lower()],
+                "amount": i.amount,
+                "measurement": i.measurement,
+                "position": i.position,
+            }
+            for i in recipe.ingredients
+        ],
+    )
+
+
+def insert_recipe_steps(db: Session, recipe_id: uuid.UUID, recipe: CreateRecipe) -> None:
+    if recipe.steps:
+        db.execute(
+            insert(RecipeStep.__table__),
+            [
+                {
+                    "recipe_id": recipe_id,
+                    "step_number": s.step_number,
+                    "description": s.description,
+                    "image_url": s.image_url,
+                }
+                for s in recipe.steps
+            ],
+        )
+
+
+def insert_recipe_images(db: Session, recipe_id: uuid.UUID, recipe: CreateRecipe) -> None:
+    # Blank image URLs are skipped rather than stored.
+    rows = [
+        {"recipe_id": recipe_id, "image_url": image.image_url}
+        for image in recipe.images
+        if image.image_url and image.image_url.strip()
+    ]
+    if rows:
+        db.execute(insert(RecipeImage.__table__), rows)
+
+
+def write_recipe_children(db: Session, recipe_id: uuid.UUID, recipe: CreateRecipe) -> List[str]:
+    """
+    Insert tags, ingredients, steps and images of a recipe with a handful of
+    set-based statements (one executemany per child table).
+    The recipe row must already be flushed. Returns the tag names.
+    """
+    tags = resolve_tags(db, recipe.tags)
+    insert_recipe_tags(db, recipe_id, [tag_id for tag_id, _ in tags])
+    insert_recipe_ingredients(db, recipe_id, recipe)
+    insert_recipe_steps(db, recipe_id, recipe)
+    insert_recipe_images(db, recipe_id, recipe)
+    return [name for _, name in tags]
+
+
+def _quantize_amount(amount) -> Decimal:
+    """Normalize a submitted amount to the Numeric(10, 2) precision of the column."""
+    return Decimal(str(amount)).quantize(AMOUNT_PRECISION)
+
+
+def sync_recipe_children(db: Session, recipe_id: uuid.UUID, recipe: CreateRecipe) -> RecipeChanges:
+    """
+    Bring the stored children of a recipe in line with `recipe` by diffing
+    instead of deleting and re-inserting everything.
+
+    Rows are matched on their natural key (tag id, ingredient id, step number,
+    image url); only added, modified and removed rows are written, with one
+    batched statement per table and kind of change.
+    """
+    changes = RecipeChanges()
+
+    # --- Tags ---
+    tags = resolve_tags(db, recipe.tags)
+    new_tag_ids = {tag_id for tag_id, _ in tags}
+    stored_tag_ids = set(db.execute(select(RecipeTag.c.tag_id).where(RecipeTag.c.recipe_id == recipe_id)).scalars())
+    removed_tags = stored_tag_ids - new_tag_ids
+    if removed_tags:
+        db.execute(
+            delete(RecipeTag).where(RecipeTag.c.recipe_id == recipe_id, RecipeTag.c.tag_id.in_(removed_tags))
+        )
+    insert_recipe_tags(db, recipe_id, [tag_id for tag_id, _ in tags if tag_id not in stored_tag_ids])
+    changes.tags_added = len(new_tag_ids - stored_tag_ids)
+    changes.tags_removed = len(removed_tags)
+    changes.tag_names = [name for _, name in tags]
+
+    # --- Ingredients (keyed by ingredient id) ---
+    ingredient_table = RecipeIngredient.__table__
+    ingredient_ids = resolve_ingredient_ids(db, [i.ingredient_name for i in recipe.ingredients])
+    incoming = {
+        ingredient_ids[i.ingredient_name.lower()]: {
+            "amount": _quantize_amount(i.amount),
+            "measurement": i.measurement,
+            "position": i.position,
+        }
+        for i in recipe.ingredients
+    }
+    stored = {
+        row.ingredient_id: {"amount": row.amount, "measurement": row.measurement, "position": row.position}
+        for row in db.execute(
+            select(
+                ingredient_table.c.ingredient_id,
+                ingredient_table.c.amount,
+                ingredient_table.c.measurement,
+                ingredient_table.c.position,
+            ).where(ingredient_table.c.recipe_id == recipe_id)
+        )
+    }
+    removed = [ingredient_id for ingredient_id in stored if ingredient_id not in incoming]
+    added = [ingredient_id for ingredient_id in incoming if ingredient_id not in stored]
+    modified = [
+        ingredient_id for ingredient_id, values in incoming.items()
+        if ingredient_id in stored and stored[ingredient_id] != values
+    ]
+    if removed:
+        db.execute(
+            delete(ingredient_table).where(
+                ingredient_table.c.recipe_id == recipe_id,
+                ingredient_table.c.ingredient_id.in_(removed),
+            )
+        )
+    if modified:
+        db.execute(
+            update(ingredient_table)
+            .where(
+                ingredient_table.c.recipe_id == bindparam("b_recipe_id"),
+                ingredient_table.c.ingredient_id == bindparam("b_ingredient_id"),
+            )
+            .values(
+                amount=bindparam("b_amount"),
+                measurement=bindparam("b_measurement"),
+                position=bindparam("b_position"),
+            ),
+            [
+                {
+                    "b_recipe_id": recipe_id,
+                    "b_ingredient_id": ingredient_id,
+                    "b_amount": incoming[ingredient_id]["amount"],
+                    "b_measurement": incoming[ingredient_id]["measurement"],
+                    "b_position": incoming[ingredient_id]["position"],
+                }
+                for ingredient_id in modified
+            ],
+        )
+    if added:
+        db.execute(
+            insert(ingredient_table),
+            [{"recipe_id": recipe_id, "ingredient_id": ingredient_id, **incoming[ingredient_id]} for ingredient_id in added],
+        )
+    changes.ingredients_added = len(added)
+    changes.ingredients_updated = len(modified)
+    changes.ingredients_removed = len(removed)
+
+    # --- Steps (keyed by step number) ---
+    step_table = RecipeStep.__table__
+    incoming_steps = {
+        s.step_number: {"description": s.description, "image_url": s.image_url}
+        for s in recipe.steps
+    }
+    stored_steps = {}
+    duplicate_step_ids = []
+    for row in db.execute(
+        select(step_table.c.step_id, step_table.c.step_number, step_table.c.description, step_table.c.image_url)
+        .where(step_table.c.recipe_id == recipe_id)
+        .order_by(step_table.c.created_at)
+    ):
+        if row.step_number in stored_steps:
+            duplicate_step_ids.append(row.step_id)
+        else:
+            stored_steps[row.step_number] = row
+    removed_step_ids = duplicate_step_ids + [
+        row.step_id for number, row in stored_steps.items() if number not in incoming_steps
+    ]
+    modified_steps = [
+        (stored_steps[number].step_id, values) for number, values in incoming_steps.items()
+        if number in stored_steps
+        and (stored_steps[number].description, stored_steps[number].image_url) != (values["description"], values["image_url"])
+    ]
+    added_steps = [number for number in incoming_steps if number not in stored_steps]
+    if removed_step_ids:
+        db.execute(delete(step_table).where(step_table.c.step_id.in_(removed_step_ids)))
+    if modified_steps:
+        db.execute(
+            update(step_table)
+            .where(step_table.c.step_id == bindparam("b_step_id"))
+            .values(description=bindparam("b_description"), image_url=bindparam("b_image_url")),
+            [
+                {"b_step_id": step_id, "b_description": values["description"], "b_image_url": values["image_url"]}
+                for step_id, values in modified_steps
+            ],
+        )
+    if added_steps:
+        db.execute(
+            insert(step_table),
+            [{"recipe_id": recipe_id, "step_number": number, **incoming_steps[number]} for number in added_steps],
+        )
+    changes.steps_added = len(added_steps)
+    changes.steps_updated = len(modified_steps)
+    changes.steps_removed = len(removed_step_ids)
+
+    # --- Images (keyed by url) ---
+    image_table = RecipeImage.__table__
+    incoming_urls = _unique(
+        image.image_url for image in recipe.images if image.image_url and image.image_url.strip()
+    )
+    stored_urls = set(
+        db.execute(select(image_table.c.image_url).where(image_table.c.recipe_id == recipe_id)).scalars()
+    )
+    removed_urls = stored_urls - set(incoming_urls)
+    added_urls = [url for url in incoming_urls if url not in stored_urls]
+    if removed_urls:
+        db.execute(
+            delete(image_table).where(image_table.c.recipe_id == recipe_id, image_table.c.image_url.in_(removed_urls))
+        )
+    if added_urls:
+        db.execute(insert(image_table), [{"recipe_id": recipe_id, "image_url": url} for url in added_urls])
+    changes.images_added = len(added_urls)
+    changes.images_removed = len(removed_urls)
+
+    return changes
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from database.recipe_analytics import IngredientFacts, ingredient_grams, load_conversion_facts, load_recipe_lines
+from database.units import COUNT, VOLUME, normalize_unit, parse_unit
+
+# Why a recipe line has no weight
+UNKNOWN_UNIT = "unknown_unit"
+MISSING_DENSITY = "missing_density"
+MISSING_UNIT_WEIGHT = "missing_unit_weight"
+
+# Seconds a resolved factor is reused before densities / approximations are re-read.
+FACTOR_CACHE_TTL = 300
+# Expired entries are swept once the cache grows past this many factors.
+FACTOR_CACHE_MAX = 50000
+
+
+@dataclass(frozen=True)
+class Factor:
+    grams: Optional[float]  # grams per 1 of the line amount
+    dimension: Optional[str]
+    reason: Optional[str] = None
+
+
+FactorKey = Tuple[object, str]  # (ingredient_id, measurement key)
+
+# (ingredient_id, measurement key) -> (expires_at, factor); unresolved factors are cached too.
+# Requests run in the threadpool, so every access goes through _factors_lock.
+_factors: Dict[FactorKey, Tuple[float, Factor]] = {}
+_factors_lock = threading.Lock()
+
+
+def measurement_key(measurement: Optional[str]) -> str:
+    """Cache key of a free-text measurement; keeps dots so "2.5 kg" stays a quantity."""
+    return " ".join((measurement or "").lower().split())
+
+
+def resolve_factor(measurement: str, facts: IngredientFacts) -> Factor:
+    """Grams per 1 of `measurement` for one ingredient, or the reason there is none."""
+    parsed = parse_unit(measurement)
+    grams = ingredient_grams(1.0, measurement, facts)
+    if grams is not None:
+        return Factor(grams, parsed[0] if parsed else COUNT)
+    if parsed is None:
+        return Factor(None, None, UNKNOWN_UNIT)
+    dimension = parsed[0]
+    return Factor(None, dimension, MISSING_DENSITY if dimension == VOLUME else MISSING_UNIT_WEIGHT)
+
+
+def _sweep(now: float) -> None:
+    """Drop expired factors; the caller holds _factors_lock."""
+    for key in [k for k, (expires_at, _) in _factors.items() if expires_at <= now]:
+        del _factors[key]
+
+
+def resolve_factors(db: Session, pairs: Sequence[Tuple[object, str]]) -> Dict[FactorKey, Factor]:
+    """
+    Factors of every (ingredient_id, measurement) pair. Cache misses are
+    resolved together: one density and one approximation query per call.
+    """
+    now = time.monotonic()
+    resolved: Dict[FactorKey, Factor] = {}
+    missing: Dict[FactorKey, str] = {}
+    with _factors_lock:
+        for ingredient_id, measurement in pairs:
+            key = (ingredient_id, measurement_key(measurement))
+            if key in resolved or key in missing:
+                continue
+            cached = _factors.get(key)
+            if cached and cached[0] > now:
+                resolved[key] = cached[1]
+            else:
+                missing[key] = measurement
+
+    if missing:
+        facts: Dict[object, IngredientFacts] = defaultdict(IngredientFacts)
+        load_conversion_facts(db, list({ingredient_id for ingredient_id, _ in missing}), facts)
+        fresh = {key: resolve_factor(measurement, facts[key[0]]) for key, measurement in missing.items()}
+        resolved.update(fresh)
+        with _factors_lock:
+            if len(_factors) + len(fresh) > FACTOR_CACHE_MAX:
+                _sweep(now)
+            for key, factor in fresh.items():
+                _factors[key] = (now + FACTOR_CACHE_TTL, factor)
+    return resolved
+
+
+def convert_recipes(db: Session, recipe_ids: Sequence, unresolved_only: bool = False) -> List[dict]:
+    """
+    Gram weight of every ingredient line of the existing recipes in `recipe_ids`.
+    Lines that cannot be converted carry the reason instead of a weight.
+    """
+    existing, lines = load_recipe_lines(db, recipe_ids)
+    factors = resolve_factors(db, [(ingredient_id, measurement) for _, ingredient_id, _, measurement in lines])
+
+    recipes = {
+        recipe_id: {"recipe_id": recipe_id, "total_grams": 0.0, "unresolved": 0, "lines": []}
+        for recipe_id in existing
+    }
+    for recipe_id, ingredient_id, amount, measurement in lines:
+        factor = factors[(ingredient_id, measurement_key(measurement))]
+        recipe = recipes[recipe_id]
+        grams = None
+        if factor.grams is None:
+            recipe["unresolved"] += 1
+        else:
+            grams = round(float(amount) * factor.grams, 2)
+            recipe["total_grams"] += grams
+        if factor.grams is None or not unresolved_only:
+            recipe["lines"].append({
+                "ingredient_id": ingredient_id,
+                "amount": float(amount),
+                "measurement": measurement,
+                "unit": normalize_unit(measurement),
+                "dimension": factor.dimension,
+                "grams": grams,
+                "reason": factor.reason,
+            })
+
+    for recipe in recipes.values():
+        recipe["total_grams"] = round(recipe["total_grams"], 2)
+    return [recipes[recipe_id] for recipe_id in existing]
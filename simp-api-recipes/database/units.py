@@ -0,0 +1,135 @@
+import re
+from typing import Dict, Optional, Tuple
+
+# Every measurement is reduced to one of three dimensions and its base unit.
+MASS = "mass"  # grams
+VOLUME = "volume"  # millilitres
+COUNT = "count"  # units / pieces
+
+# Normalized spelling -> (dimension, amount of the base unit)
+UNIT_TABLE: Dict[str, Tuple[str, float]] = {
+    "mg": (MASS, 0.001),
+    "g": (MASS, 1.0),
+    "gr": (MASS, 1.0),
+    "gram": (MASS, 1.0),
+    "gramo": (MASS, 1.0),
+    "kg": (MASS, 1000.0),
+    "kilo": (MASS, 1000.0),
+    "kilogram": (MASS, 1000.0),
+    "kilogramo": (MASS, 1000.0),
+    "oz": (MASS, 28.3495),
+    "lb": (MASS, 453.592),
+    "ml": (VOLUME, 1.0),
+    "cl": (VOLUME, 10.0),
+    "dl": (VOLUME, 100.0),
+    "l": (VOLUME, 1000.0),
+    "liter": (VOLUME, 1000.0),
+    "litre": (VOLUME, 1000.0),
+    "litro": (VOLUME, 1000.0),
+    "tsp": (VOLUME, 5.0),
+    "teaspoon": (VOLUME, 5.0),
+    "cucharadita": (VOLUME, 5.0),
+    "tbsp": (VOLUME, 15.0),
+    "tablespoon": (VOLUME, 15.0),
+    "cucharada": (VOLUME, 15.0),
+    "cup": (VOLUME, 240.0),
+    "taza": (VOLUME, 240.0),
+    "unit": (COUNT, 1.0),
+    "u": (COUNT, 1.0),
+    "ud": (COUNT, 1.0),
+    "uds": (COUNT, 1.0),
+    "unidad": (COUNT, 1.0),
+    "piece": (COUNT, 1.0),
+    "pieza": (COUNT, 1.0),
+    "pcs": (COUNT, 1.0),
+}
+
+# Abbreviations that are not a plural of a UNIT_TABLE spelling.
+UNIT_ALIASES: Dict[str, str] = {
+    "grs": "g",
+    "kgs": "kg",
+    "lt": "l",
+    "lts": "l",
+    "tbs": "tbsp",
+    "tbl": "tbsp",
+    "cda": "cucharada",
+    "cdas": "cucharada",
+    "cdta": "cucharadita",
+    "cdtas": "cucharadita",
+    "und": "unidad",
+}
+
+
+def _compile_lookup() -> Dict[str, Tuple[str, float]]:
+    """UNIT_TABLE plus plurals and aliases, so parsing is a single dict lookup."""
+    lookup = {}
+    for unit, entry in UNIT_TABLE.items():
+        lookup.setdefault(unit + "s", entry)
+        lookup.setdefault(unit + "es", entry)
+    for alias, unit in UNIT_ALIASES.items():
+        lookup[alias] = UNIT_TABLE[unit]
+    lookup.update(UNIT_TABLE)
+    return lookup
+
+
+UNIT_LOOKUP = _compile_lookup()
+
+# Optional leading quantity of a measurement ("500 g", "1/2 cup", "½ taza").
+_FRACTIONS = {"½": 0.5, "¼": 0.25, "¾": 0.75, "⅓": 1 / 3, "⅔": 2 / 3}
+_QUANTITY = re.compile(r"^(\d+/\d+|\d+(?:[.,]\d+)?|[½¼¾⅓⅔])\s*(.*)$")
+_NOTES = re.compile(r"\(.*?\)")
+
+
+def normalize_unit(measurement: Optional[str]) -> str:
+    """Lower-case, drop dots and collapse whitespace ("Tbsp." -> "tbsp")."""
+    return " ".join((measurement or "").lower().replace(".", " ").split())
+
+
+def _quantity(token: str) -> Optional[float]:
+    if token in _FRACTIONS:
+        return _FRACTIONS[token]
+    if "/" in token:
+        numerator, denominator = token.split("/")
+        return float(numerator) / float(denominator) if float(denominator) else None
+    return float(token.replace(",", "."))
+
+
+def parse_unit(measurement: Optional[str]) -> Optional[Tuple[str, float]]:
+    """
+    (dimension, base amount of one unit); None if unknown. Tolerates plurals,
+    notes in parentheses and a leading quantity ("500 g" -> (MASS, 500.0)).
+    """
+    text = _NOTES.sub(" ", measurement or "").strip()
+    entry = UNIT_LOOKUP.get(normalize_unit(text))
+    if entry is not None:
+        return entry
+    match = _QUANTITY.match(text)
+    if match is None:
+        return None
+    entry = UNIT_LOOKUP.get(normalize_unit(match.group(2)))
+    quantity = _quantity(match.group(1))
+    if entry is None or not quantity:
+        return None
+    return entry[0], entry[1] * quantity
+
+
+def to_grams(base_amount: float, dimension: str, density: Optional[float], grams_per_unit: Optional[float]) -> Optional[float]:
+    """Base amount of `dimension` in grams, through density or a unit weight."""
+    if dimension == MASS:
+        return base_amount
+    if dimension == VOLUME:
+        return base_amount * density if density else None
+    if dimension == COUNT:
+        return base_amount * grams_per_unit if grams_per_unit else None
+    return None
+
+
+def from_grams(grams: float, dimension: str, density: Optional[float], grams_per_unit: Optional[float]) -> Optional[float]:
+    """Inverse of `to_grams`."""
+    if dimension == MASS:
+        return grams
+    if dimension == VOLUME:
+        return grams / density if density else None
+    if dimension == COUNT:
+        return grams / grams_per_unit if grams_per_unit else None
+    return None
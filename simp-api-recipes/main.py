@@ -6,6 +6,11 @@ from api.recipes import router as recipe_router
 from api.tags import router as tag_router
 from api.ingredient import router as ingredient_router
 from api.cauldron import router as cauldron_router
+from database.ingredient_index import start_ingredient_index, stop_ingredient_index
+from database.recipe_analytics import start_analytics_worker, stop_analytics_worker
+from database.nutrition_matrix import start_nutrition_matrix, stop_nutrition_matrix
+from database.cauldron_counters import start_counter_flusher, stop_counter_flusher
+from database.auth.session_cache import start_revocation_listener, stop_revocation_listener
 
 load_dotenv()
 
@@ -21,9 +26,55 @@ app.add_middleware(
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS", "DELETE", "PUT"],
-    allow_headers=["Content-Type", "X-CSRF-Token", "Authorization"],
+    allow_headers=["Content-Type", "X-CSRF-Token", "Authorization", "If-Match", "If-None-Match"],
+    expose_headers=["ETag"],
 )
 
+@app.on_event("startup")
+def load_ingredient_index():
+    # Loads the autocomplete index and follows ingredient changes via LISTEN/NOTIFY
+    start_ingredient_index()
+
+@app.on_event("shutdown")
+def close_ingredient_index():
+    stop_ingredient_index()
+
+@app.on_event("startup")
+def recompute_recipe_analytics():
+    # Recomputes the recipes queued by the analytics dependency triggers
+    start_analytics_worker()
+
+@app.on_event("shutdown")
+def close_recipe_analytics():
+    stop_analytics_worker()
+
+@app.on_event("startup")
+def load_nutrition_matrix():
+    # Loads the ingredient x nutrient matrix and follows nutrient changes via LISTEN/NOTIFY
+    start_nutrition_matrix()
+
+@app.on_event("shutdown")
+def close_nutrition_matrix():
+    stop_nutrition_matrix()
+
+@app.on_event("startup")
+def flush_cauldron_counters():
+    # Writes the Redis-buffered cauldron usage/ratings to cauldron_data in batches
+    start_counter_flusher()
+
+@app.on_event("shutdown")
+def close_cauldron_counters():
+    stop_counter_flusher()
+
+@app.on_event("startup")
+async def listen_for_session_revocations():
+    # Evicts cached sessions as soon as simp-api-auth revokes them
+    start_revocation_listener()
+
+@app.on_event("shutdown")
+async def close_session_revocations():
+    await stop_revocation_listener()
+
 # Include all API routes with admin dependency
 app.include_router(recipe_router, prefix="/v1/recipes", dependencies=[admin_dependency])
 app.include_router(tag_router, prefix="/v1/tags", dependencies=[admin_dependency])
@@ -0,0 +1,28 @@
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Numeric, TIMESTAMP, VARCHAR
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from .base import Base
+
+class IngredientOffer(Base):
+    """
+    Cheapest offer of every company for an ingredient, per pricing dimension.
+    Maintained by the triggers in triggers/offers.py from ingredient_products,
+    products and product_companies; services only read it.
+    """
+    __tablename__ = "ingredient_offers"
+
+    ingredient_id = Column(UUID(as_uuid=True), ForeignKey("ingredients.ingredient_id", ondelete="CASCADE"), primary_key=True)
+    dimension = Column(VARCHAR(10), primary_key=True)  # 'mass' (priced per kg), 'volume' (per l) or 'count' (per unit)
+    company_id = Column(UUID(as_uuid=True), ForeignKey("companies.company_id", ondelete="CASCADE"), primary_key=True)
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.product_id", ondelete="CASCADE"), nullable=False)
+    price = Column(Numeric(10, 2), nullable=False)  # Shelf price of the pack
+    pack_amount = Column(Numeric(12, 3), nullable=False)  # g, ml or units in the pack (expected weight if variable)
+    unit_price = Column(Numeric(12, 4), nullable=False)  # Price per kg / l / unit
+    is_variable_weight = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Cheapest offer per dimension (the primary key cannot order by price)
+        Index("idx_ingredient_offers_dimension_price", "ingredient_id", "dimension", "unit_price"),
+        Index("idx_ingredient_offers_product_id", "product_id"),
+    )
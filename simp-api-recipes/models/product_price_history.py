@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Index, Numeric, TIMESTAMP
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from .base import Base
+
+class ProductPriceHistory(Base):
+    """
+    Append-only log of every price change in product_companies, written by the
+    triggers in triggers/price_history.py. Range-partitioned by month on
+    `observed_at`; partitions are created by ensure_product_price_history_partitions().
+    No foreign keys, so the history outlives delisted products and companies.
+    """
+    __tablename__ = "product_price_history"
+
+    product_id = Column(UUID(as_uuid=True), primary_key=True)
+    company_id = Column(UUID(as_uuid=True), primary_key=True)
+    observed_at = Column(TIMESTAMP(timezone=True), primary_key=True, server_default=func.now())
+    price = Column(Numeric(10, 2), nullable=True)  # NULL when the company stopped listing the product
+    previous_price = Column(Numeric(10, 2), nullable=True)  # NULL for a first listing
+
+    __table_args__ = (
+        # Time-range scans inside a partition; rows arrive in observed_at order
+        Index("brin_product_price_history_observed_at", "observed_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (observed_at)"},
+    )
@@ -1,5 +1,5 @@
-from sqlalchemy import Boolean, Column, ForeignKey, TIMESTAMP, func
-from sqlalchemy.dialects.postgresql import UUID, TEXT
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, TIMESTAMP, func
+from sqlalchemy.dialects.postgresql import UUID, TEXT, TSVECTOR
 from sqlalchemy.orm import relationship
 from .base import Base
 from .recipe_tag import RecipeTag  # ✅ Import the association table
@@ -15,6 +15,11 @@ class Recipe(Base):
     author_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id", ondelete="SET NULL"))
     created_at = Column(TIMESTAMP, server_default=func.now())
     validated = Column(Boolean, nullable=False) 
+    servings = Column(Integer, nullable=False, default=1, server_default="1")  # Portions the recipe yields
+    # Incremented on every write; exposed as the recipe's ETag
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Title, description, tag and ingredient names; maintained by triggers (see triggers/tsvectors.py)
+    search_tsv = Column(TSVECTOR)
 
     steps = relationship("RecipeStep", back_populates="recipe", cascade="all, delete-orphan")
     images = relationship("RecipeImage", back_populates="recipe", cascade="all, delete-orphan")
@@ -22,3 +27,12 @@ class Recipe(Base):
 
     # ✅ Correct many-to-many relationship
     tags = relationship("Tag", secondary=RecipeTag, back_populates="recipes")
+
+    __table_args__ = (
+        # Keyset pagination sort keys (newest first)
+        Index("idx_recipe_created_id", "created_at", "recipe_id"),
+        Index("idx_recipe_author_created_id", "author_id", "created_at", "recipe_id"),
+        # Full-text search and the trigram fallback for misspelled queries
+        Index("idx_recipe_search_tsv", "search_tsv", postgresql_using="gin"),
+        Index("idx_recipe_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+    )
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from uuid import UUID
 from typing import List, Optional
@@ -35,6 +35,25 @@ class CauldronSchema(CauldronBase):
     class Config:
         from_attributes = True
 
+class CauldronBatch(BaseModel):
+    """
+    Schema for changing many recipes of one user's cauldron at once.
+    `add` inserts active entries (reactivating existing ones); `activate` and
+    `deactivate` only touch existing entries.
+    """
+    user_id: UUID
+    add: List[UUID] = []
+    remove: List[UUID] = []
+    activate: List[UUID] = []
+    deactivate: List[UUID] = []
+
+class CauldronBatchOut(BaseModel):
+    added: int = 0
+    removed: int = 0
+    activated: int = 0
+    deactivated: int = 0
+    cauldrons: List[CauldronSchema] = []
+
 # -------------------------
 # CauldronData Schemas
 # -------------------------
@@ -62,13 +81,29 @@ class CauldronData(CauldronDataBase):
     class Config:
         from_attributes = True
 
+class CauldronRating(BaseModel):
+    """
+    Schema for a rating submission; omitted ratings keep their current value.
+    """
+    overall_rating: Optional[float] = Field(None, ge=0, le=5)
+    taste_rating: Optional[float] = Field(None, ge=0, le=5)
+    ease_rating: Optional[float] = Field(None, ge=0, le=5)
+
+class CauldronDataOut(CauldronDataBase):
+    """
+    Persisted counters merged with the ones not flushed yet.
+    """
+    cauldron_id: UUID
+    updated_at: Optional[datetime] = None
+
 # -------------------------
 # RecipeAnalytics Schemas
 # -------------------------
 
 class RecipeAnalyticsBase(BaseModel):
     recipe_id: UUID
-    minimum_price: float
+    minimum_price: Optional[float] = None
+    unpriced_ingredients: int = 0
     total_calories: Optional[float] = None
 
 class RecipeAnalyticsCreate(RecipeAnalyticsBase):
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from uuid import UUID
+from models.enums import LifeStageEnum
 
 class RecipeOut(BaseModel):
     recipe_id: UUID
@@ -8,6 +9,9 @@ class RecipeOut(BaseModel):
     front_image: str
     tags: List[str]
     in_cauldron: bool = False
+    minimum_price: Optional[float] = None
+    unpriced_ingredients: Optional[int] = None  # Ingredients left out of minimum_price
+    total_calories: Optional[float] = None
 
     class Config:
         from_attributes = True
@@ -47,6 +51,7 @@ class CreateRecipe(BaseModel):
     description: str
     front_image: str
     author_id: UUID
+    servings: int = Field(1, ge=1)
     ingredients: List[CreateRecipeIngredient]
     steps: List[CreateRecipeStep] 
     images: List[CreateRecipeImage]
@@ -61,6 +66,8 @@ class EditRecipe(BaseModel):
     description: str
     front_image: str
     author_id: UUID
+    servings: int = Field(1, ge=1)
+    version: int = 1
     ingredients: List[CreateRecipeIngredient]
     steps: List[CreateRecipeStep] 
     images: List[CreateRecipeImage]
@@ -71,6 +78,102 @@ class EditRecipe(BaseModel):
 
 
 
+class RecipeSearchHit(RecipeOut):
+    rank: float
+    snippet: Optional[str] = None  # Description excerpt with <mark> highlights
+
+class RecipeSearchOut(BaseModel):
+    results: List[RecipeSearchHit]
+    match: str  # "fulltext" or "trigram"
+
+class RecipeChanges(BaseModel):
+    """What an update actually wrote, so caches can be invalidated selectively."""
+    changed_fields: List[str] = []
+    tag_names: List[str] = []
+    tags_added: int = 0
+    tags_removed: int = 0
+    ingredients_added: int = 0
+    ingredients_updated: int = 0
+    ingredients_removed: int = 0
+    steps_added: int = 0
+    steps_updated: int = 0
+    steps_removed: int = 0
+    images_added: int = 0
+    images_removed: int = 0
+
+    @property
+    def tags_changed(self) -> bool:
+        return bool(self.tags_added or self.tags_removed)
+
+    @property
+    def ingredients_changed(self) -> bool:
+        return bool(self.ingredients_added or self.ingredients_updated or self.ingredients_removed)
+
+    @property
+    def steps_changed(self) -> bool:
+        return bool(self.steps_added or self.steps_updated or self.steps_removed)
+
+    @property
+    def images_changed(self) -> bool:
+        return bool(self.images_added or self.images_removed)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.changed_fields) or self.tags_changed or self.ingredients_changed \
+            or self.steps_changed or self.images_changed
+
+class RecipeUpdateOut(RecipeOut):
+    changes: RecipeChanges
+
+class RecipeImportLine(BaseModel):
+    line: int
+    status: str  # "created" or "failed"
+    recipe_id: Optional[UUID] = None
+    detail: Optional[str] = None
+
+class RecipeImportOut(BaseModel):
+    created: int
+    failed: int
+    results: List[RecipeImportLine]
+
+class NutrientAmount(BaseModel):
+    nutrient_id: UUID
+    name: str
+    unit: str
+    amount: float  # whole recipe
+    per_serving: float
+    percent_of_recommendation: Optional[float] = None  # per serving, when a life stage is given
+
+class RecipeNutritionOut(BaseModel):
+    recipe_id: UUID
+    servings: int
+    life_stage: Optional[LifeStageEnum] = None
+    incomplete_ingredients: int  # lines without a gram weight or nutrient data
+    nutrients: List[NutrientAmount]
+
+class RecipeNutritionBatch(BaseModel):
+    recipe_ids: List[UUID] = Field(..., min_length=1, max_length=1000)
+    life_stage: Optional[LifeStageEnum] = None
+
+class ConvertedLine(BaseModel):
+    ingredient_id: UUID
+    amount: float
+    measurement: str
+    unit: str  # normalized spelling
+    dimension: Optional[str] = None  # "mass", "volume" or "count"
+    grams: Optional[float] = None
+    reason: Optional[str] = None  # "unknown_unit", "missing_density" or "missing_unit_weight"
+
+class RecipeConversionOut(BaseModel):
+    recipe_id: UUID
+    total_grams: float  # converted lines only
+    unresolved: int
+    lines: List[ConvertedLine]
+
+class RecipeConversionBatch(BaseModel):
+    recipe_ids: List[UUID] = Field(..., min_length=1, max_length=1000)
+    unresolved_only: bool = False  # only report the lines that could not be converted
+
 class RetrieveTag(BaseModel):
     tag_id: UUID
     name: str
@@ -0,0 +1,51 @@
+import json
+
+from database import ingredient_index
+from database.ingredient_index import IngredientAutocompleteIndex
+from models.enums import UnitNameEnum
+
+
+class _Query:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class _Session:
+    """Answers the two queries of `load`: ingredients, then aliases."""
+
+    def __init__(self, ingredients, aliases):
+        self.results = [ingredients, aliases]
+
+    def query(self, *columns):
+        return _Query(self.results.pop(0))
+
+    def close(self):
+        pass
+
+
+def _notify(index, **change):
+    index.apply_notification(json.dumps({"table": "ingredients", "op": "INSERT", **change}))
+
+
+def test_loaded_and_notified_units_match(monkeypatch):
+    monkeypatch.setattr(
+        ingredient_index, "SessionLocal",
+        lambda: _Session([("a", "Olive oil", UnitNameEnum.MILLIGRAM)], []),
+    )
+    index = IngredientAutocompleteIndex()
+    index.load()
+    # Postgres stores the member name, and the trigger sends NEW.default_unit::text
+    _notify(index, ingredient_id="b", name="Olive paste", default_unit="MILLIGRAM")
+
+    units = {ingredient_id: unit for ingredient_id, _, unit in index.search("olive")}
+    assert units == {"a": "milligram", "b": "milligram"}
+
+
+def test_unit_change_is_normalized():
+    index = IngredientAutocompleteIndex()
+    _notify(index, ingredient_id="a", name="Salt", default_unit="GRAM")
+    _notify(index, ingredient_id="a", name="Salt", default_unit="MICROGRAM", op="UPDATE")
+    assert index.search("salt") == [("a", "Salt", "microgram")]
@@ -0,0 +1,41 @@
+import pytest
+
+from database.recipe_analytics import IngredientFacts
+from database.unit_conversion import (
+    MISSING_DENSITY, MISSING_UNIT_WEIGHT, UNKNOWN_UNIT, measurement_key, resolve_factor,
+)
+from database.units import COUNT, MASS, VOLUME
+
+
+def test_measurement_key_keeps_dots():
+    assert measurement_key("  2.5  KG ") == "2.5 kg"
+    assert measurement_key(None) == ""
+
+
+def test_mass_needs_no_facts():
+    factor = resolve_factor("kg", IngredientFacts())
+    assert (factor.grams, factor.dimension, factor.reason) == (1000.0, MASS, None)
+
+
+def test_decimal_quantity():
+    factor = resolve_factor("2.5 kg", IngredientFacts())
+    assert factor.grams == pytest.approx(2500.0)
+    assert factor.dimension == MASS
+
+
+def test_volume_uses_density():
+    factor = resolve_factor("cup", IngredientFacts(density=0.5))
+    assert factor.grams == pytest.approx(120.0)
+    assert factor.dimension == VOLUME
+
+
+def test_approximation_wins():
+    factor = resolve_factor("Cup", IngredientFacts(density=0.5, grams_per={"cup": 130.0}))
+    assert factor.grams == 130.0
+
+
+def test_unresolved_reasons():
+    assert resolve_factor("pizca", IngredientFacts()).reason == UNKNOWN_UNIT
+    assert resolve_factor("ml", IngredientFacts()).reason == MISSING_DENSITY
+    unit = resolve_factor("unidad", IngredientFacts())
+    assert (unit.grams, unit.dimension, unit.reason) == (None, COUNT, MISSING_UNIT_WEIGHT)
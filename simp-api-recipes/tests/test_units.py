@@ -0,0 +1,49 @@
+import pytest
+
+from database.units import COUNT, MASS, VOLUME, from_grams, normalize_unit, parse_unit, to_grams
+
+
+@pytest.mark.parametrize("measurement, expected", [
+    ("g", (MASS, 1.0)),
+    ("Kg", (MASS, 1000.0)),
+    ("Tbsp.", (VOLUME, 15.0)),
+    ("cucharadas", (VOLUME, 15.0)),
+    ("lts", (VOLUME, 1000.0)),
+    ("unidades", (COUNT, 1.0)),
+    ("taza (colmada)", (VOLUME, 240.0)),
+])
+def test_parse_unit_spellings(measurement, expected):
+    assert parse_unit(measurement) == expected
+
+
+@pytest.mark.parametrize("measurement, expected", [
+    ("500 g", (MASS, 500.0)),
+    ("2.5 kg", (MASS, 2500.0)),
+    ("2,5 kg", (MASS, 2500.0)),
+    ("1/2 cup", (VOLUME, 120.0)),
+    ("½ taza", (VOLUME, 120.0)),
+])
+def test_parse_unit_leading_quantity(measurement, expected):
+    dimension, amount = parse_unit(measurement)
+    assert dimension == expected[0]
+    assert amount == pytest.approx(expected[1])
+
+
+@pytest.mark.parametrize("measurement", [None, "", "pizca", "1/0 cup", "0 g"])
+def test_parse_unit_unknown(measurement):
+    assert parse_unit(measurement) is None
+
+
+def test_normalize_unit():
+    assert normalize_unit("  Tbsp.  ") == "tbsp"
+    assert normalize_unit(None) == ""
+
+
+def test_to_grams_and_back():
+    assert to_grams(250, MASS, None, None) == 250
+    assert to_grams(100, VOLUME, 0.9, None) == pytest.approx(90)
+    assert to_grams(100, VOLUME, None, None) is None
+    assert to_grams(2, COUNT, None, 60) == 120
+    assert from_grams(90, VOLUME, 0.9, None) == pytest.approx(100)
+    assert from_grams(120, COUNT, None, 60) == 2
+    assert from_grams(120, COUNT, None, None) is None
@@ -15,6 +15,10 @@ from models.base import Base
 from models.nutrient import Nutrient # Import your Nutrient model
 from models.user import User # <<<<---- ADDED: Import User model
 from triggers.tsvectors import initialize_vectors
+from triggers.notifications import initialize_notifications
+from triggers.offers import initialize_offers
+from triggers.analytics import initialize_analytics
+from triggers.price_history import initialize_price_history
 from database.seed_data.nutrients import seed_nutrients # Import the nutrient list
 # --- ---
 
@@ -154,6 +158,14 @@ def create_database():
         Base.metadata.create_all(bind=engine)
         logging.info("Initializing TSVectors...")
         initialize_vectors()
+        logging.info("Initializing change notifications...")
+        initialize_notifications()
+        logging.info("Initializing ingredient offer triggers...")
+        initialize_offers()
+        logging.info("Initializing recipe analytics triggers...")
+        initialize_analytics()
+        logging.info("Initializing price history partitions and triggers...")
+        initialize_price_history()
         logging.info("Database tables and vectors created.")
 
         # Seed data after tables and vectors exist
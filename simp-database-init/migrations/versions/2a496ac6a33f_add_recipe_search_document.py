@@ -0,0 +1,46 @@
+"""add recipe search document
+
+recipes.search_tsv (filled by triggers/tsvectors.py) and the indexes of the
+ranked full-text search and its trigram title fallback.
+
+Revision ID: 2a496ac6a33f
+Revises: 48b5d8a19b1b
+Create Date: 2026-10-16 23:43:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2a496ac6a33f'
+down_revision: Union[str, None] = '48b5d8a19b1b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("ALTER TABLE recipes ADD COLUMN IF NOT EXISTS search_tsv TSVECTOR")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_recipe_search_tsv ON recipes USING gin (search_tsv)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_recipe_title_trgm ON recipes USING gin (title gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    # Triggers that write search_tsv
+    for table, trigger in (
+        ("recipes", "update_recipe_search_tsv"),
+        ("recipe_tags", "refresh_recipe_tsv_on_tag_insert"),
+        ("recipe_tags", "refresh_recipe_tsv_on_tag_delete"),
+        ("recipe_ingredients", "refresh_recipe_tsv_on_ingredient_insert"),
+        ("recipe_ingredients", "refresh_recipe_tsv_on_ingredient_delete"),
+        ("tags", "refresh_recipe_tsv_on_tag_rename"),
+        ("ingredients", "refresh_recipe_tsv_on_ingredient_rename"),
+    ):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+
+    op.execute("DROP INDEX IF EXISTS idx_recipe_title_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_recipe_search_tsv")
+    op.drop_column("recipes", "search_tsv")
@@ -0,0 +1,32 @@
+"""add recipe and ingredient versions
+
+Row versions exposed as ETags. Every statement of this chain of revisions is
+idempotent, since `reset` runs create_all before migrating; new tables and the
+triggers are created by `python main.py create` once the chain is applied.
+
+Revision ID: 3c7e91a4d2b6
+Revises:
+Create Date: 2026-10-16 23:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c7e91a4d2b6'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE recipes ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1")
+    op.execute("ALTER TABLE ingredients ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1")
+
+
+def downgrade() -> None:
+    op.drop_column("ingredients", "version")
+    op.drop_column("recipes", "version")
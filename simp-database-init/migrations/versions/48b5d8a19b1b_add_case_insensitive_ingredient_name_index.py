@@ -0,0 +1,41 @@
+"""add case-insensitive ingredient name index
+
+Unique lower(name), the upsert target of set-based ingredient resolution.
+Names that already differ only in case are renamed first: the oldest keeps
+its name, the others get a numbered suffix so no recipe loses its ingredient.
+
+Revision ID: 48b5d8a19b1b
+Revises: c414872a45a0
+Create Date: 2026-10-16 23:42:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '48b5d8a19b1b'
+down_revision: Union[str, None] = 'c414872a45a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        WITH ranked AS (
+          SELECT ingredient_id, name,
+                 row_number() OVER (PARTITION BY lower(name) ORDER BY created_at, ingredient_id) AS n
+          FROM ingredients
+        )
+        UPDATE ingredients i
+        SET name = ranked.name || ' (' || ranked.n || ')'
+        FROM ranked
+        WHERE i.ingredient_id = ranked.ingredient_id AND ranked.n > 1
+    """)
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_ingredient_name_lower ON ingredients (lower(name))")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS uq_ingredient_name_lower")
@@ -0,0 +1,61 @@
+"""add product search columns
+
+Generated Spanish/English tsvectors and the unaccented trigram search name of
+products, with the IMMUTABLE unaccent wrapper they need (see models/base.py).
+
+Revision ID: 6eec169d2cfd
+Revises: fe50c6e50b9e
+Create Date: 2026-10-16 23:49:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6eec169d2cfd'
+down_revision: Union[str, None] = 'fe50c6e50b9e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("idx_product_spanish_tsv", "USING gin (spanish_tsv)"),
+    ("idx_product_english_tsv", "USING gin (english_tsv)"),
+    ("idx_product_search_name_trgm", "USING gin (search_name gin_trgm_ops)"),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute(
+        "CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text AS "
+        "$$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$ "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT"
+    )
+
+    op.execute(
+        "ALTER TABLE products ADD COLUMN IF NOT EXISTS spanish_tsv TSVECTOR GENERATED ALWAYS AS "
+        "(to_tsvector('spanish'::regconfig, immutable_unaccent(spanish_name))) STORED"
+    )
+    op.execute(
+        "ALTER TABLE products ADD COLUMN IF NOT EXISTS english_tsv TSVECTOR GENERATED ALWAYS AS "
+        "(to_tsvector('english'::regconfig, coalesce(english_name, ''))) STORED"
+    )
+    op.execute(
+        "ALTER TABLE products ADD COLUMN IF NOT EXISTS search_name TEXT GENERATED ALWAYS AS "
+        "(immutable_unaccent(lower(spanish_name || ' ' || coalesce(english_name, '')))) STORED"
+    )
+    for name, definition in INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON products {definition}")
+
+
+def downgrade() -> None:
+    for name, _ in reversed(INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.drop_column("products", "search_name")
+    op.drop_column("products", "english_tsv")
+    op.drop_column("products", "spanish_tsv")
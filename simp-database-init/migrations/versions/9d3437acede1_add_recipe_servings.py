@@ -0,0 +1,28 @@
+"""add recipe servings
+
+Portions a recipe yields, the divisor of per-serving nutrition.
+
+Revision ID: 9d3437acede1
+Revises: b410ec60ac7d
+Create Date: 2026-10-16 23:47:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3437acede1'
+down_revision: Union[str, None] = 'b410ec60ac7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE recipes ADD COLUMN IF NOT EXISTS servings INTEGER NOT NULL DEFAULT 1")
+
+
+def downgrade() -> None:
+    op.drop_column("recipes", "servings")
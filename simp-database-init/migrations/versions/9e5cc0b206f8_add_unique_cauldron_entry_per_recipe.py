@@ -0,0 +1,51 @@
+"""add unique cauldron entry per recipe
+
+One cauldron row per (user, recipe), the target of the batch upserts, and the
+index behind the active/inactive slices. Repeated entries are dropped first,
+keeping the active one with usage data, most recently updated first
+(cauldron_data of the others cascades).
+
+Revision ID: 9e5cc0b206f8
+Revises: e1fcadf422f6
+Create Date: 2026-10-16 23:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e5cc0b206f8'
+down_revision: Union[str, None] = 'e1fcadf422f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        WITH ranked AS (
+          SELECT c.cauldron_id,
+                 row_number() OVER (
+                   PARTITION BY c.user_id, c.recipe_id
+                   ORDER BY c.is_active IS TRUE DESC, d.cauldron_id IS NOT NULL DESC,
+                            c.updated_at DESC NULLS LAST, c.cauldron_id
+                 ) AS n
+          FROM cauldron c
+          LEFT JOIN cauldron_data d ON d.cauldron_id = c.cauldron_id
+        )
+        DELETE FROM cauldron c
+        USING ranked
+        WHERE c.cauldron_id = ranked.cauldron_id AND ranked.n > 1
+    """)
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_cauldron_user_recipe ON cauldron (user_id, recipe_id)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_cauldron_user_active_created_id "
+        "ON cauldron (user_id, is_active, created_at, cauldron_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_cauldron_user_active_created_id")
+    op.execute("DROP INDEX IF EXISTS uq_cauldron_user_recipe")
@@ -0,0 +1,45 @@
+"""add incremental recipe analytics
+
+NULL minimum_price when no ingredient is priced, the count of unpriced
+ingredients, the listing indexes on cost and calories, and the reverse
+lookups the dependency walk of triggers/analytics.py goes through.
+
+Revision ID: b410ec60ac7d
+Revises: 9e5cc0b206f8
+Create Date: 2026-10-16 23:46:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b410ec60ac7d'
+down_revision: Union[str, None] = '9e5cc0b206f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("recipe_analytics", "idx_recipe_analytics_price_recipe", "(minimum_price, recipe_id)"),
+    ("recipe_analytics", "idx_recipe_analytics_calories_recipe", "(total_calories, recipe_id)"),
+    ("recipe_ingredients", "idx_recipe_ingredients_ingredient_id", "(ingredient_id)"),
+    ("ingredient_products", "idx_ingredient_products_product_id", "(product_id)"),
+]
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE recipe_analytics ALTER COLUMN minimum_price DROP NOT NULL")
+    op.execute("ALTER TABLE recipe_analytics ADD COLUMN IF NOT EXISTS unpriced_ingredients INTEGER NOT NULL DEFAULT 0")
+    for table, name, definition in INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {definition}")
+
+
+def downgrade() -> None:
+    for _, name, _ in reversed(INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.drop_column("recipe_analytics", "unpriced_ingredients")
+    op.execute("UPDATE recipe_analytics SET minimum_price = 0 WHERE minimum_price IS NULL")
+    op.alter_column("recipe_analytics", "minimum_price", existing_type=sa.Numeric(10, 2), nullable=False)
@@ -0,0 +1,41 @@
+"""add keyset pagination indexes
+
+Sort keys of the cursor-paginated list endpoints.
+
+Revision ID: c414872a45a0
+Revises: 3c7e91a4d2b6
+Create Date: 2026-10-16 23:41:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c414872a45a0'
+down_revision: Union[str, None] = '3c7e91a4d2b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("cauldron", "idx_cauldron_user_created_id", "(user_id, created_at, cauldron_id)"),
+    ("companies", "idx_company_name_id", "(name, company_id)"),
+    ("ingredients", "idx_ingredient_name_id", "(name, ingredient_id)"),
+    ("nutrients", "idx_nutrient_name_id", "(nutrient_name, nutrient_id)"),
+    ("products", "idx_product_spanish_name_id", "(spanish_name, product_id)"),
+    ("recipes", "idx_recipe_created_id", "(created_at, recipe_id)"),
+    ("recipes", "idx_recipe_author_created_id", "(author_id, created_at, recipe_id)"),
+]
+
+
+def upgrade() -> None:
+    for table, name, definition in INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {definition}")
+
+
+def downgrade() -> None:
+    for _, name, _ in reversed(INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
@@ -0,0 +1,32 @@
+"""add tag autocomplete indexes
+
+GiST trigram index on tag names (serves both `%` and KNN `<->` ordering) and
+the recipe_tags tag_id index behind the usage counts.
+
+Revision ID: e1fcadf422f6
+Revises: 2a496ac6a33f
+Create Date: 2026-10-16 23:44:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1fcadf422f6'
+down_revision: Union[str, None] = '2a496ac6a33f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_tag_name_trgm ON tags USING gist (name gist_trgm_ops)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_recipe_tags_tag_id ON recipe_tags (tag_id)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_recipe_tags_tag_id")
+    op.execute("DROP INDEX IF EXISTS idx_tag_name_trgm")
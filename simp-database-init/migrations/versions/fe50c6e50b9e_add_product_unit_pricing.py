@@ -0,0 +1,50 @@
+"""add product unit pricing
+
+product_companies.unit_price and products.pricing_dimension (both set by
+triggers/offers.py) plus the catalogue listing indexes.
+
+Revision ID: fe50c6e50b9e
+Revises: 9d3437acede1
+Create Date: 2026-10-16 23:48:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fe50c6e50b9e'
+down_revision: Union[str, None] = '9d3437acede1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("products", "idx_product_measurement_name_id", "(item_measurement, spanish_name, product_id)"),
+    ("products", "idx_product_pricing_dimension", "(pricing_dimension)"),
+    ("product_companies", "idx_product_companies_company_price", "(company_id, price)"),
+]
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE product_companies ADD COLUMN IF NOT EXISTS unit_price NUMERIC(12, 4)")
+    op.execute("ALTER TABLE products ADD COLUMN IF NOT EXISTS pricing_dimension VARCHAR(10)")
+    for table, name, definition in INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {definition}")
+
+
+def downgrade() -> None:
+    # Triggers that write the dropped columns
+    for table, trigger in (
+        ("products", "products_pricing_dimension"),
+        ("products", "product_companies_unit_price_on_pack_update"),
+        ("product_companies", "product_companies_unit_price"),
+    ):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+
+    for _, name, _ in reversed(INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.drop_column("products", "pricing_dimension")
+    op.drop_column("product_companies", "unit_price")
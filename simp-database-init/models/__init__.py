@@ -18,11 +18,14 @@ from .ingredient_nutrient import IngredientNutrient
 from .ingredient_alias import IngredientAlias
 from .nutrient import Nutrient
 from .ingredient_product import IngredientProduct
+from .ingredient_offer import IngredientOffer
+from .product_match_suggestion import ProductMatchSuggestion
 from .approximate_measurement import ApproximateMeasurement
 from .density import Density # Assuming Density model exists in density.py
 from .tag import Tag
 from .product import Product
 from .product_company import ProductCompany
+from .product_price_history import ProductPriceHistory
 from .company import Company
 from .user_preference import UserPreference
 from .cauldron import Cauldron
@@ -52,11 +55,14 @@ __all__ = [
     "IngredientAlias",
     "Nutrient",
     "IngredientProduct",
+    "IngredientOffer",
+    "ProductMatchSuggestion",
     "ApproximateMeasurement",
     "Density",
     "Tag",
     "Product",
     "ProductCompany",
+    "ProductPriceHistory",
     "Company",
     "UserPreference",
     "Alcampo_Product_Link",
@@ -0,0 +1,188 @@
+from sqlalchemy import text
+from database.session import SessionLocal
+
+def initialize_analytics():
+    """Runs SQL commands to queue recipe analytics recomputation on dependency changes."""
+    db = SessionLocal()
+
+    sql_statements = [
+        # Recipes whose minimum_price / total_calories are stale
+        # (drained by the analytics worker of simp-api-recipes)
+        """
+        CREATE TABLE IF NOT EXISTS recipe_analytics_queue (
+          recipe_id uuid PRIMARY KEY,
+          queued_at timestamptz NOT NULL DEFAULT now()
+        );
+        """,
+
+        """
+        CREATE OR REPLACE FUNCTION enqueue_recipe_analytics(p_recipe_ids uuid[]) RETURNS void AS $$
+        BEGIN
+          INSERT INTO recipe_analytics_queue (recipe_id)
+          SELECT DISTINCT unnest(p_recipe_ids)
+          ON CONFLICT (recipe_id) DO NOTHING;
+          IF FOUND THEN
+            PERFORM pg_notify('recipe_analytics', '');
+          END IF;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+
+        # Reverse dependency walk: ingredients -> recipes (idx_recipe_ingredients_ingredient_id)
+        """
+        CREATE OR REPLACE FUNCTION recipes_using_ingredients(p_ingredient_ids uuid[]) RETURNS uuid[] AS $$
+          SELECT coalesce(array_agg(DISTINCT ri.recipe_id), '{}')
+          FROM recipe_ingredients ri
+          WHERE ri.ingredient_id = ANY(p_ingredient_ids);
+        $$ LANGUAGE sql STABLE;
+        """,
+
+        """
+        DROP FUNCTION IF EXISTS recipes_using_products(uuid[]);
+        """,
+
+        # One statement-level function for every source table. `changed_rows` is the
+        # NEW table (OLD table for deletes). Prices arrive through ingredient_offers,
+        # which triggers/offers.py only rewrites when an offer actually changed.
+        """
+        CREATE OR REPLACE FUNCTION recipe_analytics_dependency_changed() RETURNS TRIGGER AS $$
+        DECLARE
+          ids uuid[];
+        BEGIN
+          IF TG_TABLE_NAME = 'ingredient_nutrients' THEN
+            SELECT recipes_using_ingredients(coalesce(array_agg(DISTINCT c.ingredient_id), '{}')) INTO ids
+            FROM changed_rows c JOIN nutrients n ON n.nutrient_id = c.nutrient_id
+            WHERE n.nutrient_symbol = 'ENERC_KCAL';
+          ELSIF TG_TABLE_NAME IN ('ingredient_offers', 'densities', 'approximate_measurements') THEN
+            SELECT recipes_using_ingredients(coalesce(array_agg(DISTINCT ingredient_id), '{}')) INTO ids FROM changed_rows;
+          ELSIF TG_TABLE_NAME = 'recipe_ingredients' THEN
+            SELECT coalesce(array_agg(DISTINCT recipe_id), '{}') INTO ids FROM changed_rows;
+          END IF;
+
+          IF coalesce(array_length(ids, 1), 0) > 0 THEN
+            PERFORM enqueue_recipe_analytics(ids);
+          END IF;
+          RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+
+        # Row-level: a trigger with a column list cannot have transition tables, and
+        # only a density change matters (not renames or version bumps).
+        """
+        CREATE OR REPLACE FUNCTION recipe_analytics_ingredient_density_changed() RETURNS TRIGGER AS $$
+        BEGIN
+          PERFORM enqueue_recipe_analytics(recipes_using_ingredients(ARRAY[NEW.ingredient_id]));
+          RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+
+        # Cheapest offers per ingredient (refreshed from prices, pack sizes and product links)
+        """
+        DROP TRIGGER IF EXISTS recipe_analytics_on_price_insert ON product_companies;
+        DROP TRIGGER IF EXISTS recipe_analytics_on_price_update ON product_companies;
+        DROP TRIGGER IF EXISTS recipe_analytics_on_price_delete ON product_companies;
+        DROP TRIGGER IF EXISTS recipe_analytics_on_product_update ON products;
+        DROP TRIGGER IF EXISTS recipe_analytics_on_link_insert ON ingredient_products;
+        DROP TRIGGER IF EXISTS recipe_analytics_on_link_delete ON ingredient_products;
+
+        DROP TRIGGER IF EXISTS recipe_analytics_on_offer_insert ON ingredient_offers;
+        CREATE TRIGGER recipe_analytics_on_offer_insert
+        AFTER INSERT ON ingredient_offers REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_analytics_dependency_changed();
+
+        DROP TRIGGER IF EXISTS recipe_analytics_on_offer_update ON ingredient_offers;
+        CREATE TRIGGER recipe_analytics_on_offer_update
+        AFTER UPDATE ON ingredient_offers REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_analytics_dependency_changed();
+
+        DROP TRIGGER IF EXISTS recipe_analytics_on_offer_delete ON ingredient_offers;
+        CREATE TRIGGER recipe_analytics_on_offer_delete
+        AFTER DELETE ON ingredient_offers REFERENCING OLD TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_analytics_dependency_changed();
+        """,
+
+        # Energy values, densities and unit approximations of ingredients
+        """
+        DROP TRIGGER IF EXISTS recipe_analytics_on_nutrient_insert ON ingredient_nutrients;
+        CREATE TRIGGER recipe_analytics_on_nutrient_insert
+        AFTER INSERT ON ingredient_nutrients REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_analytics_dependency_changed();
+
+        DROP TRIGGER IF EXISTS recipe_analytics_on_nutrient_update ON ingredient_nutrients;
+        CREATE TRIGGER recipe_analytics_on_nutrient_update
+        AFTER UPDATE ON ingredient_nutrients REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_analytics_dependency_changed();
+
+        DROP TRIGGER IF EXISTS recipe_analytics_on_nutrient_delete ON ingredient_nutrients;
+        CREATE TRIGGER recipe_analytics_on_nutrient_delete
+        AFTER DELETE ON ingredient_nutrients REFERENCING OLD TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_analytics_dependency_changed();
+
+        DROP TRIGGER IF EXISTS recipe_analytics_on_ingredient_update ON ingredients;
+        CREATE TRIGGER recipe_analytics_on_ingredient_update
+        AFTER UPDATE OF density_g_per_ml ON ingredients
+        FOR EACH ROW WHEN (OLD.density_g_per_ml IS DISTINCT FROM NEW.density_g_per_ml)
+        EXECUTE FUNCTION recipe_analytics_ingredient_density_changed();
+
+        DROP TRIGGER IF EXISTS recipe_analytics_on_density_insert ON densities;
+        CREATE TRIGGER recipe_analytics_on_density_insert
+        AFTER INSERT ON densities REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_analytics_dependency_changed();
+
+        DROP TRIGGER IF EXISTS recipe_analytics_on_density_update ON densities;
+        CREATE TRIGGER recipe_analytics_on_density_update
+        AFTER UPDATE ON densities REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_analytics_dependency_changed();
+
+        DROP TRIGGER IF EXISTS recipe_analytics_on_density_delete ON densities;
+        CREATE TRIGGER recipe_analytics_on_density_delete
+        AFTER DELETE ON densities REFERENCING OLD TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_analytics_dependency_changed();
+
+        DROP TRIGGER IF EXISTS recipe_analytics_on_approximation_insert ON approximate_measurements;
+        CREATE TRIGGER recipe_analytics_on_approximation_insert
+        AFTER INSERT ON approximate_measurements REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_analytics_dependency_changed();
+
+        DROP TRIGGER IF EXISTS recipe_analytics_on_approximation_update ON approximate_measurements;
+        CREATE TRIGGER recipe_analytics_on_approximation_update
+        AFTER UPDATE ON approximate_measurements REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_analytics_dependency_changed();
+
+        DROP TRIGGER IF EXISTS recipe_analytics_on_approximation_delete ON approximate_measurements;
+        CREATE TRIGGER recipe_analytics_on_approximation_delete
+        AFTER DELETE ON approximate_measurements REFERENCING OLD TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_analytics_dependency_changed();
+        """,
+
+        # Recipe composition
+        """
+        DROP TRIGGER IF EXISTS recipe_analytics_on_recipe_ingredient_insert ON recipe_ingredients;
+        CREATE TRIGGER recipe_analytics_on_recipe_ingredient_insert
+        AFTER INSERT ON recipe_ingredients REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_analytics_dependency_changed();
+
+        DROP TRIGGER IF EXISTS recipe_analytics_on_recipe_ingredient_update ON recipe_ingredients;
+        CREATE TRIGGER recipe_analytics_on_recipe_ingredient_update
+        AFTER UPDATE ON recipe_ingredients REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_analytics_dependency_changed();
+
+        DROP TRIGGER IF EXISTS recipe_analytics_on_recipe_ingredient_delete ON recipe_ingredients;
+        CREATE TRIGGER recipe_analytics_on_recipe_ingredient_delete
+        AFTER DELETE ON recipe_ingredients REFERENCING OLD TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_analytics_dependency_changed();
+        """,
+    ]
+
+    try:
+        for sql in sql_statements:
+            db.execute(text(sql))
+        db.commit()
+        print("Recipe analytics triggers successfully initialized!")
+    except Exception as e:
+        db.rollback()
+        print(f"Error initializing recipe analytics triggers: {e}")
+    finally:
+        db.close()
@@ -0,0 +1,101 @@
+from sqlalchemy import text
+from database.session import SessionLocal
+
+def initialize_notifications():
+    """Runs SQL commands to set up LISTEN/NOTIFY change feeds."""
+    db = SessionLocal()
+
+    sql_statements = [
+        # Publish ingredient and alias changes on `ingredient_changes`
+        # (consumed by the in-process autocomplete index of simp-api-recipes)
+        """
+        CREATE OR REPLACE FUNCTION notify_ingredient_change() RETURNS TRIGGER AS $$
+        DECLARE
+          payload json;
+        BEGIN
+          IF TG_TABLE_NAME = 'ingredients' THEN
+            IF TG_OP = 'DELETE' THEN
+              payload := json_build_object('table', TG_TABLE_NAME, 'op', TG_OP,
+                                           'ingredient_id', OLD.ingredient_id);
+            ELSE
+              payload := json_build_object('table', TG_TABLE_NAME, 'op', TG_OP,
+                                           'ingredient_id', NEW.ingredient_id,
+                                           'name', NEW.name,
+                                           'default_unit', NEW.default_unit::text);
+            END IF;
+          ELSE
+            IF TG_OP = 'DELETE' THEN
+              payload := json_build_object('table', TG_TABLE_NAME, 'op', TG_OP,
+                                           'alias_id', OLD.alias_id);
+            ELSE
+              payload := json_build_object('table', TG_TABLE_NAME, 'op', TG_OP,
+                                           'alias_id', NEW.alias_id,
+                                           'ingredient_id', NEW.ingredient_id,
+                                           'alias_name', NEW.alias_name);
+            END IF;
+          END IF;
+          PERFORM pg_notify('ingredient_changes', payload::text);
+          RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+
+        # Create triggers for ingredients and ingredient_aliases
+        """
+        DROP TRIGGER IF EXISTS notify_ingredient_change ON ingredients;
+        CREATE TRIGGER notify_ingredient_change
+        AFTER INSERT OR DELETE OR UPDATE OF name, default_unit ON ingredients
+        FOR EACH ROW EXECUTE FUNCTION notify_ingredient_change();
+
+        DROP TRIGGER IF EXISTS notify_ingredient_alias_change ON ingredient_aliases;
+        CREATE TRIGGER notify_ingredient_alias_change
+        AFTER INSERT OR DELETE OR UPDATE OF alias_name, ingredient_id ON ingredient_aliases
+        FOR EACH ROW EXECUTE FUNCTION notify_ingredient_change();
+        """,
+
+        # Publish nutrient value changes on `nutrient_changes`
+        # (consumed by the in-memory nutrition matrix of simp-api-recipes).
+        # Identical payloads are folded by Postgres within a transaction.
+        """
+        CREATE OR REPLACE FUNCTION notify_nutrient_change() RETURNS TRIGGER AS $$
+        BEGIN
+          IF TG_TABLE_NAME = 'ingredient_nutrients' THEN
+            PERFORM pg_notify('nutrient_changes', json_build_object(
+              'table', TG_TABLE_NAME,
+              'ingredient_id', CASE WHEN TG_OP = 'DELETE' THEN OLD.ingredient_id ELSE NEW.ingredient_id END
+            )::text);
+            IF TG_OP = 'UPDATE' AND OLD.ingredient_id IS DISTINCT FROM NEW.ingredient_id THEN
+              PERFORM pg_notify('nutrient_changes', json_build_object(
+                'table', TG_TABLE_NAME, 'ingredient_id', OLD.ingredient_id)::text);
+            END IF;
+          ELSE
+            PERFORM pg_notify('nutrient_changes', json_build_object('table', TG_TABLE_NAME)::text);
+          END IF;
+          RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+
+        """
+        DROP TRIGGER IF EXISTS notify_ingredient_nutrient_change ON ingredient_nutrients;
+        CREATE TRIGGER notify_ingredient_nutrient_change
+        AFTER INSERT OR DELETE OR UPDATE ON ingredient_nutrients
+        FOR EACH ROW EXECUTE FUNCTION notify_nutrient_change();
+
+        DROP TRIGGER IF EXISTS notify_nutrient_definition_change ON nutrients;
+        CREATE TRIGGER notify_nutrient_definition_change
+        AFTER INSERT OR DELETE OR UPDATE ON nutrients
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_nutrient_change();
+        """
+    ]
+
+    try:
+        for sql in sql_statements:
+            db.execute(text(sql))
+        db.commit()
+        print("Change notification triggers successfully initialized!")
+    except Exception as e:
+        db.rollback()
+        print(f"Error initializing change notification triggers: {e}")
+    finally:
+        db.close()
@@ -0,0 +1,254 @@
+from sqlalchemy import text
+from database.session import SessionLocal
+
+def initialize_offers():
+    """Runs SQL commands to maintain unit prices and the ingredient_offers price index."""
+    db = SessionLocal()
+
+    sql_statements = [
+        # Pack contents in the base unit of its dimension (g, ml, units). Variable-weight
+        # items count with the midpoint of their estimated weight.
+        """
+        CREATE OR REPLACE FUNCTION product_pack_size(
+          p_quantity integer, p_item_size_value numeric, p_item_measurement text,
+          p_min_weight_g integer, p_max_weight_g integer,
+          OUT dimension text, OUT amount numeric, OUT is_variable_weight boolean
+        ) AS $$
+          SELECT
+            CASE WHEN p_min_weight_g IS NOT NULL AND p_max_weight_g IS NOT NULL THEN 'mass' ELSE u.dimension END,
+            CASE WHEN p_min_weight_g IS NOT NULL AND p_max_weight_g IS NOT NULL
+                 THEN coalesce(p_quantity, 1) * (p_min_weight_g + p_max_weight_g) / 2.0
+                 ELSE coalesce(p_quantity, 1) * p_item_size_value * u.factor END,
+            p_min_weight_g IS NOT NULL AND p_max_weight_g IS NOT NULL
+          FROM (SELECT NULL::text AS dimension, NULL::numeric AS factor) AS fallback
+          LEFT JOIN (VALUES
+            ('mg', 'mass', 0.001), ('g', 'mass', 1), ('gr', 'mass', 1), ('kg', 'mass', 1000),
+            ('ml', 'volume', 1), ('cl', 'volume', 10), ('dl', 'volume', 100), ('l', 'volume', 1000),
+            ('unit', 'count', 1), ('ud', 'count', 1), ('uds', 'count', 1), ('unidad', 'count', 1)
+          ) AS u(unit, dimension, factor) ON u.unit = lower(trim(p_item_measurement));
+        $$ LANGUAGE sql IMMUTABLE;
+        """,
+
+        """
+        CREATE OR REPLACE FUNCTION ingredients_using_products(p_product_ids uuid[]) RETURNS uuid[] AS $$
+          SELECT coalesce(array_agg(DISTINCT ip.ingredient_id), '{}')
+          FROM ingredient_products ip
+          WHERE ip.product_id = ANY(p_product_ids);
+        $$ LANGUAGE sql STABLE;
+        """,
+
+        # Recompute the offers of `p_ingredient_ids`. Unchanged rows are not rewritten,
+        # so the analytics triggers on ingredient_offers only see real changes.
+        # Concurrent writers touching the same ingredient are serialized with advisory
+        # locks taken in sorted order (no deadlocks); the recompute runs as a later
+        # statement, so its snapshot already includes the previous lock holder's commit.
+        """
+        CREATE OR REPLACE FUNCTION refresh_ingredient_offers(p_ingredient_ids uuid[]) RETURNS void AS $$
+        DECLARE
+          lock_key integer;
+        BEGIN
+          FOR lock_key IN
+            SELECT DISTINCT hashtext(id::text) FROM unnest(p_ingredient_ids) AS id ORDER BY 1
+          LOOP
+            PERFORM pg_advisory_xact_lock(lock_key);
+          END LOOP;
+
+          WITH fresh AS (
+            SELECT DISTINCT ON (ip.ingredient_id, s.dimension, pc.company_id)
+                   ip.ingredient_id, s.dimension, pc.company_id, p.product_id, pc.price,
+                   round(s.amount, 3) AS pack_amount,
+                   round(pc.price / s.amount * CASE WHEN s.dimension = 'count' THEN 1 ELSE 1000 END, 4) AS unit_price,
+                   s.is_variable_weight
+            FROM ingredient_products ip
+            JOIN products p ON p.product_id = ip.product_id
+            JOIN product_companies pc ON pc.product_id = p.product_id
+            CROSS JOIN LATERAL product_pack_size(p.quantity, p.item_size_value, p.item_measurement,
+                                                 p.min_weight_g, p.max_weight_g) s
+            WHERE ip.ingredient_id = ANY(p_ingredient_ids)
+              AND s.dimension IS NOT NULL AND s.amount > 0
+            ORDER BY ip.ingredient_id, s.dimension, pc.company_id, pc.price / s.amount, p.product_id
+          ), removed AS (
+            DELETE FROM ingredient_offers o
+            WHERE o.ingredient_id = ANY(p_ingredient_ids)
+              AND NOT EXISTS (
+                SELECT 1 FROM fresh f
+                WHERE f.ingredient_id = o.ingredient_id AND f.dimension = o.dimension AND f.company_id = o.company_id
+              )
+          )
+          INSERT INTO ingredient_offers
+            (ingredient_id, dimension, company_id, product_id, price, pack_amount, unit_price, is_variable_weight, updated_at)
+          SELECT ingredient_id, dimension, company_id, product_id, price, pack_amount, unit_price, is_variable_weight, now()
+          FROM fresh
+          ON CONFLICT (ingredient_id, dimension, company_id) DO UPDATE SET
+            product_id = EXCLUDED.product_id,
+            price = EXCLUDED.price,
+            pack_amount = EXCLUDED.pack_amount,
+            unit_price = EXCLUDED.unit_price,
+            is_variable_weight = EXCLUDED.is_variable_weight,
+            updated_at = now()
+          WHERE (ingredient_offers.product_id, ingredient_offers.price, ingredient_offers.pack_amount,
+                 ingredient_offers.is_variable_weight)
+                IS DISTINCT FROM
+                (EXCLUDED.product_id, EXCLUDED.price, EXCLUDED.pack_amount, EXCLUDED.is_variable_weight);
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+
+        # Shelf price per kg / l / unit of one product_companies row (NULL for unknown pack sizes)
+        """
+        CREATE OR REPLACE FUNCTION pack_unit_price(p_price numeric, p_product_id uuid) RETURNS numeric AS $$
+          SELECT round(p_price / s.amount * CASE WHEN s.dimension = 'count' THEN 1 ELSE 1000 END, 4)
+          FROM products p
+          CROSS JOIN LATERAL product_pack_size(p.quantity, p.item_size_value, p.item_measurement,
+                                               p.min_weight_g, p.max_weight_g) s
+          WHERE p.product_id = p_product_id AND s.dimension IS NOT NULL AND s.amount > 0;
+        $$ LANGUAGE sql STABLE;
+        """,
+
+        """
+        CREATE OR REPLACE FUNCTION set_product_company_unit_price() RETURNS TRIGGER AS $$
+        BEGIN
+          NEW.unit_price := pack_unit_price(NEW.price, NEW.product_id);
+          RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+
+        """
+        CREATE OR REPLACE FUNCTION product_pack_changed() RETURNS TRIGGER AS $$
+        BEGIN
+          UPDATE product_companies pc
+          SET unit_price = pack_unit_price(pc.price, pc.product_id)
+          FROM changed_rows n JOIN old_rows o USING (product_id)
+          WHERE pc.product_id = n.product_id
+            AND (n.quantity, n.item_size_value, n.item_measurement, n.min_weight_g, n.max_weight_g)
+                IS DISTINCT FROM (o.quantity, o.item_size_value, o.item_measurement, o.min_weight_g, o.max_weight_g);
+          RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+
+        """
+        CREATE OR REPLACE FUNCTION set_product_pricing_dimension() RETURNS TRIGGER AS $$
+        BEGIN
+          NEW.pricing_dimension := (product_pack_size(NEW.quantity, NEW.item_size_value, NEW.item_measurement,
+                                                      NEW.min_weight_g, NEW.max_weight_g)).dimension;
+          RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+
+        """
+        DROP TRIGGER IF EXISTS products_pricing_dimension ON products;
+        CREATE TRIGGER products_pricing_dimension
+        BEFORE INSERT OR UPDATE OF quantity, item_size_value, item_measurement, min_weight_g, max_weight_g ON products
+        FOR EACH ROW EXECUTE FUNCTION set_product_pricing_dimension();
+
+        DROP TRIGGER IF EXISTS product_companies_unit_price ON product_companies;
+        CREATE TRIGGER product_companies_unit_price
+        BEFORE INSERT OR UPDATE OF price, product_id ON product_companies
+        FOR EACH ROW EXECUTE FUNCTION set_product_company_unit_price();
+
+        DROP TRIGGER IF EXISTS product_companies_unit_price_on_pack_update ON products;
+        CREATE TRIGGER product_companies_unit_price_on_pack_update
+        AFTER UPDATE ON products REFERENCING OLD TABLE AS old_rows NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION product_pack_changed();
+        """,
+
+        # `changed_rows` is the NEW table (OLD table for deletes); updates also see `old_rows`
+        # so rewriting an unchanged price or pack size refreshes nothing.
+        """
+        CREATE OR REPLACE FUNCTION ingredient_offers_dependency_changed() RETURNS TRIGGER AS $$
+        DECLARE
+          ids uuid[];
+        BEGIN
+          IF TG_TABLE_NAME = 'product_companies' AND TG_OP = 'UPDATE' THEN
+            SELECT ingredients_using_products(coalesce(array_agg(DISTINCT n.product_id), '{}')) INTO ids
+            FROM changed_rows n JOIN old_rows o USING (product_id, company_id)
+            WHERE n.price IS DISTINCT FROM o.price;
+          ELSIF TG_TABLE_NAME = 'products' THEN
+            SELECT ingredients_using_products(coalesce(array_agg(DISTINCT n.product_id), '{}')) INTO ids
+            FROM changed_rows n JOIN old_rows o USING (product_id)
+            WHERE (n.quantity, n.item_size_value, n.item_measurement, n.min_weight_g, n.max_weight_g)
+                  IS DISTINCT FROM (o.quantity, o.item_size_value, o.item_measurement, o.min_weight_g, o.max_weight_g);
+          ELSIF TG_TABLE_NAME = 'product_companies' THEN
+            SELECT ingredients_using_products(coalesce(array_agg(DISTINCT product_id), '{}')) INTO ids FROM changed_rows;
+          ELSIF TG_TABLE_NAME = 'ingredient_products' THEN
+            SELECT coalesce(array_agg(DISTINCT ingredient_id), '{}') INTO ids FROM changed_rows;
+          END IF;
+
+          IF coalesce(array_length(ids, 1), 0) > 0 THEN
+            PERFORM refresh_ingredient_offers(ids);
+          END IF;
+          RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+
+        """
+        DROP TRIGGER IF EXISTS ingredient_offers_on_price_insert ON product_companies;
+        CREATE TRIGGER ingredient_offers_on_price_insert
+        AFTER INSERT ON product_companies REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION ingredient_offers_dependency_changed();
+
+        DROP TRIGGER IF EXISTS ingredient_offers_on_price_update ON product_companies;
+        CREATE TRIGGER ingredient_offers_on_price_update
+        AFTER UPDATE ON product_companies REFERENCING OLD TABLE AS old_rows NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION ingredient_offers_dependency_changed();
+
+        DROP TRIGGER IF EXISTS ingredient_offers_on_price_delete ON product_companies;
+        CREATE TRIGGER ingredient_offers_on_price_delete
+        AFTER DELETE ON product_companies REFERENCING OLD TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION ingredient_offers_dependency_changed();
+
+        DROP TRIGGER IF EXISTS ingredient_offers_on_product_update ON products;
+        CREATE TRIGGER ingredient_offers_on_product_update
+        AFTER UPDATE ON products REFERENCING OLD TABLE AS old_rows NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION ingredient_offers_dependency_changed();
+
+        DROP TRIGGER IF EXISTS ingredient_offers_on_link_insert ON ingredient_products;
+        CREATE TRIGGER ingredient_offers_on_link_insert
+        AFTER INSERT ON ingredient_products REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION ingredient_offers_dependency_changed();
+
+        DROP TRIGGER IF EXISTS ingredient_offers_on_link_delete ON ingredient_products;
+        CREATE TRIGGER ingredient_offers_on_link_delete
+        AFTER DELETE ON ingredient_products REFERENCING OLD TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION ingredient_offers_dependency_changed();
+        """,
+
+        # The catalogue's unit-price sort aggregates over companies, which this index never served
+        """
+        DROP INDEX IF EXISTS idx_product_companies_unit_price_product;
+        """,
+
+        # Backfill (a no-op write for offers that are already current)
+        """
+        UPDATE products p SET pricing_dimension = s.dimension
+        FROM products src
+        CROSS JOIN LATERAL product_pack_size(src.quantity, src.item_size_value, src.item_measurement,
+                                             src.min_weight_g, src.max_weight_g) s
+        WHERE src.product_id = p.product_id AND p.pricing_dimension IS DISTINCT FROM s.dimension;
+        """,
+
+        """
+        UPDATE product_companies SET unit_price = pack_unit_price(price, product_id)
+        WHERE unit_price IS DISTINCT FROM pack_unit_price(price, product_id);
+        """,
+
+        """
+        SELECT refresh_ingredient_offers(coalesce(array_agg(DISTINCT ingredient_id), '{}'))
+        FROM ingredient_products;
+        """,
+    ]
+
+    try:
+        for sql in sql_statements:
+            db.execute(text(sql))
+        db.commit()
+        print("Ingredient offer triggers successfully initialized!")
+    except Exception as e:
+        db.rollback()
+        print(f"Error initializing ingredient offer triggers: {e}")
+    finally:
+        db.close()
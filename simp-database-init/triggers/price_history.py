@@ -0,0 +1,127 @@
+from sqlalchemy import text
+from database.session import SessionLocal
+
+# Monthly partitions created ahead of time, counting the current month
+PARTITION_MONTHS_AHEAD = 3
+
+def initialize_price_history():
+    """Runs SQL commands to partition product_price_history and record every price change into it."""
+    db = SessionLocal()
+
+    sql_statements = [
+        # Catch-all for months without a partition yet, so a price write never fails.
+        """
+        CREATE TABLE IF NOT EXISTS product_price_history_default
+        PARTITION OF product_price_history DEFAULT;
+        """,
+
+        # One partition per calendar month (product_price_history_y2025m06). Rows of that
+        # month that already landed in the default partition are moved into it first.
+        """
+        CREATE OR REPLACE FUNCTION create_product_price_history_partition(p_month date) RETURNS void AS $$
+        DECLARE
+          start_at date := date_trunc('month', p_month)::date;
+          end_at date := (date_trunc('month', p_month) + interval '1 month')::date;
+          partition_name text := format('product_price_history_y%sm%s', to_char(start_at, 'YYYY'), to_char(start_at, 'MM'));
+        BEGIN
+          IF to_regclass(partition_name) IS NOT NULL THEN
+            RETURN;
+          END IF;
+          EXECUTE format('CREATE TABLE %I (LIKE product_price_history INCLUDING DEFAULTS)', partition_name);
+          EXECUTE format(
+            'WITH moved AS (DELETE FROM product_price_history_default WHERE observed_at >= %L AND observed_at < %L RETURNING *)
+             INSERT INTO %I SELECT * FROM moved',
+            start_at, end_at, partition_name);
+          EXECUTE format('ALTER TABLE product_price_history ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                         partition_name, start_at, end_at);
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+
+        """
+        CREATE OR REPLACE FUNCTION ensure_product_price_history_partitions(p_months_ahead integer DEFAULT 3) RETURNS void AS $$
+          SELECT create_product_price_history_partition((date_trunc('month', now()) + make_interval(months => m))::date)
+          FROM generate_series(0, p_months_ahead - 1) AS m;
+        $$ LANGUAGE sql;
+        """,
+
+        # History is append-only; old months are dropped by detaching their partition.
+        """
+        CREATE OR REPLACE FUNCTION reject_price_history_change() RETURNS TRIGGER AS $$
+        BEGIN
+          RAISE EXCEPTION 'product_price_history is append-only';
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+
+        """
+        DROP TRIGGER IF EXISTS product_price_history_append_only ON product_price_history;
+        CREATE TRIGGER product_price_history_append_only
+        BEFORE UPDATE OR DELETE ON product_price_history
+        FOR EACH STATEMENT EXECUTE FUNCTION reject_price_history_change();
+        """,
+
+        # `changed_rows` is the NEW table (OLD table for deletes); updates also see `old_rows`
+        # so rewriting an unchanged price records nothing. clock_timestamp() keeps two
+        # changes of one pair inside a single transaction apart.
+        """
+        CREATE OR REPLACE FUNCTION record_product_price_change() RETURNS TRIGGER AS $$
+        BEGIN
+          IF TG_OP = 'INSERT' THEN
+            INSERT INTO product_price_history (product_id, company_id, observed_at, price, previous_price)
+            SELECT n.product_id, n.company_id, clock_timestamp(), n.price, NULL FROM changed_rows n;
+          ELSIF TG_OP = 'UPDATE' THEN
+            INSERT INTO product_price_history (product_id, company_id, observed_at, price, previous_price)
+            SELECT n.product_id, n.company_id, clock_timestamp(), n.price, o.price
+            FROM changed_rows n JOIN old_rows o USING (product_id, company_id)
+            WHERE n.price IS DISTINCT FROM o.price;
+          ELSE
+            INSERT INTO product_price_history (product_id, company_id, observed_at, price, previous_price)
+            SELECT o.product_id, o.company_id, clock_timestamp(), NULL, o.price FROM changed_rows o;
+          END IF;
+          RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+
+        """
+        DROP TRIGGER IF EXISTS product_price_history_on_insert ON product_companies;
+        CREATE TRIGGER product_price_history_on_insert
+        AFTER INSERT ON product_companies REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION record_product_price_change();
+
+        DROP TRIGGER IF EXISTS product_price_history_on_update ON product_companies;
+        CREATE TRIGGER product_price_history_on_update
+        AFTER UPDATE ON product_companies REFERENCING OLD TABLE AS old_rows NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION record_product_price_change();
+
+        DROP TRIGGER IF EXISTS product_price_history_on_delete ON product_companies;
+        CREATE TRIGGER product_price_history_on_delete
+        AFTER DELETE ON product_companies REFERENCING OLD TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION record_product_price_change();
+        """,
+
+        f"SELECT ensure_product_price_history_partitions({PARTITION_MONTHS_AHEAD});",
+
+        # Baseline: current prices that have no history yet
+        """
+        INSERT INTO product_price_history (product_id, company_id, observed_at, price, previous_price)
+        SELECT pc.product_id, pc.company_id, now(), pc.price, NULL
+        FROM product_companies pc
+        WHERE NOT EXISTS (
+          SELECT 1 FROM product_price_history h
+          WHERE h.product_id = pc.product_id AND h.company_id = pc.company_id
+        );
+        """,
+    ]
+
+    try:
+        for sql in sql_statements:
+            db.execute(text(sql))
+        db.commit()
+        print("Price history triggers successfully initialized!")
+    except Exception as e:
+        db.rollback()
+        print(f"Error initializing price history triggers: {e}")
+    finally:
+        db.close()
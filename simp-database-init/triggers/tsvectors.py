@@ -40,6 +40,126 @@ def initialize_vectors():
         CREATE TRIGGER update_ingredient_tsv
         BEFORE INSERT OR UPDATE ON ingredients
         FOR EACH ROW EXECUTE FUNCTION ingredient_name_tsv_update();
+        """,
+
+        # Build the weighted search document of a recipe:
+        # title (A), description (B), tag names (C), ingredient names (D)
+        """
+        CREATE OR REPLACE FUNCTION recipe_search_document(p_recipe_id uuid, p_title text, p_description text)
+        RETURNS tsvector AS $$
+          SELECT setweight(to_tsvector('english', coalesce(p_title, '')), 'A')
+              || setweight(to_tsvector('english', coalesce(p_description, '')), 'B')
+              || setweight(to_tsvector('english', coalesce((
+                     SELECT string_agg(t.name, ' ')
+                     FROM recipe_tags rt JOIN tags t ON t.tag_id = rt.tag_id
+                     WHERE rt.recipe_id = p_recipe_id), '')), 'C')
+              || setweight(to_tsvector('english', coalesce((
+                     SELECT string_agg(i.name, ' ')
+                     FROM recipe_ingredients ri JOIN ingredients i ON i.ingredient_id = ri.ingredient_id
+                     WHERE ri.recipe_id = p_recipe_id), '')), 'D');
+        $$ LANGUAGE sql STABLE;
+        """,
+
+        # Create function to update `search_tsv` for recipes
+        """
+        CREATE OR REPLACE FUNCTION recipe_search_tsv_update() RETURNS TRIGGER AS $$
+        BEGIN
+          NEW.search_tsv := recipe_search_document(NEW.recipe_id, NEW.title, NEW.description);
+          RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+
+        # Create trigger for recipes (the child triggers below only touch search_tsv)
+        """
+        DROP TRIGGER IF EXISTS update_recipe_search_tsv ON recipes;
+        CREATE TRIGGER update_recipe_search_tsv
+        BEFORE INSERT OR UPDATE OF title, description ON recipes
+        FOR EACH ROW EXECUTE FUNCTION recipe_search_tsv_update();
+        """,
+
+        # Statement-level refresh of the recipes whose tags or ingredients changed,
+        # so a bulk insert of children costs one UPDATE instead of one per row
+        """
+        CREATE OR REPLACE FUNCTION recipe_children_search_tsv_refresh() RETURNS TRIGGER AS $$
+        BEGIN
+          IF TG_OP = 'DELETE' THEN
+            UPDATE recipes r
+            SET search_tsv = recipe_search_document(r.recipe_id, r.title, r.description)
+            WHERE r.recipe_id IN (SELECT DISTINCT recipe_id FROM old_rows);
+          ELSE
+            UPDATE recipes r
+            SET search_tsv = recipe_search_document(r.recipe_id, r.title, r.description)
+            WHERE r.recipe_id IN (SELECT DISTINCT recipe_id FROM new_rows);
+          END IF;
+          RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+
+        # Create triggers for recipe_tags and recipe_ingredients
+        """
+        DROP TRIGGER IF EXISTS refresh_recipe_tsv_on_tag_insert ON recipe_tags;
+        CREATE TRIGGER refresh_recipe_tsv_on_tag_insert
+        AFTER INSERT ON recipe_tags REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_children_search_tsv_refresh();
+
+        DROP TRIGGER IF EXISTS refresh_recipe_tsv_on_tag_delete ON recipe_tags;
+        CREATE TRIGGER refresh_recipe_tsv_on_tag_delete
+        AFTER DELETE ON recipe_tags REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_children_search_tsv_refresh();
+
+        DROP TRIGGER IF EXISTS refresh_recipe_tsv_on_ingredient_insert ON recipe_ingredients;
+        CREATE TRIGGER refresh_recipe_tsv_on_ingredient_insert
+        AFTER INSERT ON recipe_ingredients REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_children_search_tsv_refresh();
+
+        DROP TRIGGER IF EXISTS refresh_recipe_tsv_on_ingredient_delete ON recipe_ingredients;
+        CREATE TRIGGER refresh_recipe_tsv_on_ingredient_delete
+        AFTER DELETE ON recipe_ingredients REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION recipe_children_search_tsv_refresh();
+        """,
+
+        # Renaming a tag or an ingredient refreshes every recipe that uses it and
+        # bumps its version: the name is part of the recipe document and its ETag
+        """
+        CREATE OR REPLACE FUNCTION recipe_search_tsv_refresh_on_rename() RETURNS TRIGGER AS $$
+        BEGIN
+          IF TG_TABLE_NAME = 'tags' THEN
+            UPDATE recipes r
+            SET search_tsv = recipe_search_document(r.recipe_id, r.title, r.description),
+                version = r.version + 1
+            WHERE r.recipe_id IN (SELECT recipe_id FROM recipe_tags WHERE tag_id = NEW.tag_id);
+          ELSE
+            UPDATE recipes r
+            SET search_tsv = recipe_search_document(r.recipe_id, r.title, r.description),
+                version = r.version + 1
+            WHERE r.recipe_id IN (SELECT recipe_id FROM recipe_ingredients WHERE ingredient_id = NEW.ingredient_id);
+          END IF;
+          RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+
+        """
+        DROP TRIGGER IF EXISTS refresh_recipe_tsv_on_tag_rename ON tags;
+        CREATE TRIGGER refresh_recipe_tsv_on_tag_rename
+        AFTER UPDATE OF name ON tags
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION recipe_search_tsv_refresh_on_rename();
+
+        DROP TRIGGER IF EXISTS refresh_recipe_tsv_on_ingredient_rename ON ingredients;
+        CREATE TRIGGER refresh_recipe_tsv_on_ingredient_rename
+        AFTER UPDATE OF name ON ingredients
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION recipe_search_tsv_refresh_on_rename();
+        """,
+
+        # Backfill recipes created before the triggers existed
+        """
+        UPDATE recipes
+        SET search_tsv = recipe_search_document(recipe_id, title, description)
+        WHERE search_tsv IS NULL;
         """
     ]
 
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column
+from sqlalchemy import Column, Index
 from sqlalchemy.dialects.postgresql import UUID, TEXT
 from .base import Base
 
@@ -8,3 +8,7 @@ class Company(Base):
 
     company_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(TEXT, unique=True, nullable=False)
+
+    __table_args__ = (
+        Index("idx_company_name_id", "name", "company_id"),  # Keyset pagination sort key
+    )
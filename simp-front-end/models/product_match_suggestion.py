@@ -0,0 +1,31 @@
+import uuid
+from sqlalchemy import Column, ForeignKey, Index, Integer, Numeric, String, TEXT, TIMESTAMP
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from .base import Base
+
+class ProductMatchSuggestion(Base):
+    """
+    Staging table for ingredient -> product links proposed by the batch matcher
+    (simp-api-ingredients/database/product_matching.py). Accepting a suggestion
+    creates the IngredientProduct row.
+    """
+    __tablename__ = "product_match_suggestions"
+
+    suggestion_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.product_id", ondelete="CASCADE"), nullable=False)
+    ingredient_id = Column(UUID(as_uuid=True), ForeignKey("ingredients.ingredient_id", ondelete="CASCADE"), nullable=False)
+    score = Column(Numeric(5, 2), nullable=False)  # 0-100 string similarity
+    rank = Column(Integer, nullable=False)  # 1 = best suggestion for the product
+    matched_name = Column(TEXT, nullable=False)  # Ingredient name or alias that scored
+    language_code = Column(String(10), nullable=True)  # Language of the product name that matched
+    status = Column(String(10), nullable=False, default="pending", server_default="pending")  # pending, accepted, rejected
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    reviewed_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # One suggestion per pair; rejected pairs are not proposed again
+        Index("uq_product_match_product_ingredient", "product_id", "ingredient_id", unique=True),
+        # Review queue: best pending suggestions first (keyset on suggestion_id)
+        Index("idx_product_match_status_score_id", "status", "score", "suggestion_id"),
+    )
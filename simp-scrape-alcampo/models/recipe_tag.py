@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, ForeignKey
+from sqlalchemy import Table, Column, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from .base import Base
 
@@ -8,4 +8,6 @@ RecipeTag = Table(
     Base.metadata,
     Column("recipe_id", UUID(as_uuid=True), ForeignKey("recipes.recipe_id", ondelete="CASCADE"), primary_key=True),
     Column("tag_id", UUID(as_uuid=True), ForeignKey("tags.tag_id", ondelete="CASCADE"), primary_key=True),
+    # The primary key leads with recipe_id; per-tag lookups (usage counts) need their own index
+    Index("idx_recipe_tags_tag_id", "tag_id"),
 )
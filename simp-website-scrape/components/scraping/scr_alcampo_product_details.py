@@ -163,6 +163,7 @@ def save_or_get_product(db: Session, data: dict) -> Product | None:
     except Exception as e: db.rollback(); print(f"   DB_ERROR (prod {retail_id}): {e}", file=sys.stderr); return None
 
 def update_or_create_product_company_price(db: Session, product_id: uuid.UUID, company_id: uuid.UUID, price: Decimal | None) -> ProductCompany | None:
+    # Price changes are logged to product_price_history by database triggers.
     if price is None: return None
     try:
         quantized_price = price.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
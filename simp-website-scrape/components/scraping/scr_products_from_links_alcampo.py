@@ -171,6 +171,7 @@ def update_or_create_product_company_price(db: 'Session', product_id: uuid.UUID,
     """
     Updates or creates the price entry in the ProductCompany table.
     Returns the ProductCompany object or None on failure or if price is None.
+    Price changes are logged to product_price_history by database triggers.
     """
     if not ProductCompany: # Check if import failed at runtime
          print(" DB_HELPER_ERROR: ProductCompany model not available.", file=sys.stderr)
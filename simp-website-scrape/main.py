@@ -12,6 +12,7 @@ from multiprocessing import Pool, freeze_support
 from typing import Optional, Tuple, Dict, Any
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from database.connection import SessionLocal, engine
@@ -55,6 +56,16 @@ def get_or_create_company(db: Session, company_name: str) -> Optional[Company]:
         return None
 
 
+def ensure_price_history_partitions(db: Session, months_ahead: int = 2) -> None:
+    """Create the monthly product_price_history partitions this run writes into (simp-database-init/triggers/price_history.py)."""
+    try:
+        db.execute(text("SELECT ensure_product_price_history_partitions(:months)"), {"months": months_ahead})
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        print(f"   DB_WARN: Could not create price history partitions (changes go to the default partition): {e}", file=sys.stderr)
+
+
 # --- Link Scraper Orchestration ---
 def run_link_scraper():
     start = time.time()
@@ -102,6 +113,7 @@ def run_new_detail_scraper():
         print("FATAL: Could not get/create company.", file=sys.stderr)
         sys.exit(1)
     company_id = company.company_id
+    ensure_price_history_partitions(db0)
 
     # fetch unprocessed links
     raw = db0.query(
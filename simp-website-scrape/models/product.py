@@ -1,9 +1,9 @@
 # models/product.py
 
 import uuid
-from sqlalchemy import Column, Numeric, Integer, TEXT, VARCHAR, DateTime # Keep DateTime
+from sqlalchemy import Column, Computed, Index, Numeric, Integer, TEXT, VARCHAR, DateTime # Keep DateTime
 # from sqlalchemy.sql import func # Needed if using server_default=func.now()
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from .base import Base
 # import datetime
 
@@ -37,10 +37,35 @@ class Product(Base):
     min_weight_g = Column(Integer, nullable=True, comment="Minimum estimated weight in grams (for variable weight items)")
     max_weight_g = Column(Integer, nullable=True, comment="Maximum estimated weight in grams (for variable weight items)")
 
+    # --- Pricing (set from the pack size by triggers/offers.py) ---
+    # 'mass' (unit prices per kg), 'volume' (per l) or 'count' (per unit); NULL for unknown units.
+    pricing_dimension = Column(VARCHAR(10), nullable=True, comment="Dimension unit prices are expressed in (mass, volume, count)")
+
+    # --- Search (generated; see models/base.py for immutable_unaccent) ---
+    spanish_tsv = Column(TSVECTOR, Computed(
+        "to_tsvector('spanish'::regconfig, immutable_unaccent(spanish_name))", persisted=True
+    ))
+    english_tsv = Column(TSVECTOR, Computed(
+        "to_tsvector('english'::regconfig, coalesce(english_name, ''))", persisted=True
+    ))
+    # Lower-cased, unaccented names for typo-tolerant trigram matching
+    search_name = Column(TEXT, Computed(
+        "immutable_unaccent(lower(spanish_name || ' ' || coalesce(english_name, '')))", persisted=True
+    ))
+
     # --- Optional Timestamps ---
     # created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     # updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
+    __table_args__ = (
+        Index("idx_product_spanish_name_id", "spanish_name", "product_id"), # Keyset pagination sort key
+        Index("idx_product_measurement_name_id", "item_measurement", "spanish_name", "product_id"), # Catalogue filtered by unit
+        Index("idx_product_pricing_dimension", "pricing_dimension"), # Unit-price listings of one dimension
+        Index("idx_product_spanish_tsv", "spanish_tsv", postgresql_using="gin"),
+        Index("idx_product_english_tsv", "english_tsv", postgresql_using="gin"),
+        Index("idx_product_search_name_trgm", "search_name", postgresql_using="gin", postgresql_ops={"search_name": "gin_trgm_ops"}),
+    )
+
     def __repr__(self):
         # Updated representation method
         if self.quantity > 1: